@@ -1,15 +1,72 @@
 # api/index.py
+import time
+
+_import_started = time.perf_counter()
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+# Routers are cheap to import: heavy libraries (holidays, user_agents, markdown, pytz, httpx) and the JSON
+# datasets are loaded lazily on first use of a route that needs them. See app/services/lazy.py.
 from app.routers import text_manipulation, fun_creative, dev_utils, data_fetching # We'll create these soon
+from app.services import compression, lazy, response_cache
+from app.services.datasets import datasets
+from app.services.holiday_store import holiday_store
+from app.services.ip_geo import geo_index
+from app.services.http_client import upstream_client
+from app.services.password_hashing import password_pool
+from app.services.responses import DefaultJSONResponse
+from app.services.import_profile import profile_startup, format_report
+from app.services.compression import COMPRESSION_ENABLED, CompressionMiddleware
+from app.services.metrics import METRICS_ENABLED, MetricsMiddleware, loop_lag_monitor, metrics
+
+# Set STARTUP_DIAGNOSTICS=1 to profile cold imports (-X importtime) in the background after startup.
+STARTUP_DIAGNOSTICS = os.getenv("STARTUP_DIAGNOSTICS", "") == "1"
+startup_state = {"prewarmed": [], "import_profile": None}
+
+
+async def _profile_imports():
+    report = await asyncio.to_thread(profile_startup)
+    startup_state["import_profile"] = report
+    print(format_report(report))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Optional: load the lazy dependencies of the routers listed in PREWARM_ROUTERS (e.g. "data,dev" or "all")
+    startup_state["prewarmed"] = await asyncio.to_thread(lazy.prewarm)
+    if "httpx" in startup_state["prewarmed"]:
+        # Shared, pooled HTTP client for upstream APIs (Chuck Norris etc.); otherwise opened on first use
+        await upstream_client.start()
+    # Optional: precompute holiday calendars for HOLIDAY_WARMUP_COUNTRIES
+    await asyncio.to_thread(holiday_store.warm_from_env)
+    # Map the prebuilt IP geolocation index (a single mmap; nothing is parsed)
+    await asyncio.to_thread(geo_index.get)
+    profile_task = asyncio.create_task(_profile_imports()) if STARTUP_DIAGNOSTICS else None
+    if METRICS_ENABLED:
+        loop_lag_monitor.start()
+    yield
+    if profile_task is not None:
+        profile_task.cancel()
+    await loop_lag_monitor.stop()
+    await upstream_client.close()
+    password_pool.shutdown()
+
 
 app = FastAPI(
     title="Common APIs Hub",
     description="A collection of commonly needed and fun API endpoints.",
     version="0.1.0",
     docs_url="/", # Serve docs at the root
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    # orjson/msgspec-backed JSONResponse when installed (see app/services/responses.py)
+    default_response_class=DefaultJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS (Cross-Origin Resource Sharing)
@@ -22,12 +79,54 @@ app.add_middleware(
     allow_headers=["*"], # Allows all headers
 )
 
+# zstd/br/gzip for text-like responses above COMPRESSION_MIN_SIZE; COMPRESSION=0 turns it off (e.g. when a
+# proxy in front already compresses).
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Per-route request metrics (see /metrics); added last so it is outermost and times everything below it.
+# Set METRICS_ENABLED=0 to leave it out. With REQUEST_PROFILING=1 it also serves ?__profile=1 (dev only).
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers from different modules
 app.include_router(text_manipulation.router, prefix="/text", tags=["Text Manipulation"])
 app.include_router(fun_creative.router, prefix="/fun", tags=["Fun & Creative"])
 app.include_router(dev_utils.router, prefix="/dev", tags=["Developer Utilities"])
 app.include_router(data_fetching.router, prefix="/data", tags=["Data Fetching"])
 
+APP_IMPORT_MS = round((time.perf_counter() - _import_started) * 1000, 2)
+
+
+@app.get("/diagnostics/startup", tags=["General"])
+async def startup_diagnostics():
+    return {
+        "app_import_ms": APP_IMPORT_MS,
+        "prewarmed": startup_state["prewarmed"],
+        "lazy_loads": lazy.load_report(),
+        "import_profile": startup_state["import_profile"],
+    }
+
+@app.get("/diagnostics/datasets", tags=["General"])
+async def dataset_diagnostics():
+    return {"datasets": datasets.stats()}
+
+@app.get("/diagnostics/response-cache", tags=["General"])
+async def response_cache_diagnostics():
+    return {"enabled": response_cache.RESPONSE_CACHE_ENABLED, "routes": response_cache.stats()}
+
+@app.get("/diagnostics/compression", tags=["General"])
+async def compression_diagnostics():
+    return compression.stats()
+
+@app.get("/diagnostics/routes", tags=["General"])
+async def route_diagnostics():
+    return metrics.summary()
+
+@app.get("/metrics", tags=["General"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Simple root endpoint (optional, as docs are at root now)
 # @app.get("/api-status", tags=["General"])
 # async def api_status():
@@ -1,25 +1,24 @@
 # app/routers/data_fetching.py
 import json
-from pathlib import Path
 from fastapi import APIRouter, Query, HTTPException
-from datetime import datetime
-import pytz  # For timezone conversion
-import holidays  # For holiday calendar
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime, date
 
-router = APIRouter()
+from app.services.country_index import CountryIndex
+from app.services.datasets import datasets
+from app.services.holiday_store import holiday_store, UnknownCountryError
+from app.services.lazy import lazy_import
+from app.services.response_cache import CachedRoute, cached
+from app.services.tz_batch import convert_batch
 
-DATA_PATH = Path(__file__).parent.parent / "data"
+pytz = lazy_import("pytz", group="data")  # For timezone conversion
 
+router = APIRouter(route_class=CachedRoute)  # Routes marked @cached serve repeat requests from memory
 
-def load_json_data(filename: str):
-    try:
-        with open(DATA_PATH / filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return None  # Indicate that data is missing
-
-
-countries_data_simplified = load_json_data("countries_simplified.json")
+# Hash maps plus prefix/trigram indexes, built on first use (and on hot reload) so lookups never scan the dataset.
+country_index = datasets.register("countries_simplified.json", transform=CountryIndex, group="data")
 
 
 # Create `app/data/countries_simplified.json` with a few entries:
@@ -28,33 +27,82 @@ countries_data_simplified = load_json_data("countries_simplified.json")
 #   {"name": "Canada", "capital": "Ottawa", "currency": "CAD", "iso2": "CA"}
 # ]
 
+class CountryBatchRequest(BaseModel):
+    codes: list[str] = Field(..., example=["US", "CAN", "GB"], max_length=1000,
+                             description="ISO2 or ISO3 country codes to look up (max 1000).")
+
+
 @router.get("/country-info")
 async def get_country_info(
         country_name: str = Query(None, description="Full name of the country (e.g., United States)"),
-        country_code_iso2: str = Query(None, description="ISO2 country code (e.g., US)")):
-    if not countries_data_simplified:
+        country_code_iso2: str = Query(None, description="ISO2 country code (e.g., US)"),
+        country_code_iso3: str = Query(None, description="ISO3 country code (e.g., USA)"),
+        capital: str = Query(None, description="Capital city (e.g., Ottawa)")):
+    index = await country_index.aget()
+    if not index.countries:
         raise HTTPException(status_code=503, detail="Country data is currently unavailable.")
-    if not country_name and not country_code_iso2:
-        raise HTTPException(status_code=400, detail="Please provide either country_name or country_code_iso2.")
+    if not (country_name or country_code_iso2 or country_code_iso3 or capital):
+        raise HTTPException(status_code=400,
+                            detail="Please provide one of country_name, country_code_iso2, country_code_iso3 or capital.")
 
-    found_country = None
     if country_name:
-        for country in countries_data_simplified:
-            if country["name"].lower() == country_name.lower():
-                found_country = country
-                break
+        found_country = index.by_name(country_name)
     elif country_code_iso2:
-        for country in countries_data_simplified:
-            if country.get("iso2", "").lower() == country_code_iso2.lower():
-                found_country = country
-                break
+        found_country = index.by_iso2(country_code_iso2)
+    elif country_code_iso3:
+        found_country = index.by_iso3(country_code_iso3)
+    else:
+        found_country = index.by_capital(capital)
 
     if not found_country:
         raise HTTPException(status_code=404, detail="Country not found in our simplified dataset.")
     return found_country
 
 
+@router.post("/country-info/batch")
+async def get_country_info_batch(req_data: CountryBatchRequest):
+    index = await country_index.aget()
+    if not index.countries:
+        raise HTTPException(status_code=503, detail="Country data is currently unavailable.")
+    results = {}
+    not_found = []
+    for code in req_data.codes:
+        country = index.by_code(code)
+        results[code] = country
+        if country is None:
+            not_found.append(code)
+    return {"results": results, "not_found": not_found}
+
+
+@router.get("/country-search")
+async def search_countries(
+        q: str = Query(..., min_length=1, max_length=100, description="Search text; matches name, capital or ISO code prefixes, with typo tolerance"),
+        limit: int = Query(10, ge=1, le=50, description="Maximum number of results")):
+    index = await country_index.aget()
+    if not index.countries:
+        raise HTTPException(status_code=503, detail="Country data is currently unavailable.")
+    return {"query": q, "results": index.search(q, limit=limit)}
+
+
+MAX_BATCH_CONVERSIONS = 100_000
+
+
+class TimeConversionItem(BaseModel):
+    dt_str: str = Field(..., example="2024-03-10 01:30:00")
+    from_tz: str | None = Field(None, example="America/New_York", description="Defaults to the batch from_tz")
+    to_tz: str | None = Field(None, example="Europe/London", description="Defaults to the batch to_tz")
+
+
+class BatchTimeConversionRequest(BaseModel):
+    from_tz: str = Field("UTC", example="America/New_York", description="Source timezone applied to every row")
+    to_tz: str = Field("UTC", example="Europe/London", description="Target timezone applied to every row")
+    datetimes: list[str] = Field([], example=["2024-03-10 01:30:00", "2024-03-10 03:30:00"],
+                                 description="Column mode: datetimes (YYYY-MM-DD HH:MM:SS) converted with from_tz/to_tz")
+    items: list[TimeConversionItem] = Field([], description="Mixed mode: rows with their own timezone pair")
+
+
 @router.get("/timezones")
+@cached(ttl=86400, precompress=True)
 async def list_timezones():
     return {"timezones": pytz.common_timezones}
 
@@ -94,24 +142,136 @@ async def convert_timezone(
     }
 
 
+@router.post("/time/convert/batch")
+async def convert_timezone_batch(req_data: BatchTimeConversionRequest):
+    rows = [(dt_str, req_data.from_tz, req_data.to_tz) for dt_str in req_data.datetimes]
+    rows.extend((item.dt_str, item.from_tz or req_data.from_tz, item.to_tz or req_data.to_tz)
+                for item in req_data.items)
+    if not rows:
+        raise HTTPException(status_code=400, detail="Provide 'datetimes' and/or 'items' to convert.")
+    if len(rows) > MAX_BATCH_CONVERSIONS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_CONVERSIONS} conversions per request.")
+
+    def convert_chunk(start: int, chunk: list) -> str:
+        # Rows are grouped by timezone pair and converted against each zone's cached transition table.
+        return "".join(json.dumps({"index": index, **result}) + "\n"
+                       for index, result in enumerate(convert_batch(chunk), start))
+
+    async def ndjson_lines(chunk_size: int = 5000):
+        # Converted chunk by chunk in the threadpool: the event loop stays free and the first lines go out
+        # before the last rows are converted.
+        for start in range(0, len(rows), chunk_size):
+            yield await run_in_threadpool(convert_chunk, start, rows[start:start + chunk_size])
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+MAX_HOLIDAY_RANGE_YEARS = 10
+
+
+def _holiday_country_not_found(country_code: str) -> HTTPException:
+    return HTTPException(status_code=404,
+                         detail=f"Holiday data not available for country code: {country_code}. Check supported codes.")
+
+
+def _past_year(request) -> bool:
+    # Past calendars no longer change; the current year is left uncached (the default year changes with it).
+    year = request.query_params.get("year", "")
+    return year.isdigit() and int(year) < datetime.now().year
+
+
 @router.get("/holidays")
+@cached(ttl=86400, max_entries=4096, when=_past_year)
 async def get_public_holidays(
         country_code: str = Query(..., min_length=2, max_length=2, example="US",
                                   description="Two-letter ISO country code (e.g., US, CA, GB)."),
         year: int = Query(datetime.now().year, ge=1950, le=2050, description="Year for holidays.")
 ):
     try:
-        # The 'holidays' library uses country codes directly.
+        # Calendars are memoized per (country, year) in the shared holiday store.
         # Some countries might need subdivisions (e.g., US states, Canadian provinces)
         # For simplicity, we're not handling subdivisions here.
-        country_holidays = holidays.CountryHoliday(country_code.upper(), years=year)
-    except KeyError:  # holidays library raises KeyError for unknown country codes
-        raise HTTPException(status_code=404,
-                            detail=f"Holiday data not available for country code: {country_code}. Check supported codes.")
+        country_holidays = holiday_store.get_year(country_code, year)
+    except UnknownCountryError:
+        raise _holiday_country_not_found(country_code)
 
-    if not country_holidays:
+    if not country_holidays.items:
         return {"country_code": country_code, "year": year, "holidays": [],
                 "message": "No holidays found or country not supported extensively."}
 
-    holiday_list = [{"date": date.isoformat(), "name": name} for date, name in sorted(country_holidays.items())]
-    return {"country_code": country_code, "year": year, "holidays": holiday_list}
\ No newline at end of file
+    holiday_list = [{"date": day.isoformat(), "name": name} for day, name in country_holidays.items]
+    return {"country_code": country_code, "year": year, "holidays": holiday_list}
+
+
+@router.get("/holidays/is-holiday")
+async def is_public_holiday(
+        country_code: str = Query(..., min_length=2, max_length=2, example="US",
+                                  description="Two-letter ISO country code (e.g., US, CA, GB)."),
+        on_date: date = Query(..., alias="date", example="2024-12-25", description="Date to check (YYYY-MM-DD).")
+):
+    try:
+        name = holiday_store.holiday_name(country_code, on_date)
+    except UnknownCountryError:
+        raise _holiday_country_not_found(country_code)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"country_code": country_code, "date": on_date.isoformat(), "is_holiday": name is not None,
+            "name": name, "is_business_day": name is None and on_date.weekday() < 5}
+
+
+@router.get("/holidays/range")
+async def get_holidays_in_range(
+        country_code: str = Query(..., min_length=2, max_length=2, example="US",
+                                  description="Two-letter ISO country code (e.g., US, CA, GB)."),
+        start_date: date = Query(..., example="2024-01-01", description="First date of the range (inclusive)."),
+        end_date: date = Query(..., example="2025-12-31", description="Last date of the range (inclusive).")
+):
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date.")
+    if end_date.year - start_date.year >= MAX_HOLIDAY_RANGE_YEARS:
+        raise HTTPException(status_code=400, detail=f"Range may span at most {MAX_HOLIDAY_RANGE_YEARS} years.")
+    try:
+        holiday_items = holiday_store.holidays_between(country_code, start_date, end_date)
+    except UnknownCountryError:
+        raise _holiday_country_not_found(country_code)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"country_code": country_code, "start_date": start_date.isoformat(), "end_date": end_date.isoformat(),
+            "holidays": [{"date": day.isoformat(), "name": name} for day, name in holiday_items]}
+
+
+@router.get("/business-days/add")
+async def add_business_days(
+        country_code: str = Query(..., min_length=2, max_length=2, example="US",
+                                  description="Two-letter ISO country code (e.g., US, CA, GB)."),
+        start_date: date = Query(..., example="2024-12-20", description="Date to count from."),
+        days: int = Query(..., ge=-3650, le=3650, example=5,
+                          description="Business days to add (negative to go back). Weekends and holidays are skipped.")
+):
+    try:
+        result = holiday_store.add_business_days(country_code, start_date, days)
+    except UnknownCountryError:
+        raise _holiday_country_not_found(country_code)
+    except (ValueError, OverflowError):
+        raise HTTPException(status_code=400, detail="Resulting date is outside the supported holiday years.")
+    return {"country_code": country_code, "start_date": start_date.isoformat(), "days": days,
+            "result_date": result.isoformat()}
+
+
+@router.get("/business-days/count")
+async def count_business_days(
+        country_code: str = Query(..., min_length=2, max_length=2, example="US",
+                                  description="Two-letter ISO country code (e.g., US, CA, GB)."),
+        start_date: date = Query(..., example="2024-12-01", description="First date (inclusive)."),
+        end_date: date = Query(..., example="2025-01-01", description="Last date (exclusive).")
+):
+    if abs(end_date.year - start_date.year) >= MAX_HOLIDAY_RANGE_YEARS:
+        raise HTTPException(status_code=400, detail=f"Range may span at most {MAX_HOLIDAY_RANGE_YEARS} years.")
+    try:
+        count = holiday_store.business_days_between(country_code, start_date, end_date)
+    except UnknownCountryError:
+        raise _holiday_country_not_found(country_code)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"country_code": country_code, "start_date": start_date.isoformat(), "end_date": end_date.isoformat(),
+            "business_days": count}
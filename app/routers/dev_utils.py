@@ -1,11 +1,20 @@
 # app/routers/dev_utils.py
-from fastapi import APIRouter, Request, Query, HTTPException
+from collections import Counter
+from fastapi import APIRouter, Request, Query, HTTPException, UploadFile, File
 from pydantic import BaseModel, Field
-from user_agents import parse as ua_parse
-import requests
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime, timezone  # For timestamp
 
-router = APIRouter()
+from app.services import jwt_tools, ua_parser
+from app.services.ip_geo import geo_index
+from app.services.password_hashing import SCHEMES, PoolSaturatedError, SchemeUnavailableError, password_pool
+from app.services.response_cache import CachedRoute, cached
+from app.services.responses import trusted_json
+
+router = APIRouter(route_class=CachedRoute)  # Routes marked @cached serve repeat requests from memory
+
+
+MAX_IP_BATCH = 100_000
 
 
 # --- Models (Existing and New) ---
@@ -16,8 +25,8 @@ class UserAgentResponse(BaseModel):
     os_family: str
     os_version: str
     device_family: str
-    device_brand: str
-    device_model: str
+    device_brand: str | None  # None for non-device UAs such as curl or bots
+    device_model: str | None
     is_mobile: bool
     is_tablet: bool
     is_pc: bool
@@ -33,47 +42,186 @@ class TimestampRequest(BaseModel):
                               description="Timezone for human-readable string (e.g., 'America/New_York', 'UTC')")  # Added timezone awareness
 
 
+class UserAgentBatchRequest(BaseModel):
+    user_agents: list[str] = Field(..., max_length=100_000,
+                                   example=["Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X)", "curl/8.4.0"])
+    include_results: bool = Field(True, description="Return the parsed result for every input, in order")
+
+
+class PasswordHashRequest(BaseModel):
+    password: str = Field(..., min_length=1, max_length=1024, example="correct horse battery staple")
+    scheme: str = Field("bcrypt", example="bcrypt", description=f"Hashing scheme: {', '.join(SCHEMES)}")
+    cost: int | None = Field(None, example=12,
+                             description="bcrypt rounds or argon2 time_cost; defaults to the server setting")
+
+
+class PasswordVerifyRequest(BaseModel):
+    password: str = Field(..., max_length=1024, example="correct horse battery staple")
+    hash: str = Field(..., max_length=512, example="$2b$12$Ue1tOkRYJbVBP1VkV1rTdO0a2XrTGNbS5Oa9jZ6J3J8H2fV0y7s7W")
+
+
+class PasswordVerifyBatchRequest(BaseModel):
+    items: list[PasswordVerifyRequest] = Field(..., min_length=1, max_length=100)
+
+
+class JWTKeyFields(BaseModel):
+    key: str | dict | None = Field(None, example="my-shared-secret",
+                                   description="HMAC secret, PEM or JWK; omit to use a registered `kid`")
+    kid: str | None = Field(None, example="mesh-2024", description="Id of a key registered via /dev/jwt/keys")
+    algorithm: str | None = Field(None, example="HS256", description="Algorithm for an inline key (default HS256)")
+
+
+class JWTKeyRegisterRequest(BaseModel):
+    kid: str = Field(..., min_length=1, max_length=128, example="mesh-2024")
+    key: str | dict = Field(..., example="my-shared-secret")
+    algorithm: str = Field("HS256", example="RS256")
+
+
+class JWTSignRequest(JWTKeyFields):
+    claims: dict = Field(..., example={"sub": "service-a", "aud": "service-b"})
+    expires_in: int | None = Field(None, ge=1, example=3600, description="Seconds until `exp`; sets `iat` too")
+    headers: dict | None = Field(None, description="Extra JOSE header fields")
+
+
+class JWTVerifyRequest(JWTKeyFields):
+    token: str = Field(..., example="eyJhbGciOiJIUzI1NiJ9.eyJzdWIiOiJzZXJ2aWNlLWEifQ.sig")
+    audience: str | None = Field(None, example="service-b")
+    issuer: str | None = Field(None)
+
+
+class JWTVerifyBatchRequest(JWTKeyFields):
+    tokens: list[str] = Field(..., min_length=1, max_length=100_000)
+    audience: str | None = Field(None, example="service-b")
+    issuer: str | None = Field(None)
+    include_claims: bool = Field(False, description="Return claims for valid tokens (otherwise only validity)")
+
+
+class IPBatchRequest(BaseModel):
+    ips: list[str] = Field(..., max_length=MAX_IP_BATCH, example=["8.8.8.8", "2001:4860:4860::8888"])
+
+
+class JWTDecodeRequest(BaseModel):
+    token: str = Field(..., example="eyJhbGciOiJIUzI1NiJ9.eyJzdWIiOiJzZXJ2aWNlLWEifQ.sig")
+
+
 # --- Endpoints (Existing) ---
 @router.get("/user-agent", response_model=UserAgentResponse)
 async def parse_user_agent(request: Request):
     ua_string = request.headers.get("user-agent", "Unknown")
-    user_agent = ua_parse(ua_string)
-    return UserAgentResponse(
-        user_agent_string=ua_string,
-        browser_family=user_agent.browser.family,
-        browser_version=user_agent.browser.version_string,
-        os_family=user_agent.os.family,
-        os_version=user_agent.os.version_string,
-        device_family=user_agent.device.family,
-        device_brand=user_agent.device.brand,
-        device_model=user_agent.device.model,
-        is_mobile=user_agent.is_mobile,
-        is_tablet=user_agent.is_tablet,
-        is_pc=user_agent.is_pc,
-        is_bot=user_agent.is_bot
-    )
+    # The parsed dict already has the UserAgentResponse shape; no per-request model or validation.
+    return trusted_json(ua_parser.parse_user_agent(ua_string))
+
+
+@router.get("/user-agent/cache-stats")
+async def user_agent_cache_stats():
+    return ua_parser.cache_stats()
+
+
+def _parse_user_agent_batch(user_agents: list, include_results: bool) -> dict:
+    # Only distinct strings are parsed; results are fanned back out to every input.
+    parsed_by_ua, summary = ua_parser.aggregate(Counter(user_agents))
+    response = {"summary": summary}
+    if include_results:
+        response["results"] = [parsed_by_ua[ua_string] for ua_string in user_agents]
+    return response
+
+
+@router.post("/user-agent/batch")
+async def parse_user_agent_batch(req_data: UserAgentBatchRequest):
+    # Parsing is regex-heavy: run it in the threadpool so the event loop stays free
+    response = await run_in_threadpool(_parse_user_agent_batch, req_data.user_agents, req_data.include_results)
+    return trusted_json(response)
+
+
+MAX_LOG_LINE_BYTES = 64 * 1024  # Longer lines (or a file without newlines) are skipped, not buffered
+
+
+def _count_log_lines(data: bytes, ua_counts: Counter) -> bytes:
+    # Counts the UA of every complete line in `data`; returns the trailing partial line.
+    lines = data.split(b"\n")
+    remainder = lines.pop()
+    for line in lines:
+        ua_string = ua_parser.extract_from_log_line(line.decode("utf-8", errors="replace"))
+        if ua_string:
+            ua_counts[ua_string] += 1
+    return remainder
+
+
+@router.post("/user-agent/batch/upload")
+async def parse_user_agent_log(
+        file: UploadFile = File(..., description="Access log (combined format) or one User-Agent string per line"),
+        top: int = Query(50, ge=0, le=10_000, description="Number of most frequent distinct UA strings to return")
+):
+    ua_counts = Counter()
+    remainder = b""
+    skipping = False  # Inside a line longer than MAX_LOG_LINE_BYTES, until its newline
+    # Read in chunks so multi-GB logs never sit in memory; only distinct UA strings are kept. Line splitting
+    # and UA extraction run in the threadpool, one chunk at a time.
+    while chunk := await file.read(1024 * 1024):
+        if skipping:
+            newline = chunk.find(b"\n")
+            if newline < 0:
+                continue
+            chunk, skipping = chunk[newline + 1:], False
+        remainder = await run_in_threadpool(_count_log_lines, remainder + chunk, ua_counts)
+        if len(remainder) > MAX_LOG_LINE_BYTES:
+            remainder, skipping = b"", True
+    if remainder.strip():
+        await run_in_threadpool(_count_log_lines, remainder + b"\n", ua_counts)
+    if not ua_counts:
+        raise HTTPException(status_code=400, detail="No User-Agent strings found in the uploaded file.")
+
+    parsed_by_ua, summary = await run_in_threadpool(ua_parser.aggregate, ua_counts)
+    top_user_agents = [{"count": count, **parsed_by_ua[ua_string]} for ua_string, count in ua_counts.most_common(top)]
+    return {"filename": file.filename, "summary": summary, "top_user_agents": top_user_agents}
+
+
+async def _geo_index():
+    # The first get() maps the index file; keep that (and any wait on a concurrent load) off the event loop
+    if geo_index.loaded:
+        return geo_index.get()
+    return await run_in_threadpool(geo_index.get)
 
 
 @router.get("/ip-info")
-async def get_ip_info(request: Request):
-    client_ip = request.headers.get("x-vercel-forwarded-for") or \
+async def get_ip_info(request: Request,
+                      ip: str = Query(None, description="Address to look up instead of the caller's (IPv4 or IPv6)")):
+    client_ip = ip or request.headers.get("x-vercel-forwarded-for") or \
                 request.headers.get("x-forwarded-for", "").split(',')[0].strip() or \
                 request.client.host
 
     basic_info = {"ip_address": client_ip}
-    # External IP lookup can be added here if desired, mindful of rate limits
-    # Example:
-    # try:
-    #     response = requests.get(f"http://ip-api.com/json/{client_ip}?fields=61439", timeout=3) # query,status,message,country,countryCode,regionName,city,zip,lat,lon,timezone,isp,org,as
-    #     response.raise_for_status()
-    #     geo_data = response.json()
-    #     if geo_data.get("status") == "success":
-    #         basic_info.update(geo_data)
-    # except requests.RequestException:
-    #     basic_info["geolocation_error"] = "Could not fetch detailed IP geolocation."
+    # Geolocated from the local range database (app/services/ip_geo.py), never an external API
+    index = await _geo_index()
+    if index is None:
+        basic_info["geolocation_error"] = "No IP geolocation database is installed."
+        return basic_info
+    try:
+        record = index.lookup(client_ip)
+    except ValueError as e:
+        if ip:
+            raise HTTPException(status_code=400, detail=str(e))
+        basic_info["geolocation_error"] = str(e)
+        return basic_info
+    basic_info["geolocation"] = record  # None when no range covers the address (e.g. private networks)
     return basic_info
 
 
+@router.post("/ip-info/batch")
+async def get_ip_info_batch(req_data: IPBatchRequest):
+    # Results in input order; invalid addresses get an "error" instead of failing the whole batch.
+    index = await _geo_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="No IP geolocation database is installed.")
+    results = await run_in_threadpool(index.lookup_many, req_data.ips)
+    return trusted_json({"count": len(results), "results": results})
+
+
+@router.get("/ip-info/stats")
+async def ip_info_stats():
+    index = await _geo_index()
+    return {"installed": index is not None, **(index.stats() if index is not None else {})}
+
 HTTP_STATUS_CODES = {
     100: "Continue", 101: "Switching Protocols", 102: "Processing",
     200: "OK", 201: "Created", 202: "Accepted", 203: "Non-Authoritative Information", 204: "No Content",
@@ -93,7 +241,14 @@ HTTP_STATUS_CODES = {
 }
 
 
+@router.get("/http-status/all")
+@cached(ttl=86400, precompress=True)
+async def list_http_status_codes():
+    return {"status_codes": {str(code): explanation for code, explanation in HTTP_STATUS_CODES.items()}}
+
+
 @router.get("/http-status")
+@cached(ttl=86400, precompress=True)
 async def get_http_status_explainer(code: int = Query(..., example=200, description="HTTP Status Code")):
     explanation = HTTP_STATUS_CODES.get(code)
     if not explanation:
@@ -169,6 +324,114 @@ async def timestamp_converter(req_data: TimestampRequest):
     }
 
 
+# Hashing runs on a bounded process pool (app/services/password_hashing.py); 429 when it is saturated.
+def _hashing_busy() -> HTTPException:
+    return HTTPException(status_code=429, detail="Password hashing is at capacity, retry shortly.",
+                         headers={"Retry-After": "1"})
+
+
+@router.post("/password-hash")
+async def password_hash(req_data: PasswordHashRequest):
+    try:
+        hashed = await password_pool.hash(req_data.password, req_data.scheme, req_data.cost)
+    except PoolSaturatedError:
+        raise _hashing_busy()
+    except SchemeUnavailableError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"scheme": req_data.scheme, "hash": hashed}
+
+
+@router.post("/password-verify")
+async def password_verify(req_data: PasswordVerifyRequest):
+    try:
+        return await password_pool.verify(req_data.password, req_data.hash)
+    except PoolSaturatedError:
+        raise _hashing_busy()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/password-verify/batch")
+async def password_verify_batch(req_data: PasswordVerifyBatchRequest):
+    try:
+        results = await password_pool.verify_many([(item.password, item.hash) for item in req_data.items])
+    except PoolSaturatedError:
+        raise _hashing_busy()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"count": len(results), "valid": sum(result["valid"] for result in results), "results": results}
+
+
+@router.get("/password-hash/stats")
+async def password_hash_stats():
+    return password_pool.stats()
+
+
+# --- JWT (app/services/jwt_tools.py: parsed keys and verification results are cached) ---
+@router.post("/jwt/keys")
+async def jwt_register_key(req_data: JWTKeyRegisterRequest):
+    try:
+        return jwt_tools.key_cache.register(req_data.kid, req_data.key, req_data.algorithm)
+    except jwt_tools.KeyExistsError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except jwt_tools.KeyRegistryFullError as e:
+        raise HTTPException(status_code=507, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/jwt/sign")
+async def jwt_sign(req_data: JWTSignRequest):
+    if req_data.key is None and req_data.kid is None:
+        raise HTTPException(status_code=400, detail="Provide either 'key' or a registered 'kid'.")
+    try:
+        token = jwt_tools.sign(req_data.claims, req_data.key, req_data.algorithm, req_data.kid,
+                               req_data.expires_in, req_data.headers)
+    except jwt_tools.KeyNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Unknown key id: {req_data.kid!r}.")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"token": token}
+
+
+@router.post("/jwt/verify")
+async def jwt_verify(req_data: JWTVerifyRequest):
+    try:
+        return jwt_tools.verify(req_data.token, req_data.key, req_data.algorithm, req_data.kid,
+                                req_data.audience, req_data.issuer)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/jwt/verify/batch")
+async def jwt_verify_batch(req_data: JWTVerifyBatchRequest):
+    try:
+        results = await run_in_threadpool(jwt_tools.verify_many, req_data.tokens, req_data.key, req_data.algorithm,
+                                          req_data.kid, req_data.audience, req_data.issuer)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not req_data.include_claims:
+        results = [{k: v for k, v in result.items() if k != "claims"} for result in results]
+    valid = sum(result["valid"] for result in results)
+    return {"count": len(results), "valid": valid, "invalid": len(results) - valid, "results": results}
+
+
+@router.post("/jwt/decode")
+async def jwt_decode(req_data: JWTDecodeRequest):
+    # No signature check: for inspecting tokens only.
+    try:
+        return jwt_tools.decode_unverified(req_data.token)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/jwt/stats")
+async def jwt_stats():
+    return jwt_tools.stats()
+
+
 @router.get("/view-headers")
 async def view_http_headers(request: Request):
     # Convert headers to a simple dict; Header items can be list-like.
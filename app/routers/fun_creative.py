@@ -1,38 +1,58 @@
 # app/routers/fun_creative.py
-import random
+import os
 import json
-import string
-from pathlib import Path
+import random
 from fastapi import APIRouter, Query, HTTPException
-import requests  # For Chuck Norris API
+from fastapi.responses import StreamingResponse
+
+from app.services.cache import AsyncTTLCache, PrefetchPool
+from app.services.datasets import datasets, record_dict
+from app.services.http_client import upstream_client
+from app.services.lazy import lazy_import
+from app.services.responses import trusted_json
+from app.services.secure_random import CHARACTER_CLASSES, generate_passwords, generate_tokens
+
+httpx = lazy_import("httpx", group="fun")  # For Chuck Norris API
 
 router = APIRouter()
 
-# --- Helper to load data ---
-DATA_PATH = Path(__file__).parent.parent / "data"
+# Overridable so the Chuck Norris endpoints can be exercised against a local stub server.
+CHUCK_NORRIS_API_URL = os.getenv("CHUCK_NORRIS_API_URL", "https://api.chucknorris.io").rstrip("/")
+# Categories barely change: serve them from cache for an hour, then stale for up to a day while refreshing.
+CHUCK_NORRIS_CATEGORIES_TTL = float(os.getenv("CHUCK_NORRIS_CATEGORIES_TTL", "3600"))
+CHUCK_NORRIS_CATEGORIES_STALE_TTL = float(os.getenv("CHUCK_NORRIS_CATEGORIES_STALE_TTL", "86400"))
+CHUCK_NORRIS_POOL_SIZE = int(os.getenv("CHUCK_NORRIS_POOL_SIZE", "20"))
+CHUCK_NORRIS_POOL_LOW_WATER = int(os.getenv("CHUCK_NORRIS_POOL_LOW_WATER", "5"))
 
 
-def load_json_data(filename: str):
-    file_path = DATA_PATH / filename
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            if not content.strip():
-                print(f"Warning: Data file {filename} at {file_path} is empty.")
-                return []
-            return json.loads(content)
-    except FileNotFoundError:
-        print(f"Warning: Data file {filename} not found at {file_path}.")
-        return []
-    except json.JSONDecodeError as e:
-        print(f"Warning: Could not decode JSON from {filename} at {file_path}. Error: {e}")
-        return []
-
-
-famous_quotes_data = load_json_data("famous_quotes.json")
-bad_jokes_data = load_json_data("bad_jokes.json")
-cat_facts_data = load_json_data("cat_facts.json")  # Load cat facts
-dog_facts_data = load_json_data("dog_facts.json")  # Load dog facts
+# --- Datasets (loaded on first use, compactly stored and hot-reloaded by the shared registry) ---
+famous_quotes_data = datasets.register("famous_quotes.json", group="fun")
+bad_jokes_data = datasets.register("bad_jokes.json", group="fun")
+cat_facts_data = datasets.register("cat_facts.json", group="fun")  # Load cat facts
+dog_facts_data = datasets.register("dog_facts.json", group="fun")  # Load dog facts
+
+
+# --- Shared pools (used by the single-item endpoints and /bulk) ---
+EMOJIS = ("😀", "😂", "😍", "🥳", "🚀", "🎉", "🌟", "💡", "💻", "🤔", "👍", "💯", "🐱", "🐶", "🍕", "❤️")
+YES_NO_ANSWERS = ("Yes", "No", "Maybe", "Definitely", "Not a chance", "Ask again later", "Signs point to yes",
+                  "Outlook not so good")
+FIRST_NAMES_MALE = ("James", "John", "Robert", "Michael", "William", "David", "Richard", "Joseph", "Charles",
+                    "Thomas")
+FIRST_NAMES_FEMALE = ("Mary", "Patricia", "Jennifer", "Linda", "Elizabeth", "Barbara", "Susan", "Jessica", "Sarah",
+                      "Karen")
+LAST_NAMES = ("Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+              "Martinez")
+
+
+def first_names_for(gender: str | None) -> tuple:
+    if gender and gender.lower() == "male":
+        return FIRST_NAMES_MALE
+    if gender and gender.lower() == "female":
+        return FIRST_NAMES_FEMALE
+    if gender is None or gender.lower() == "any":
+        return FIRST_NAMES_MALE + FIRST_NAMES_FEMALE
+    raise HTTPException(status_code=400,
+                        detail="Invalid gender. Supported: 'male', 'female', or leave blank/ 'any'.")
 
 
 # --- Models for new endpoints ---
@@ -41,9 +61,10 @@ dog_facts_data = load_json_data("dog_facts.json")  # Load dog facts
 # --- Endpoints (Existing) ---
 @router.get("/quote/famous")
 async def get_famous_quote():
-    if not famous_quotes_data:
+    quotes = await famous_quotes_data.aget()
+    if not quotes:
         raise HTTPException(status_code=503, detail="Famous quotes data is unavailable.")
-    return random.choice(famous_quotes_data)
+    return record_dict(random.choice(quotes))
 
 
 @router.get("/quote/kanye")
@@ -59,9 +80,10 @@ async def get_kanye_quote():
 
 @router.get("/joke/bad")
 async def get_bad_joke():
-    if not bad_jokes_data:
+    jokes = await bad_jokes_data.aget()
+    if not jokes:
         raise HTTPException(status_code=503, detail="Bad jokes data is unavailable.")
-    return {"joke": random.choice(bad_jokes_data)}
+    return {"joke": random.choice(jokes)}
 
 
 @router.get("/random/color-hex")
@@ -72,15 +94,12 @@ async def random_hex_color():
 
 @router.get("/random/emoji")
 async def random_emoji():
-    emojis = ["😀", "😂", "😍", "🥳", "🚀", "🎉", "🌟", "💡", "💻", "🤔", "👍", "💯", "🐱", "🐶", "🍕", "❤️"]
-    return {"emoji": random.choice(emojis)}
+    return {"emoji": random.choice(EMOJIS)}
 
 
 @router.get("/random/yes-no")
 async def random_yes_no():
-    answers = ["Yes", "No", "Maybe", "Definitely", "Not a chance", "Ask again later", "Signs point to yes",
-               "Outlook not so good"]
-    return {"answer": random.choice(answers)}
+    return {"answer": random.choice(YES_NO_ANSWERS)}
 
 
 @router.get("/random/name")
@@ -88,25 +107,8 @@ async def random_name_generator(
         gender: str = Query(None,
                             description="Optional: 'male', 'female', or leave blank for any. Supported: male, female, any")
 ):
-    first_names_male = ["James", "John", "Robert", "Michael", "William", "David", "Richard", "Joseph", "Charles",
-                        "Thomas"]
-    first_names_female = ["Mary", "Patricia", "Jennifer", "Linda", "Elizabeth", "Barbara", "Susan", "Jessica", "Sarah",
-                          "Karen"]
-    last_names = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
-                  "Martinez"]
-
-    first_name = ""
-    if gender and gender.lower() == "male":
-        first_name = random.choice(first_names_male)
-    elif gender and gender.lower() == "female":
-        first_name = random.choice(first_names_female)
-    elif gender is None or gender.lower() == "any":
-        first_name = random.choice(first_names_male + first_names_female)
-    else:
-        raise HTTPException(status_code=400,
-                            detail="Invalid gender. Supported: 'male', 'female', or leave blank/ 'any'.")
-
-    last_name = random.choice(last_names)
+    first_name = random.choice(first_names_for(gender))
+    last_name = random.choice(LAST_NAMES)
     return {"first_name": first_name, "last_name": last_name, "full_name": f"{first_name} {last_name}"}
 
 
@@ -138,16 +140,23 @@ async def dice_roller(
 
 @router.get("/fact/cat")
 async def get_cat_fact():
-    if not cat_facts_data:
+    facts = await cat_facts_data.aget()
+    if not facts:
         raise HTTPException(status_code=503, detail="Cat facts data is unavailable or empty.")
-    return {"fact": random.choice(cat_facts_data)}
+    return {"fact": random.choice(facts)}
 
 
 @router.get("/fact/dog")
 async def get_dog_fact():
-    if not dog_facts_data:
+    facts = await dog_facts_data.aget()
+    if not facts:
         raise HTTPException(status_code=503, detail="Dog facts data is unavailable or empty.")
-    return {"fact": random.choice(dog_facts_data)}
+    return {"fact": random.choice(facts)}
+
+
+def _password_classes(include_uppercase: bool, include_digits: bool, include_symbols: bool) -> tuple:
+    flags = {"lowercase": True, "uppercase": include_uppercase, "digits": include_digits, "symbols": include_symbols}
+    return tuple(name for name in CHARACTER_CLASSES if flags[name])
 
 
 @router.get("/random/password")
@@ -155,57 +164,164 @@ async def random_password_generator(
         length: int = Query(12, ge=8, le=128, description="Length of the password (8-128)"),
         include_uppercase: bool = Query(True, description="Include uppercase letters"),
         include_digits: bool = Query(True, description="Include digits"),
-        include_symbols: bool = Query(True, description="Include symbols")
+        include_symbols: bool = Query(True, description="Include symbols"),
+        require_each_class: bool = Query(True, description="Guarantee at least one character from each included type")
 ):
-    character_pool = string.ascii_lowercase
-    if include_uppercase:
-        character_pool += string.ascii_uppercase
-    if include_digits:
-        character_pool += string.digits
-    if include_symbols:
-        character_pool += string.punctuation
-
-    if not character_pool:  # Should not happen with defaults, but good for robustness
-        raise HTTPException(status_code=400,
-                            detail="Cannot generate password with an empty character pool. Select at least one character type.")
-
-    password = "".join(random.choice(character_pool) for _ in range(length))
+    # Drawn from os.urandom (via app.services.secure_random), never from the non-cryptographic `random` module.
+    classes = _password_classes(include_uppercase, include_digits, include_symbols)
+    password = generate_passwords(length, 1, classes, require_each_class)[0]
     return {"length": length, "password": password,
             "criteria": {"uppercase": include_uppercase, "digits": include_digits, "symbols": include_symbols}}
 
 
+@router.get("/random/password/batch")
+async def random_password_batch(
+        count: int = Query(100, ge=1, le=100_000, description="Number of passwords"),
+        length: int = Query(12, ge=8, le=128, description="Length of each password (8-128)"),
+        include_uppercase: bool = Query(True, description="Include uppercase letters"),
+        include_digits: bool = Query(True, description="Include digits"),
+        include_symbols: bool = Query(True, description="Include symbols"),
+        require_each_class: bool = Query(True, description="Guarantee at least one character from each included type")
+):
+    classes = _password_classes(include_uppercase, include_digits, include_symbols)
+    passwords = generate_passwords(length, count, classes, require_each_class)
+    return trusted_json({"length": length, "count": count, "passwords": passwords,
+                         "criteria": {"uppercase": include_uppercase, "digits": include_digits,
+                                      "symbols": include_symbols}})
+
+
+@router.get("/random/token")
+async def random_token_generator(
+        kind: str = Query("urlsafe", description="Token type: 'hex', 'urlsafe' or 'alphabet'"),
+        nbytes: int = Query(32, ge=8, le=256, description="Bytes of entropy (hex, urlsafe)"),
+        length: int = Query(32, ge=8, le=256, description="Token length (alphabet)"),
+        alphabet: str = Query(None, min_length=2, max_length=256,
+                              description="Custom ASCII alphabet of unique characters (alphabet)"),
+        prefix: str = Query("", max_length=32, description="Prefix for API keys, e.g. 'sk_live_'"),
+        count: int = Query(1, ge=1, le=100_000, description="Number of tokens")
+):
+    if kind not in ("hex", "urlsafe", "alphabet"):
+        raise HTTPException(status_code=400, detail="Invalid kind. Supported: hex, urlsafe, alphabet.")
+    if kind == "alphabet" and not alphabet:
+        raise HTTPException(status_code=400, detail="kind=alphabet requires an 'alphabet' parameter.")
+    try:
+        tokens = generate_tokens(kind, count, nbytes=nbytes, length=length, alphabet=alphabet, prefix=prefix)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return trusted_json({"kind": kind, "count": count, "tokens": tokens})
+
+
+# --- Bulk generation ---
+BULK_KINDS = ("coin", "dice", "color-hex", "emoji", "yes-no", "name", "famous-quote", "bad-joke", "cat-fact",
+              "dog-fact")
+BULK_DATASETS = {"famous-quote": famous_quotes_data, "bad-joke": bad_jokes_data, "cat-fact": cat_facts_data,
+                 "dog-fact": dog_facts_data}
+BULK_CHUNK_SIZE = 10_000
+MAX_BULK_JSON = 100_000
+MAX_BULK_NDJSON = 1_000_000
+
+
+def generate_bulk(kind: str, count: int, rng: random.Random, population, first_names: tuple):
+    # Chunked batched sampling: one choices()/randbytes() call per chunk instead of one draw per item.
+    # JSON and NDJSON consume the same chunks, so a seed reproduces identical results in both formats.
+    for start in range(0, count, BULK_CHUNK_SIZE):
+        k = min(BULK_CHUNK_SIZE, count - start)
+        if kind == "color-hex":
+            hex_digits = rng.randbytes(3 * k).hex().upper()
+            yield [f"#{hex_digits[i:i + 6]}" for i in range(0, 6 * k, 6)]
+        elif kind == "name":
+            yield [{"first_name": first, "last_name": last, "full_name": f"{first} {last}"}
+                   for first, last in zip(rng.choices(first_names, k=k), rng.choices(LAST_NAMES, k=k))]
+        elif kind == "famous-quote":
+            yield [record_dict(quote) for quote in rng.choices(population, k=k)]
+        else:
+            yield rng.choices(population, k=k)
+
+
+@router.get("/bulk")
+async def bulk_random(
+        kind: str = Query(..., description=f"What to generate. Supported: {', '.join(BULK_KINDS)}"),
+        count: int = Query(100, ge=1, le=MAX_BULK_NDJSON,
+                           description=f"Number of results (max {MAX_BULK_JSON} for json, {MAX_BULK_NDJSON} for ndjson)"),
+        seed: int = Query(None, description="Optional seed for reproducible results"),
+        output_format: str = Query("json", alias="format", description="Output: 'json' or 'ndjson' (streamed)"),
+        sides: int = Query(6, ge=2, le=1000, description="Die sides (kind=dice)"),
+        gender: str = Query(None, description="male, female or any (kind=name)")
+):
+    if kind not in BULK_KINDS:
+        raise HTTPException(status_code=400, detail=f"Invalid kind. Supported: {', '.join(BULK_KINDS)}.")
+    if output_format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="Invalid format. Supported: json, ndjson.")
+    if output_format == "json" and count > MAX_BULK_JSON:
+        raise HTTPException(status_code=400, detail=f"count above {MAX_BULK_JSON} requires format=ndjson.")
+
+    if kind in BULK_DATASETS:
+        population = await BULK_DATASETS[kind].aget()
+        if not population:
+            raise HTTPException(status_code=503, detail=f"Data for '{kind}' is unavailable or empty.")
+    else:
+        population = {"coin": ("Heads", "Tails"), "dice": range(1, sides + 1), "emoji": EMOJIS,
+                      "yes-no": YES_NO_ANSWERS}.get(kind)
+    first_names = first_names_for(gender) if kind == "name" else ()
+    # Without an explicit seed, pick one and report it so any run can be reproduced.
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 63)
+    chunks = generate_bulk(kind, count, random.Random(seed), population, first_names)
+
+    if output_format == "ndjson":
+        lines = ("".join(json.dumps(item) + "\n" for item in chunk) for chunk in chunks)
+        return StreamingResponse(lines, media_type="application/x-ndjson", headers={"X-Random-Seed": str(seed)})
+    return trusted_json({"kind": kind, "count": count, "seed": seed,
+                         "results": [item for chunk in chunks for item in chunk]})
+
+
+async def fetch_chuck_norris_joke(category: str | None) -> dict:
+    params = {"category": category} if category else {}
+    joke_data = await upstream_client.get_json(f"{CHUCK_NORRIS_API_URL}/jokes/random", params=params)
+    return {"joke": joke_data.get("value"), "id": joke_data.get("id"),
+            "categories": joke_data.get("categories", [])}
+
+
+async def fetch_chuck_norris_categories() -> list:
+    return await upstream_client.get_json(f"{CHUCK_NORRIS_API_URL}/jokes/categories")
+
+
+chuck_norris_categories_cache = AsyncTTLCache(ttl=CHUCK_NORRIS_CATEGORIES_TTL,
+                                              stale_ttl=CHUCK_NORRIS_CATEGORIES_STALE_TTL)
+chuck_norris_joke_pool = PrefetchPool(fetch_chuck_norris_joke, size=CHUCK_NORRIS_POOL_SIZE,
+                                      low_water=CHUCK_NORRIS_POOL_LOW_WATER)
+
+
 @router.get("/joke/chuck-norris")
 async def get_chuck_norris_joke(category: str = Query(None,
                                                       description="Optional category for the joke (e.g., dev, movie, food). See /joke/chuck-norris/categories for list.")):
-    base_url = "https://api.chucknorris.io/jokes/random"
-    params = {}
-    if category:
-        params["category"] = category
-
     try:
-        response = requests.get(base_url, params=params, timeout=5)  # Added timeout
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        joke_data = response.json()
-        return {"joke": joke_data.get("value"), "id": joke_data.get("id"),
-                "categories": joke_data.get("categories", [])}
-    except requests.Timeout:
+        # Served from a per-category pool of prefetched jokes; the pool is refilled in the background.
+        return await chuck_norris_joke_pool.get(category.lower() if category else None)
+    except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Request to Chuck Norris API timed out.")
-    except requests.RequestException as e:
+    except httpx.HTTPStatusError as e:
         # Check for specific error from API if category is invalid
-        if e.response is not None and e.response.status_code == 404 and "No jokes found for category" in e.response.text:
+        if e.response.status_code == 404 and "No jokes found for category" in e.response.text:
             raise HTTPException(status_code=404,
                                 detail=f"No jokes found for category '{category}'. Try /fun/joke/chuck-norris/categories for available ones.")
         raise HTTPException(status_code=503, detail=f"Could not fetch joke from Chuck Norris API: {str(e)}")
+    except (httpx.HTTPError, ValueError) as e:
+        raise HTTPException(status_code=503, detail=f"Could not fetch joke from Chuck Norris API: {str(e)}")
 
 
 @router.get("/joke/chuck-norris/categories")
 async def get_chuck_norris_joke_categories():
     try:
-        response = requests.get("https://api.chucknorris.io/jokes/categories", timeout=5)
-        response.raise_for_status()
-        categories = response.json()
+        categories = await chuck_norris_categories_cache.get("categories", fetch_chuck_norris_categories)
         return {"categories": categories}
-    except requests.Timeout:
+    except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Request to Chuck Norris API timed out.")
-    except requests.RequestException as e:
-        raise HTTPException(status_code=503, detail=f"Could not fetch categories from Chuck Norris API: {str(e)}")
\ No newline at end of file
+    except (httpx.HTTPError, ValueError) as e:
+        raise HTTPException(status_code=503, detail=f"Could not fetch categories from Chuck Norris API: {str(e)}")
+
+
+@router.get("/joke/chuck-norris/cache-stats")
+async def get_chuck_norris_cache_stats():
+    return {"categories_cache": chuck_norris_categories_cache.stats(),
+            "joke_pool": chuck_norris_joke_pool.stats()}
@@ -1,17 +1,33 @@
 # app/routers/text_manipulation.py
-import re
 import json
+import codecs
 import csv
 import io
 import random
-import hashlib
 import base64
 import uuid as uuid_generator_lib  # Alias to avoid conflict
-from fastapi import APIRouter, Query, HTTPException, Body
+from fastapi import APIRouter, Query, HTTPException, Body, Request, Response, Header
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-import markdown as md_parser
 
-router = APIRouter()
+from app.services.body_stream import BodyStreamingResponse, open_body_stream, raw_body_openapi
+from app.services.base64_stream import CODECS as BASE64_CODECS, SUPPORTED_VARIANTS as BASE64_VARIANTS, transcode
+from app.services.csv_stream import iter_csv_records, render_records
+from app.services.json_stream import fast_path_available, reformat_stream
+from app.services.markdown_renderer import markdown_renderer, normalize_extensions
+from app.services.response_cache import CachedRoute, cached, etag_matches
+from app.services.responses import trusted_json
+from app.services.hashing import HASH_ALGORITHMS, SUPPORTED_ALGORITHMS, normalize_algorithms, hash_stream, hash_many
+from app.services.text_stats import stats_stream
+from app.services.text_ops import (CASE_TARGETS, SUPPORTED_OPERATIONS, compile_pipeline, convert_case, convert_many,
+                                   iter_pipeline, slugify, word_stats)
+
+router = APIRouter(route_class=CachedRoute)  # Routes marked @cached serve repeat requests from memory
+
+
+MAX_PIPELINE_JSON = 100_000
+MAX_PIPELINE_NDJSON = 1_000_000
 
 
 # --- Models (Existing and New) ---
@@ -19,6 +35,11 @@ class TextRequest(BaseModel):
     text: str = Field(..., example="Hello World Example")
 
 
+class CaseBatchRequest(BaseModel):
+    texts: list[str] = Field(..., max_length=1_000_000, example=["Hello World", "Café Crème"])
+    to_case: str = Field("snakecase", example="snakecase", description=f"Target case: {', '.join(CASE_TARGETS)}")
+
+
 class SlugRequest(BaseModel):
     text: str = Field(..., example="My Awesome Title!")
 
@@ -33,6 +54,14 @@ class CsvToJsonRequest(BaseModel):
 
 class MarkdownToHtmlRequest(BaseModel):
     markdown_text: str = Field(..., example="# Hello\nThis is **markdown**.")
+    extensions: list[str] | None = Field(None, example=["extra", "toc"],
+                                         description="Optional Python-Markdown extensions (e.g. extra, tables, toc)")
+
+
+class MarkdownBatchRequest(BaseModel):
+    documents: list[str] = Field(..., max_length=10_000, example=["# One", "**Two**"])
+    extensions: list[str] | None = Field(None, example=["extra"],
+                                         description="Optional Python-Markdown extensions applied to every document")
 
 
 class UnitConversionRequest(BaseModel):
@@ -50,7 +79,14 @@ class CalculatorRequest(BaseModel):
 
 class HashRequest(BaseModel):
     text: str = Field(..., example="my secret data")
-    algorithm: str = Field("sha256", example="sha256", description="Supported: md5, sha1, sha256, sha512")
+    algorithm: str = Field("sha256", example="sha256",
+                           description="Supported: md5, sha1, sha256, sha512, sha3_256, blake2b, blake2s")
+
+
+class HashBatchRequest(BaseModel):
+    texts: list[str] = Field(..., max_length=100_000, example=["first", "second"])
+    algorithms: list[str] = Field(["sha256"], example=["md5", "sha256"],
+                                  description="Supported: md5, sha1, sha256, sha512, sha3_256, blake2b, blake2s")
 
 
 class Base64Request(BaseModel):
@@ -58,45 +94,42 @@ class Base64Request(BaseModel):
     action: str = Field("encode", example="encode", description="Supported: encode, decode")
 
 
-# --- Helper Functions (Existing and New) ---
-def slugify(text: str) -> str:
-    text = text.lower()
-    text = re.sub(r'[^a-z0-9\s-]', '', text)
-    text = re.sub(r'\s+', '-', text)
-    text = re.sub(r'-+', '-', text)
-    return text.strip('-')
+class PipelineStep(BaseModel):
+    op: str = Field(..., example="hash")
+    options: dict = Field({}, example={"algorithm": "sha256"},
+                          description="case: to_case; hash: algorithm; base64: action, variant")
+
+
+class PipelineRequest(BaseModel):
+    texts: list[str] = Field(..., max_length=MAX_PIPELINE_NDJSON, example=["My Awesome Title!", "Another One"])
+    steps: list[str | PipelineStep] = Field(..., min_length=1, max_length=32,
+                                            example=["slug", {"op": "hash", "options": {"algorithm": "sha256"}}],
+                                            description=f"Applied in order. Operations: {SUPPORTED_OPERATIONS}")
 
 
 # --- Endpoints (Existing) ---
 @router.post("/case-converter")
+@cached(ttl=3600, max_entries=4096)
 async def case_converter(
         data: TextRequest,
         to_case: str = Query(
             "uppercase",
-            description="Target case: uppercase, lowercase, titlecase, camelcase, snakecase, kebabcase"
+            description=f"Target case: {', '.join(CASE_TARGETS)}"
         )
 ):
-    text = data.text
-    if to_case == "uppercase":
-        return {"original": text, "converted": text.upper()}
-    elif to_case == "lowercase":
-        return {"original": text, "converted": text.lower()}
-    elif to_case == "titlecase":
-        return {"original": text, "converted": text.title()}
-    elif to_case == "camelcase":
-        words = re.split(r'[\s_-]+', text)
-        # Handle empty string or string with only delimiters
-        if not any(words):
-            return {"original": text, "converted": ""}
-        first_word = words[0].lower()
-        other_words = "".join(word.capitalize() for word in words[1:] if word)
-        return {"original": text, "converted": first_word + other_words}
-    elif to_case == "snakecase":
-        return {"original": text, "converted": slugify(text).replace('-', '_')}
-    elif to_case == "kebabcase":
-        return {"original": text, "converted": slugify(text)}
-    else:
+    try:
+        return {"original": data.text, "converted": convert_case(data.text, to_case)}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid 'to_case' parameter.")
+
+
+@router.post("/case-converter/batch")
+async def case_converter_batch(data: CaseBatchRequest):
+    # Results only, in input order; the list is converted as a whole (see convert_many) in the threadpool.
+    if data.to_case not in CASE_TARGETS:
         raise HTTPException(status_code=400, detail="Invalid 'to_case' parameter.")
+    results = await run_in_threadpool(convert_many, data.texts, data.to_case)
+    return trusted_json({"to_case": data.to_case, "results": results})
 
 
 @router.post("/string-reverser")
@@ -106,21 +139,25 @@ async def string_reverser(data: TextRequest):
 
 @router.post("/word-counter")
 async def word_counter(data: TextRequest):
-    text = data.text
-    words = len(text.split()) if text else 0  # Handle empty string
-    characters = len(text)
-    characters_no_space = len(text.replace(" ", ""))
-    lines = len(text.splitlines()) if text else 0  # Handle empty string
-    return {
-        "text": text,
-        "word_count": words,
-        "character_count_with_spaces": characters,
-        "character_count_without_spaces": characters_no_space,
-        "line_count": lines,
-    }
+    return {"text": data.text, **word_stats(data.text)}
+
+
+@router.post("/word-counter/stream", openapi_extra=raw_body_openapi("text/plain", "application/octet-stream"))
+async def word_counter_stream(
+        request: Request,
+        top: int = Query(0, ge=0, le=1000, description="Also return the N most frequent words (case-insensitive)"),
+        encoding: str = Query("utf-8", description="Text encoding of the upload; undecodable bytes are replaced")
+):
+    # Counts a multipart upload or raw body chunk by chunk; the text is never held in memory or echoed back.
+    try:
+        codecs.getincrementaldecoder(encoding)
+    except LookupError:
+        raise HTTPException(status_code=400, detail=f"Unknown encoding '{encoding}'.")
+    return await stats_stream(await open_body_stream(request, chunk_size=1024 * 1024), top, encoding)
 
 
 @router.post("/slug-generator")
+@cached(ttl=3600, max_entries=4096)
 async def slug_generator(data: SlugRequest):
     return {"original": data.text, "slug": slugify(data.text)}
 
@@ -166,26 +203,109 @@ async def json_pretty_printer(data: JsonPrettyPrintRequest):
         raise HTTPException(status_code=400, detail="Invalid JSON string provided.")
 
 
+@router.post("/json-pretty-printer/stream", openapi_extra=raw_body_openapi("application/json", "application/x-ndjson"))
+async def json_pretty_printer_stream(
+        request: Request,
+        mode: str = Query("pretty", description="'pretty' or 'minify'"),
+        indent: int = Query(4, ge=1, le=8, description="Spaces per level when mode=pretty"),
+        lines: bool = Query(False, description="JSON Lines: any number of documents in, one per line out")
+):
+    # Reformats a raw body or upload while it streams in; the document is never held as a whole.
+    # Key order is kept (no sort_keys, unlike /json-pretty-printer).
+    if mode not in ("pretty", "minify"):
+        raise HTTPException(status_code=400, detail="Invalid mode. Supported: pretty, minify.")
+    pieces = reformat_stream(await open_body_stream(request, chunk_size=1024 * 1024),
+                             indent if mode == "pretty" else 0, lines)
+    # Reformat the first piece before committing to a 200 so early syntax errors still get a clean 400.
+    try:
+        first_piece = await anext(pieces, "")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+
+    async def body():
+        yield first_piece
+        async for piece in pieces:
+            yield piece
+
+    return BodyStreamingResponse(body(), media_type="application/x-ndjson" if lines else "application/json",
+                                 headers={"X-JSON-Serializer": "orjson" if fast_path_available() else "json"})
+
+
 @router.post("/csv-to-json")
 async def csv_to_json_converter(data: CsvToJsonRequest):
     csv_file = io.StringIO(data.csv_data)
     try:
         reader = csv.DictReader(csv_file)
-        json_data = json.dumps(list(reader))
-        return {"csv": data.csv_data, "json": json.loads(json_data)}
+        return {"csv": data.csv_data, "json": list(reader)}
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error converting CSV: {str(e)}")
 
 
+@router.post("/csv-to-json/stream", openapi_extra=raw_body_openapi("text/csv"))
+async def csv_to_json_stream(
+        request: Request,
+        output_format: str = Query("ndjson", alias="format", description="Output: 'ndjson' or 'json' (array)"),
+        sniff: bool = Query(False, description="Detect the delimiter/quoting from the first 64 KB"),
+        header: bool = Query(True, description="First row holds the column names"),
+        infer_types: bool = Query(False, description="Convert numbers, booleans and empty fields (null)")
+):
+    # Accepts a multipart upload or a raw CSV body and converts it row by row; memory stays flat.
+    if output_format not in ("ndjson", "json"):
+        raise HTTPException(status_code=400, detail="Invalid format. Supported: ndjson, json.")
+    chunks = await open_body_stream(request)
+    records = iter_csv_records(chunks, sniff=sniff, header=header, infer_types=infer_types)
+    # Parse the first record before committing to a 200 so early errors (e.g. an oversized record) get a 400.
+    try:
+        first_record = await anext(records, None)
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Error converting CSV: {e}")
+
+    async def all_records():
+        if first_record is not None:
+            yield first_record
+            async for record in records:
+                yield record
+
+    media_type = "application/x-ndjson" if output_format == "ndjson" else "application/json"
+    return BodyStreamingResponse(render_records(all_records(), output_format), media_type=media_type)
+
+
+def _markdown_extensions(extensions) -> tuple:
+    try:
+        return normalize_extensions(extensions)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Markdown extension not allowed: {e}")
+
+
 @router.post("/markdown-to-html")
-async def markdown_to_html_converter(data: MarkdownToHtmlRequest):
-    html_output = md_parser.markdown(data.markdown_text)
-    return {"markdown": data.markdown_text, "html": html_output}
+async def markdown_to_html_converter(data: MarkdownToHtmlRequest, response: Response,
+                                     if_none_match: str | None = Header(None)):
+    extensions = _markdown_extensions(data.extensions)
+    # The ETag is a hash of the source and extensions, so a match is known without rendering.
+    etag = markdown_renderer.etag(data.markdown_text, extensions)
+    # Weak comparison: CompressionMiddleware sends compressed responses with W/"..."
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    html_output = markdown_renderer.render(data.markdown_text, extensions)
+    response.headers["ETag"] = etag
+    return {"html": html_output}  # The source is not echoed back: callers already have it
+
+
+@router.post("/markdown-to-html/batch")
+async def markdown_to_html_batch(data: MarkdownBatchRequest):
+    extensions = _markdown_extensions(data.extensions)
+    return {"html": await markdown_renderer.render_many(data.documents, extensions)}
+
+
+@router.get("/markdown-to-html/cache-stats")
+async def markdown_cache_stats():
+    return markdown_renderer.stats()
 
 
 # --- New Endpoints (TODOs Completed & More) ---
 
 @router.post("/unit-converter")
+@cached(ttl=3600, max_entries=4096)
 async def unit_converter(req_data: UnitConversionRequest):
     value = req_data.value
     from_u = req_data.from_unit.lower()
@@ -284,25 +404,44 @@ async def random_number_generator(
 
 
 @router.post("/hash")
+@cached(ttl=3600, max_entries=4096)
 async def hash_text(req_data: HashRequest):
     text_to_hash = req_data.text.encode('utf-8')  # hashlib works with bytes
     algo = req_data.algorithm.lower()
-    hashed_value = ""
-
-    if algo == "md5":
-        hashed_value = hashlib.md5(text_to_hash).hexdigest()
-    elif algo == "sha1":
-        hashed_value = hashlib.sha1(text_to_hash).hexdigest()
-    elif algo == "sha256":
-        hashed_value = hashlib.sha256(text_to_hash).hexdigest()
-    elif algo == "sha512":
-        hashed_value = hashlib.sha512(text_to_hash).hexdigest()
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported algorithm. Supported: md5, sha1, sha256, sha512.")
+
+    if algo not in HASH_ALGORITHMS:
+        raise HTTPException(status_code=400, detail=f"Unsupported algorithm. Supported: {SUPPORTED_ALGORITHMS}.")
+    hashed_value = HASH_ALGORITHMS[algo](text_to_hash).hexdigest()
 
     return {"original": req_data.text, "algorithm": algo, "hashed_value": hashed_value}
 
 
+@router.post("/hash/stream", openapi_extra=raw_body_openapi("application/octet-stream"))
+async def hash_stream_upload(
+        request: Request,
+        algorithms: str = Query("sha256", example="md5,sha256",
+                                description=f"Comma-separated algorithms, computed in one pass. Supported: {SUPPORTED_ALGORITHMS}")
+):
+    # Accepts a multipart upload or raw body and hashes it chunk by chunk.
+    try:
+        algorithm_list = normalize_algorithms(algorithms)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Unsupported algorithm. Supported: {SUPPORTED_ALGORITHMS}.")
+    hasher = await hash_stream(await open_body_stream(request), algorithm_list)
+    return {"size_bytes": hasher.byte_count, "digests": hasher.hexdigests()}
+
+
+@router.post("/hash/batch")
+async def hash_batch(req_data: HashBatchRequest):
+    try:
+        algorithm_list = normalize_algorithms(req_data.algorithms)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Unsupported algorithm. Supported: {SUPPORTED_ALGORITHMS}.")
+    # Hashing runs in the threadpool so large batches never block the event loop.
+    results = await hash_many(req_data.texts, algorithm_list)
+    return trusted_json({"algorithms": algorithm_list, "results": results})
+
+
 @router.post("/base64")
 async def base64_converter(req_data: Base64Request):
     text = req_data.text
@@ -325,6 +464,71 @@ async def base64_converter(req_data: Base64Request):
     return {"original": text, "action": action, "result": result}
 
 
+@router.post("/base64/stream", openapi_extra=raw_body_openapi("application/octet-stream", "text/plain"))
+async def base64_stream(
+        request: Request,
+        action: str = Query("encode", description="Supported: encode, decode"),
+        variant: str = Query("standard", description=f"Supported: {BASE64_VARIANTS}")
+):
+    # Raw-body (or multipart) streaming variant: binary-safe, no JSON wrapping and no echo of the input.
+    action = action.lower()
+    variant = variant.lower()
+    if action not in ("encode", "decode"):
+        raise HTTPException(status_code=400, detail="Invalid action. Supported: encode, decode.")
+    if variant not in BASE64_CODECS:
+        raise HTTPException(status_code=400, detail=f"Invalid variant. Supported: {BASE64_VARIANTS}.")
+
+    pieces = transcode(await open_body_stream(request), action, variant)
+    # Convert the first block before committing to a 200 so obviously bad input still gets a clean 400.
+    # A decoding error further into the stream aborts the response instead.
+    try:
+        first_piece = await anext(pieces, b"")
+    except ValueError:  # binascii.Error is a ValueError
+        raise HTTPException(status_code=400, detail=f"Invalid {variant} string for decoding.")
+
+    async def body():
+        yield first_piece
+        async for piece in pieces:
+            yield piece
+
+    media_type = "application/octet-stream" if action == "decode" else "text/plain"
+    return BodyStreamingResponse(body(), media_type=media_type)
+
+
+@router.post("/pipeline")
+async def text_pipeline(
+        data: PipelineRequest,
+        output_format: str = Query("json", alias="format", description="Output: 'json' or 'ndjson' (streamed)")
+):
+    # Runs a chain of the text operations over many inputs in one call; results only, inputs are not echoed.
+    if output_format not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="Invalid format. Supported: json, ndjson.")
+    if output_format == "json" and len(data.texts) > MAX_PIPELINE_JSON:
+        raise HTTPException(status_code=400, detail=f"More than {MAX_PIPELINE_JSON} texts requires format=ndjson.")
+    steps = [step if isinstance(step, str) else step.model_dump() for step in data.steps]
+    try:
+        functions = compile_pipeline(steps)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if output_format == "ndjson":
+        # A sync generator: Starlette iterates it in the threadpool, off the event loop.
+        lines = (json.dumps({"index": index, "result": result} if error is None else {"index": index, "error": error})
+                 + "\n" for index, result, error in iter_pipeline(functions, data.texts))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    def run_all():
+        results, errors = [], []
+        for index, result, error in iter_pipeline(functions, data.texts):
+            results.append(result)
+            if error is not None:
+                errors.append({"index": index, "error": error})
+        return results, errors
+
+    results, errors = await run_in_threadpool(run_all)
+    return trusted_json({"count": len(results), "results": results, "errors": errors})
+
+
 @router.get("/uuid")
 async def generate_uuid(version: int = Query(4,
                                              description="UUID version to generate. Currently only v4 is fully supported without extra params.")):
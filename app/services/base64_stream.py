@@ -0,0 +1,48 @@
+# app/services/base64_stream.py
+import base64
+
+_WHITESPACE = b" \t\r\n\v\f"
+_URLSAFE_TO_STANDARD = bytes.maketrans(b"-_", b"+/")
+
+
+def _b64decode(data):
+    return base64.b64decode(data, validate=True)
+
+
+def _urlsafe_b64decode(data):
+    return base64.b64decode(bytes(data).translate(_URLSAFE_TO_STANDARD), validate=True)
+
+
+# variant -> (encode, decode, raw block size, encoded block size, padding applied to the final encoded group)
+CODECS = {
+    "standard": (base64.b64encode, _b64decode, 3, 4, b"="),
+    "urlsafe": (base64.urlsafe_b64encode, _urlsafe_b64decode, 3, 4, b"="),
+    "base32": (base64.b32encode, base64.b32decode, 5, 8, b"="),
+    "base85": (base64.b85encode, base64.b85decode, 4, 5, None),
+}
+SUPPORTED_VARIANTS = ", ".join(CODECS)
+
+
+async def transcode(chunks, action: str, variant: str):
+    """Encode or decode an async stream of bytes in block-aligned pieces.
+
+    Only the unaligned tail of each chunk (fewer than one block) is carried over, so output starts
+    flowing immediately and the payload is never buffered as a whole. Raises binascii.Error on
+    invalid input while decoding.
+    """
+    encode, decode, raw_block, encoded_block, padding = CODECS[variant]
+    decoding = action == "decode"
+    convert, block = (decode, encoded_block) if decoding else (encode, raw_block)
+    carry = b""
+    async for chunk in chunks:
+        if decoding:
+            chunk = chunk.translate(None, _WHITESPACE)  # Line-wrapped input (e.g. MIME) decodes fine
+        data = carry + chunk if carry else chunk
+        cut = len(data) - len(data) % block
+        if cut:
+            yield convert(memoryview(data)[:cut])
+        carry = data[cut:]
+    if carry:
+        if decoding and padding:
+            carry += padding * (-len(carry) % block)  # Tolerate missing padding on the final group
+        yield convert(carry)
@@ -0,0 +1,58 @@
+# app/services/body_stream.py
+import anyio
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.datastructures import UploadFile
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def raw_body_openapi(*media_types: str) -> dict:
+    # Documents a raw or multipart upload body for endpoints that read the request stream themselves.
+    content = {media_type: {"schema": {"type": "string", "format": "binary"}} for media_type in media_types}
+    content["multipart/form-data"] = {"schema": {"type": "object", "properties": {
+        "file": {"type": "string", "format": "binary"}}, "required": ["file"]}}
+    return {"requestBody": {"required": True, "content": content}}
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """StreamingResponse for handlers that keep reading the request body while the response streams.
+
+    Starlette's disconnect listener calls receive() concurrently and would swallow the remaining body
+    messages, so it is disabled here; request.stream() raises ClientDisconnect on its own instead.
+    """
+
+    async def listen_for_disconnect(self, receive) -> None:
+        await anyio.sleep_forever()
+
+
+async def _iter_upload(upload: UploadFile, chunk_size: int):
+    try:
+        while chunk := await upload.read(chunk_size):
+            yield chunk
+    finally:
+        await upload.close()
+
+
+async def _iter_request(request: Request):
+    async for chunk in request.stream():
+        if chunk:
+            yield chunk
+
+
+async def open_body_stream(request: Request, field: str = "file", chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Return an async iterator over the uploaded file (multipart) or the raw request body.
+
+    Multipart files are spooled to disk by the form parser and read back in chunks; raw bodies are
+    read straight off the connection. Either way the payload is never held in memory as a whole.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get(field)
+        if not isinstance(upload, UploadFile):
+            upload = next((value for value in form.values() if isinstance(value, UploadFile)), None)
+        if upload is None:
+            raise HTTPException(status_code=400, detail=f"Multipart body must include a file field ('{field}').")
+        return _iter_upload(upload, chunk_size)
+    return _iter_request(request)
@@ -0,0 +1,138 @@
+# app/services/cache.py
+import asyncio
+import time
+from collections import Counter, deque
+
+
+def _consume_exception(task: asyncio.Task):
+    # Background tasks nobody awaits must still have their exception retrieved.
+    if not task.cancelled():
+        task.exception()
+
+
+class AsyncTTLCache:
+    """Async TTL cache with stale-while-revalidate and singleflight loading.
+
+    Fresh entries are served directly. Entries past `ttl` but within `stale_ttl` are served
+    as-is while one background refresh runs. Concurrent misses for the same key share a single
+    call to the loader.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0.0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: dict = {}  # key -> (value, stored_at)
+        self._inflight: dict = {}  # key -> asyncio.Task
+        self._counters = Counter()
+
+    async def get(self, key, loader):
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age < self.ttl:
+                self._counters["hits"] += 1
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self._counters["stale_hits"] += 1
+                self.refresh(key, loader)
+                return value
+        self._counters["misses"] += 1
+        return await asyncio.shield(self._load(key, loader))
+
+    def refresh(self, key, loader):
+        if key not in self._inflight:
+            self._counters["refreshes"] += 1
+            self._load(key, loader).add_done_callback(_consume_exception)
+
+    def _load(self, key, loader) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is not None:
+            self._counters["coalesced"] += 1
+            return task
+        task = self._inflight[key] = asyncio.ensure_future(self._run(key, loader))
+        return task
+
+    async def _run(self, key, loader):
+        try:
+            value = await loader()
+        except Exception:
+            self._counters["errors"] += 1
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        self._entries[key] = (value, time.monotonic())
+        return value
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "ttl_seconds": self.ttl, "stale_ttl_seconds": self.stale_ttl,
+                "hits": self._counters["hits"], "stale_hits": self._counters["stale_hits"],
+                "misses": self._counters["misses"], "coalesced": self._counters["coalesced"],
+                "refreshes": self._counters["refreshes"], "errors": self._counters["errors"]}
+
+
+class PrefetchPool:
+    """Per-key pools of prefetched items, refilled in bulk in the background.
+
+    `fetch_one(key)` produces a single item. A pool is only created for a key after a direct
+    fetch for it succeeded, so invalid keys never trigger background refills.
+    """
+
+    def __init__(self, fetch_one, size: int = 20, low_water: int = 5):
+        self.size = size
+        self.low_water = low_water
+        self._fetch_one = fetch_one
+        self._pools: dict = {}  # key -> deque of items
+        self._refilling: dict = {}  # key -> asyncio.Task
+        self._counters = Counter()
+
+    async def get(self, key):
+        pool = self._pools.get(key)
+        if pool:
+            self._counters["hits"] += 1
+            item = pool.popleft()
+            if len(pool) <= self.low_water:
+                self._schedule_refill(key)
+            return item
+        self._counters["misses"] += 1
+        item = await self._fetch_one(key)
+        self._pools.setdefault(key, deque())
+        self._schedule_refill(key)
+        return item
+
+    def _schedule_refill(self, key):
+        if key not in self._refilling:
+            task = self._refilling[key] = asyncio.ensure_future(self._refill(key))
+            task.add_done_callback(_consume_exception)
+
+    async def _refill(self, key):
+        try:
+            pool = self._pools[key]
+            missing = self.size - len(pool)
+            if missing <= 0:
+                return
+            self._counters["refills"] += 1
+            results = await asyncio.gather(*(self._fetch_one(key) for _ in range(missing)), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    self._counters["errors"] += 1
+                else:
+                    pool.append(result)
+                    self._counters["prefetched"] += 1
+        finally:
+            self._refilling.pop(key, None)
+
+    def clear(self):
+        self._pools.clear()
+
+    def stats(self) -> dict:
+        return {"pools": {str(key): len(pool) for key, pool in self._pools.items()}, "pool_size": self.size,
+                "low_water": self.low_water, "hits": self._counters["hits"], "misses": self._counters["misses"],
+                "refills": self._counters["refills"], "prefetched": self._counters["prefetched"],
+                "errors": self._counters["errors"]}
@@ -0,0 +1,256 @@
+# app/services/compression.py
+import os
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+
+# Optional encoders; gzip (zlib) is always available.
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION", "1") != "0"
+MINIMUM_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # Smaller bodies fit in a packet or two anyway
+THREAD_MINIMUM_SIZE = 256 * 1024  # Bodies/chunks at least this large are compressed off the event loop
+# Static payloads (@cached(precompress=True) routes) are compressed once, at the highest level, and kept
+# (bounded by total bytes)
+PRECOMPRESSED_CACHE_BYTES = int(os.getenv("PRECOMPRESSED_CACHE_BYTES", str(16 * 1024 * 1024)))
+PRECOMPRESS_MAX_BODY = 1024 * 1024
+
+COMPRESSIBLE_TYPES = frozenset(("application/json", "application/x-ndjson", "application/javascript",
+                                "application/xml", "application/csv", "image/svg+xml"))
+
+
+class Codec:
+    """One content-coding: whole-body compression plus a sync-flushing stream for chunked responses."""
+
+    def __init__(self, name: str, level: int, static_level: int):
+        self.name = name
+        self.level = level  # Per-response compression: fast
+        self.static_level = static_level  # Precompressed bodies: compressed once, so as small as possible
+
+    def compress(self, data: bytes, level: int) -> bytes:
+        raise NotImplementedError
+
+    def stream(self):
+        """Returns (compress_chunk, finish); each compressed chunk is flushed so clients can decode it now."""
+        raise NotImplementedError
+
+
+class GzipCodec(Codec):
+    def compress(self, data: bytes, level: int) -> bytes:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        return compressor.compress(data) + compressor.flush()
+
+    def stream(self):
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return (lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+class BrotliCodec(Codec):
+    def compress(self, data: bytes, level: int) -> bytes:
+        return brotli.compress(data, quality=level)
+
+    def stream(self):
+        compressor = brotli.Compressor(quality=self.level)
+        return (lambda chunk: compressor.process(chunk) + compressor.flush()), compressor.finish
+
+
+class ZstdCodec(Codec):
+    def compress(self, data: bytes, level: int) -> bytes:
+        return zstandard.ZstdCompressor(level=level).compress(data)
+
+    def stream(self):
+        compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+        return ((lambda chunk: compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)),
+                compressor.flush)
+
+
+# In order of preference when the client accepts several with the same q-value
+CODECS = {}
+if zstandard is not None:
+    CODECS["zstd"] = ZstdCodec("zstd", level=3, static_level=19)
+if brotli is not None:
+    CODECS["br"] = BrotliCodec("br", level=4, static_level=11)
+CODECS["gzip"] = GzipCodec("gzip", level=6, static_level=9)
+
+
+@lru_cache(maxsize=256)  # Clients send a handful of distinct Accept-Encoding values
+def negotiate(accept_encoding: str) -> Codec | None:
+    qualities = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip()] = quality
+    best, best_quality = None, 0.0
+    for name, codec in CODECS.items():
+        quality = qualities.get(name, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = codec, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.partition(";")[0].strip().lower()
+    return (media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+            or media_type.endswith("+json") or media_type.endswith("+xml"))
+
+
+class PrecompressedCache:
+    """Compressed bodies keyed by (strong ETag, coding), LRU-bounded by their total size."""
+
+    def __init__(self, max_bytes: int = PRECOMPRESSED_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, etag: str, codec: Codec, body: bytes) -> bytes:
+        key = (etag, codec.name)
+        compressed = self._entries.get(key)
+        if compressed is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return compressed
+        self.misses += 1
+        # Top levels are slow (brotli 11, zstd 19), but this runs once per body
+        compressed = await run_in_threadpool(codec.compress, body, codec.static_level)
+        if len(compressed) <= self.max_bytes:
+            self._entries[key] = compressed
+            self.size += len(compressed)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+        return compressed
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self.size, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+
+precompressed = PrecompressedCache()
+
+
+class CompressionMiddleware:
+    """Pure ASGI response compression (zstd, br, gzip) negotiated from Accept-Encoding.
+
+    Text-like responses of at least `minimum_size` bytes are compressed. Streamed responses are compressed
+    chunk by chunk with a flush after each, so clients see data as soon as it is produced. Responses of
+    routes marked @cached(precompress=True) (see app/services/response_cache.py) are compressed once and
+    served from `precompressed`. A compressed response's ETag is made weak, as it no longer names the
+    identity bytes, and so is the ETag of a 304 sent to a client that would have received a compressed body.
+    """
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        codec = negotiate(accept_encoding) if accept_encoding else None
+        minimum_size = self.minimum_size
+        state = scope.setdefault("state", {})  # Shared with the route's Request: request.state.precompress
+        start = None  # The held http.response.start message, until the first body chunk decides the coding
+        passthrough = False
+        stream = None
+
+        async def compressing_send(message):
+            nonlocal start, passthrough, stream
+            message_type = message["type"]
+            if passthrough:
+                await send(message)
+            elif message_type == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if message["status"] == 304:
+                    # Revalidates a response that varied by Accept-Encoding: match its Vary and (weak) ETag
+                    headers.add_vary_header("Accept-Encoding")
+                    etag = headers.get("etag")
+                    if codec is not None and etag is not None and not etag.startswith("W/"):
+                        headers["ETag"] = "W/" + etag
+                    passthrough = True
+                    await send(message)
+                elif (message["status"] in (204, 206) or message["status"] < 200 or "content-encoding" in headers
+                        or not is_compressible(headers.get("content-type", ""))):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+            elif message_type != "http.response.body":
+                await send(message)
+            elif stream is not None:
+                compress_chunk, finish = stream
+                body = message.get("body", b"")
+                chunk = await run_in_threadpool(compress_chunk, body) if len(body) >= THREAD_MINIMUM_SIZE \
+                    else compress_chunk(body)
+                more_body = message.get("more_body", False)
+                if not more_body:
+                    chunk += finish()
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+            else:
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                if len(body) < minimum_size and not more_body:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                if codec is None:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers["Content-Encoding"] = codec.name
+                etag = headers.get("etag")
+                if etag is not None and not etag.startswith("W/"):
+                    headers["ETag"] = "W/" + etag
+                if more_body:
+                    del headers["Content-Length"]
+                    stream = codec.stream()
+                    await send(start)
+                    await compressing_send(message)
+                    return
+                if (state.get("precompress") and etag is not None and not etag.startswith("W/")
+                        and len(body) <= PRECOMPRESS_MAX_BODY):
+                    body = await precompressed.get(etag, codec, body)
+                elif len(body) >= THREAD_MINIMUM_SIZE:
+                    body = await run_in_threadpool(codec.compress, body, codec.level)
+                else:
+                    body = codec.compress(body, codec.level)
+                headers["Content-Length"] = str(len(body))
+                await send(start)
+                await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, compressing_send)
+
+
+def stats() -> dict:
+    return {"enabled": COMPRESSION_ENABLED, "minimum_size": MINIMUM_SIZE, "codecs": list(CODECS),
+            "precompressed": precompressed.stats()}
@@ -0,0 +1,135 @@
+# app/services/country_index.py
+import bisect
+import unicodedata
+from collections import Counter
+
+
+def normalize(text: str) -> str:
+    # Case- and accent-insensitive form used for every key in the index ("Côte" -> "cote").
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return " ".join("".join(ch for ch in decomposed if not unicodedata.combining(ch)).split())
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CountryIndex:
+    """Lookup structures over the country dataset, built once at load time.
+
+    Exact lookups by name, ISO2, ISO3 and capital are dict hits. Autocomplete uses a sorted term list
+    (binary search for prefixes); every word start of a searchable field is a term. Fuzzy search finds
+    candidate terms through a trigram inverted index and scores them against the query, both as a whole
+    and as a prefix, so a typo in the first few letters typed still matches.
+    """
+
+    SEARCH_FIELDS = ("name", "capital", "iso2", "iso3")
+
+    def __init__(self, countries: list | None):
+        self.countries = countries or []
+        self._by_name: dict = {}
+        self._by_iso2: dict = {}
+        self._by_iso3: dict = {}
+        self._by_capital: dict = {}
+        self._terms: list = []  # sorted (term, country position, field, is full value)
+        self._trigram_postings: dict = {}  # trigram -> list of term ids (positions in _fuzzy_terms)
+        self._fuzzy_terms: list = []  # (term, country position, field)
+
+        for position, country in enumerate(self.countries):
+            for key_map, field in ((self._by_name, "name"), (self._by_iso2, "iso2"),
+                                   (self._by_iso3, "iso3"), (self._by_capital, "capital")):
+                if country.get(field):
+                    key_map.setdefault(normalize(country[field]), country)
+            for field in self.SEARCH_FIELDS:
+                if not country.get(field):
+                    continue
+                words = normalize(country[field]).split(" ")
+                # Every word start is a term, so "kingdom" autocompletes "United Kingdom".
+                for i in range(len(words)):
+                    term = " ".join(words[i:])
+                    self._terms.append((term, position, field, i == 0))
+                    term_id = len(self._fuzzy_terms)
+                    self._fuzzy_terms.append((term, position, field))
+                    for gram in trigrams(term):
+                        self._trigram_postings.setdefault(gram, []).append(term_id)
+        self._terms.sort()
+        self._term_keys = [term for term, _, _, _ in self._terms]
+
+    def __len__(self):
+        return len(self.countries)
+
+    def by_name(self, name: str):
+        return self._by_name.get(normalize(name))
+
+    def by_iso2(self, code: str):
+        return self._by_iso2.get(normalize(code))
+
+    def by_iso3(self, code: str):
+        return self._by_iso3.get(normalize(code))
+
+    def by_capital(self, capital: str):
+        return self._by_capital.get(normalize(capital))
+
+    def by_code(self, code: str):
+        code = code.strip()
+        if len(code) == 2:
+            return self.by_iso2(code)
+        if len(code) == 3:
+            return self.by_iso3(code)
+        return None
+
+    def _prefix_matches(self, query: str):
+        start = bisect.bisect_left(self._term_keys, query)
+        for i in range(start, len(self._terms)):
+            term, position, field, is_full = self._terms[i]
+            if not term.startswith(query):
+                break
+            yield position, field, is_full and term == query
+
+    def _fuzzy_matches(self, query: str, min_score: float):
+        grams = trigrams(query)
+        shared = Counter()
+        for gram in grams:
+            for term_id in self._trigram_postings.get(gram, ()):
+                shared[term_id] += 1
+        # Jaccard similarity to the term and to its prefixes around the query's length (autocomplete input
+        # with a dropped or extra letter). A prefix has at most one trigram the full term lacks (its end), so
+        # terms sharing too few trigrams are skipped without scoring.
+        length = len(query)
+        needed = min_score * len(grams) - 1
+        for term_id, common in shared.items():
+            if common < needed:
+                continue
+            term, position, field = self._fuzzy_terms[term_id]
+            score = 0.0
+            for candidate in {term, term[:length - 1], term[:length], term[:length + 1]}:
+                if candidate:
+                    candidate_grams = trigrams(candidate)
+                    overlap = len(grams & candidate_grams)
+                    score = max(score, overlap / (len(grams) + len(candidate_grams) - overlap))
+            if score >= min_score:
+                yield position, field, score
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.3) -> list:
+        query = normalize(query)
+        if not query:
+            return []
+        # (rank, score, field) per country; lower rank wins: exact, then prefix, then fuzzy.
+        best: dict = {}
+
+        def offer(position, rank, score, field):
+            current = best.get(position)
+            if current is None or (rank, -score) < (current[0], -current[1]):
+                best[position] = (rank, score, field)
+
+        for position, field, exact in self._prefix_matches(query):
+            offer(position, 0 if exact else 1, 1.0, field)
+        for position, field, score in self._fuzzy_matches(query, min_score):
+            offer(position, 2, score, field)
+
+        match_types = ("exact", "prefix", "fuzzy")
+        ranked = sorted(best.items(), key=lambda item: (item[1][0], -item[1][1], self.countries[item[0]]["name"]))
+        return [{"country": self.countries[position], "match": match_types[rank], "matched_on": field,
+                 "score": round(score, 3)}
+                for position, (rank, score, field) in ranked[:limit]]
@@ -0,0 +1,202 @@
+# app/services/csv_stream.py
+import codecs
+import csv
+import json
+import os
+from collections import deque
+
+SNIFF_SAMPLE_BYTES = 64 * 1024
+SNIFF_DELIMITERS = ",;\t|"
+# Longest record (in characters, quoted newlines included) held while waiting for it to complete
+MAX_RECORD_CHARS = int(os.getenv("CSV_MAX_RECORD_CHARS", str(1024 * 1024)))
+
+
+class RecordTooLargeError(csv.Error):
+    pass
+
+
+class _LineFeeder:
+    """Iterator handed to csv.reader; it only ever holds complete records, so the reader never stops mid-row."""
+
+    def __init__(self):
+        self.lines = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.lines:
+            return self.lines.popleft()
+        raise StopIteration
+
+
+def infer_value(value: str):
+    if value == "":
+        return None
+    lowered = value.lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    # Keep "nan"/"inf" as strings; they are not valid JSON numbers.
+    return number if number == number and number not in (float("inf"), float("-inf")) else value
+
+
+def _ends_in_quoted_field(line: str, in_quoted: bool, dialect) -> bool:
+    """Whether a quoted field is still open at the end of `line`, given the state at its start.
+
+    Follows the csv module: a quote only opens a quoted field as the first character of a field (after
+    optional initial spaces), so a stray quote in an unquoted field (`5" tall`) is plain data.
+    """
+    quotechar = getattr(dialect, "quotechar", '"') or '"'
+    if not in_quoted and quotechar not in line:
+        return False  # The common case: no quoting on this line
+    delimiter = dialect.delimiter
+    escapechar = dialect.escapechar
+    position = 0
+    field_start = not in_quoted  # Every line that starts outside quotes starts a new field
+    while True:
+        if in_quoted:
+            close = line.find(quotechar, position)
+            if escapechar:
+                escape = line.find(escapechar, position)
+                if escape != -1 and (close == -1 or escape < close):
+                    position = escape + 2  # Escaped character inside the quotes
+                    continue
+            if close == -1:
+                return True
+            if dialect.doublequote and line.startswith(quotechar, close + 1):
+                position = close + 2  # "" is a literal quote
+                continue
+            in_quoted, field_start, position = False, False, close + 1
+        else:
+            if field_start:
+                if dialect.skipinitialspace:
+                    while line.startswith(" ", position):
+                        position += 1
+                if line.startswith(quotechar, position):
+                    in_quoted, position = True, position + 1
+                    continue
+            delimiter_at = line.find(delimiter, position)
+            if delimiter_at == -1:
+                return False
+            field_start, position = True, delimiter_at + 1
+
+
+def _split_lines(text: str):
+    # Split on "\n" only: str.splitlines() would also break on characters csv treats as field data.
+    lines = text.split("\n")
+    return [line + "\n" for line in lines[:-1]], lines[-1]
+
+
+async def _decoded_lines(chunks, first_text: str, decoder, max_chars: int):
+    lines, pending = _split_lines(first_text)
+    for line in lines:
+        yield line
+    async for chunk in chunks:
+        lines, pending = _split_lines(pending + decoder.decode(chunk))  # pending: an incomplete last line
+        for line in lines:
+            yield line
+        if len(pending) > max_chars:
+            raise RecordTooLargeError(f"Record longer than {max_chars} characters.")
+    lines, pending = _split_lines(pending + decoder.decode(b"", final=True))
+    for line in lines:
+        yield line
+    if pending:
+        yield pending
+
+
+async def iter_csv_records(chunks, sniff: bool = False, header: bool = True, infer_types: bool = False,
+                           max_record_chars: int = MAX_RECORD_CHARS):
+    """Incrementally parse CSV from an async iterator of byte chunks into dict records.
+
+    Records are only handed to csv.reader once no quoted field is left open, so quoted fields may span
+    lines and chunk boundaries. Memory use is bounded by the longest record, not the input size; a record
+    longer than `max_record_chars` raises RecordTooLargeError.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    sample = ""
+    dialect = csv.excel
+    if sniff:
+        # Buffer just enough of the stream for the sniffer; everything else stays streaming.
+        async for chunk in chunks:
+            sample += decoder.decode(chunk)
+            if len(sample) >= SNIFF_SAMPLE_BYTES:
+                break
+        try:
+            dialect = csv.Sniffer().sniff(sample[:SNIFF_SAMPLE_BYTES], delimiters=SNIFF_DELIMITERS)
+        except csv.Error:
+            dialect = csv.excel
+
+    feeder = _LineFeeder()
+    reader = csv.reader(feeder, dialect)
+    record_lines = []
+    record_chars = 0
+    in_quoted = False
+    fieldnames = None
+
+    async for line in _decoded_lines(chunks, sample, decoder, max_record_chars):
+        record_lines.append(line)
+        in_quoted = _ends_in_quoted_field(line, in_quoted, dialect)
+        if in_quoted:
+            record_chars += len(line)
+            if record_chars > max_record_chars:
+                raise RecordTooLargeError(f"Record longer than {max_record_chars} characters.")
+            continue  # Inside a quoted field that continues on the next line
+        feeder.lines.extend(record_lines)
+        record_lines.clear()
+        record_chars = 0
+        for row in reader:
+            if not row:
+                continue  # Blank line
+            if fieldnames is None:
+                if header:
+                    fieldnames = row
+                    continue
+                fieldnames = [f"column_{i + 1}" for i in range(len(row))]
+            if infer_types:
+                row = [infer_value(value) for value in row]
+            record = dict(zip(fieldnames, row))
+            if len(row) < len(fieldnames):
+                for name in fieldnames[len(row):]:
+                    record[name] = None
+            elif len(row) > len(fieldnames):
+                record["_extra"] = row[len(fieldnames):]
+            yield record
+    if record_lines:
+        raise csv.Error("Unexpected end of data: unterminated quoted field.")
+
+
+async def render_records(records, output_format: str = "ndjson", batch_size: int = 500):
+    """Serialize records as NDJSON or a JSON array, in batches, appending an error object if parsing fails."""
+    is_array = output_format == "json"
+    first = True
+    batch = []
+    if is_array:
+        yield "["
+    try:
+        async for record in records:
+            batch.append(json.dumps(record))
+            if len(batch) >= batch_size:
+                yield _join(batch, is_array, first)
+                first = False
+                batch = []
+    except (csv.Error, UnicodeDecodeError) as e:
+        # Headers are already sent, so a parse error mid-stream is reported as the final record.
+        batch.append(json.dumps({"error": f"Error converting CSV: {e}"}))
+    if batch:
+        yield _join(batch, is_array, first)
+    if is_array:
+        yield "]"
+
+
+def _join(batch: list, is_array: bool, first: bool) -> str:
+    if is_array:
+        return ("" if first else ",") + ",".join(batch)
+    return "\n".join(batch) + "\n"
@@ -0,0 +1,269 @@
+# app/services/datasets.py
+import asyncio
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from collections import namedtuple
+from collections.abc import Sequence
+from pathlib import Path
+
+from app.services.lazy import LazyResource
+
+DATA_PATH = Path(__file__).parent.parent / "data"
+# Seconds between on-disk change checks per dataset; 0 checks on every access, negative disables hot reload.
+RELOAD_CHECK_INTERVAL = float(os.getenv("DATASET_RELOAD_INTERVAL", "2"))
+
+SNAPSHOT_SUFFIX = ".snapshot"
+_SNAPSHOT_MAGIC = b"CASNAP1\0"
+_SNAPSHOT_HEADER = struct.Struct("<8sQ")
+
+
+# --- Compact storage ---
+class MappedStrings(Sequence):
+    """Read-only string sequence backed by a memory-mapped snapshot file.
+
+    Layout: magic, count, (count + 1) little-endian uint64 offsets, then the UTF-8 blob. Strings are
+    decoded on access, so a corpus of hundreds of thousands of entries costs almost no Python heap.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count = _SNAPSHOT_HEADER.unpack_from(self._map, 0)
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a dataset snapshot")
+        self._offsets = memoryview(self._map)[_SNAPSHOT_HEADER.size:].cast("B")[:(self._count + 1) * 8].cast("Q")
+        self._blob_start = _SNAPSHOT_HEADER.size + (self._count + 1) * 8
+        self.mapped_bytes = len(self._map)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("snapshot index out of range")
+        start = self._blob_start + self._offsets[index]
+        end = self._blob_start + self._offsets[index + 1]
+        return self._map[start:end].decode("utf-8")
+
+
+def write_snapshot(strings: list, path: Path):
+    encoded = [text.encode("utf-8") for text in strings]
+    offsets = [0]
+    for item in encoded:
+        offsets.append(offsets[-1] + len(item))
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, len(encoded)))
+        f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        for item in encoded:
+            f.write(item)
+    os.replace(tmp_path, path)  # Readers never see a half-written snapshot
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def compact_records(data):
+    """Default storage: tuple of interned strings, or of namedtuples when every record is a dict.
+
+    All records share one namedtuple type over the union of their keys; a key missing from a record is None.
+    Use record_dict() rather than `._asdict()`: records whose keys are not identifiers stay dicts.
+    """
+    if not isinstance(data, list):
+        return data
+    if all(isinstance(item, str) for item in data):
+        return tuple(sys.intern(item) for item in data)
+    if data and all(isinstance(item, dict) for item in data):
+        keys = tuple(dict.fromkeys(key for item in data for key in item))
+        if all(isinstance(key, str) and key.isidentifier() and not key.startswith("_") for key in keys):
+            record_type = namedtuple("Record", keys, defaults=(None,) * len(keys))
+            return tuple(record_type(**{key: _intern(value) for key, value in item.items()}) for item in data)
+        return tuple({sys.intern(k): _intern(v) for k, v in item.items()} for item in data)
+    return tuple(data)
+
+
+def record_dict(record):
+    """A stored record as a dict, whichever form compact_records() chose for it."""
+    return record._asdict() if isinstance(record, tuple) and hasattr(record, "_asdict") else record
+
+
+def deep_sizeof(obj, _seen=None) -> int:
+    # Approximate retained size; shared (e.g. interned) objects are only counted once.
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, MappedStrings):
+        return sys.getsizeof(obj)  # The mapping itself lives in the page cache, not the heap
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_sizeof(getattr(obj, name), seen) for name in obj.__slots__ if hasattr(obj, name))
+    return size
+
+
+# --- Registry ---
+class Dataset(LazyResource):
+    """A JSON file in app/data, loaded on first use and swapped atomically when it changes on disk.
+
+    `transform` turns the parsed JSON into the stored value (compact_records by default). A newer
+    `<stem>.snapshot` next to the JSON is memory-mapped instead for string-list datasets. Async code should
+    use aget(), which loads and reloads in a worker thread instead of on the event loop.
+    """
+
+    kind = "dataset"
+
+    def __init__(self, filename: str, transform=compact_records, group: str = "data"):
+        super().__init__(filename, group)
+        self.path = DATA_PATH / filename
+        self.snapshot_path = self.path.with_suffix(SNAPSHOT_SUFFIX)
+        self._transform = transform
+        self._value = None
+        self._signature = None  # (source path, mtime_ns, size) of what is loaded
+        self._next_check = 0.0
+        self.source = None
+        self.loaded_at = None
+        self.reloads = 0
+        self.memory_bytes = None
+        self.last_error = None
+        self._refresh = None  # asyncio.Task of a background change check started by aget()
+
+    def _current_signature(self):
+        try:
+            json_stat = self.path.stat()
+        except FileNotFoundError:
+            json_stat = None
+        try:
+            snapshot_stat = self.snapshot_path.stat()
+        except FileNotFoundError:
+            snapshot_stat = None
+        if snapshot_stat and (json_stat is None or snapshot_stat.st_mtime_ns >= json_stat.st_mtime_ns):
+            return self.snapshot_path, snapshot_stat.st_mtime_ns, snapshot_stat.st_size
+        if json_stat:
+            return self.path, json_stat.st_mtime_ns, json_stat.st_size
+        return None
+
+    def _read(self, signature):
+        if signature is None:
+            print(f"Warning: Data file {self.name} not found at {self.path}.")
+            self.last_error = "not found"
+            return self._transform([])
+        source = signature[0]
+        if source == self.snapshot_path:
+            return MappedStrings(source)
+        content = source.read_text(encoding="utf-8")
+        if not content.strip():
+            print(f"Warning: Data file {self.name} at {source} is empty.")
+            self.last_error = "empty"
+            return self._transform([])
+        return self._transform(json.loads(content))
+
+    def _reload(self, signature):
+        started = time.perf_counter()
+        self.last_error = None
+        try:
+            value = self._read(signature)
+        except (OSError, ValueError) as e:  # JSONDecodeError is a ValueError
+            print(f"Warning: Could not load data file {self.name} from {signature[0]}. Error: {e}")
+            self.last_error = str(e)
+            if self._value is not None:
+                self._signature = signature  # Keep serving the previous version until the file changes again
+                return
+            value = self._transform([])
+        self.load_seconds = time.perf_counter() - started
+        self.memory_bytes = deep_sizeof(value)
+        self.source = signature[0].name if signature else None
+        self.loaded_at = time.time()
+        if self._value is not None:
+            self.reloads += 1
+        # Single reference swap: concurrent readers see either the old or the new value, never a mix.
+        self._value = value
+        self._signature = signature
+
+    def get(self):
+        now = time.monotonic()
+        if self._value is None or (RELOAD_CHECK_INTERVAL >= 0 and now >= self._next_check):
+            with self._lock:
+                if self._value is None or now >= self._next_check:
+                    self._next_check = now + max(RELOAD_CHECK_INTERVAL, 0)
+                    signature = self._current_signature()
+                    if self._value is None or signature != self._signature:
+                        self._reload(signature)
+        return self._value
+
+    load = get
+
+    async def aget(self):
+        """get() for async routes: parsing and transforming run in a worker thread.
+
+        The first load is awaited. After that, the current value is returned immediately while change checks
+        (and a reload, if the file changed) run in the background; the new value is swapped in when ready.
+        """
+        if self._value is None:
+            return await asyncio.to_thread(self.get)
+        if RELOAD_CHECK_INTERVAL >= 0 and time.monotonic() >= self._next_check and self._refresh is None:
+            self._refresh = asyncio.ensure_future(asyncio.to_thread(self.get))
+            self._refresh.add_done_callback(self._refresh_done)
+        return self._value
+
+    def _refresh_done(self, task: asyncio.Task):
+        self._refresh = None
+        if not task.cancelled():
+            task.exception()  # _reload already logs load errors; never leave the exception unretrieved
+
+    def stats(self) -> dict:
+        value = self._value
+        return {"name": self.name, "loaded": value is not None, "source": self.source,
+                "records": len(value) if value is not None and hasattr(value, "__len__") else None,
+                "memory_bytes": self.memory_bytes,
+                "mapped_bytes": value.mapped_bytes if isinstance(value, MappedStrings) else None,
+                "load_ms": round(self.load_seconds * 1000, 2) if self.load_seconds is not None else None,
+                "loaded_at": self.loaded_at, "reloads": self.reloads, "last_error": self.last_error}
+
+
+class DatasetRegistry:
+    def __init__(self):
+        self._datasets: dict = {}
+
+    def register(self, filename: str, transform=compact_records, group: str = "data") -> Dataset:
+        dataset = self._datasets.get(filename)
+        if dataset is None:
+            dataset = self._datasets[filename] = Dataset(filename, transform=transform, group=group)
+        return dataset
+
+    def get(self, filename: str) -> Dataset:
+        return self._datasets[filename]
+
+    def stats(self) -> list:
+        return [dataset.stats() for dataset in self._datasets.values()]
+
+
+datasets = DatasetRegistry()
+
+
+if __name__ == "__main__":
+    # Usage: python -m app.services.datasets snapshot cat_facts.json [more.json ...]
+    if len(sys.argv) < 3 or sys.argv[1] != "snapshot":
+        sys.exit("Usage: python -m app.services.datasets snapshot <file.json> [...]")
+    for name in sys.argv[2:]:
+        path = DATA_PATH / name
+        strings = json.loads(path.read_text(encoding="utf-8"))
+        if not all(isinstance(item, str) for item in strings):
+            sys.exit(f"{name}: snapshots are only supported for lists of strings")
+        write_snapshot(strings, path.with_suffix(SNAPSHOT_SUFFIX))
+        print(f"Wrote {path.with_suffix(SNAPSHOT_SUFFIX).name} ({len(strings)} entries)")
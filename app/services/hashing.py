@@ -0,0 +1,84 @@
+# app/services/hashing.py
+import asyncio
+import hashlib
+
+from starlette.concurrency import run_in_threadpool
+
+HASH_ALGORITHMS = {
+    "md5": hashlib.md5,
+    "sha1": hashlib.sha1,
+    "sha256": hashlib.sha256,
+    "sha512": hashlib.sha512,
+    "sha3_256": hashlib.sha3_256,
+    "blake2b": hashlib.blake2b,
+    "blake2s": hashlib.blake2s,
+}
+SUPPORTED_ALGORITHMS = ", ".join(HASH_ALGORITHMS)
+
+# hashlib releases the GIL for buffers over 2 KiB; batching updates to this size keeps the thread hops cheap.
+OFFLOAD_BUFFER_SIZE = 1024 * 1024
+BATCH_SLICE_SIZE = 2000
+
+
+def normalize_algorithms(algorithms) -> list:
+    """Lower-case, de-duplicate and validate; raises ValueError naming the first unsupported algorithm."""
+    if isinstance(algorithms, str):
+        algorithms = algorithms.split(",")
+    result = []
+    for name in algorithms:
+        name = name.strip().lower()
+        if not name or name in result:
+            continue
+        if name not in HASH_ALGORITHMS:
+            raise ValueError(name)
+        result.append(name)
+    if not result:
+        raise ValueError("")
+    return result
+
+
+class MultiHasher:
+    """Feeds one stream of bytes into several hashlib objects in a single pass."""
+
+    def __init__(self, algorithms: list):
+        self._hashers = {name: HASH_ALGORITHMS[name]() for name in algorithms}
+        self.byte_count = 0
+
+    def update(self, data):
+        for hasher in self._hashers.values():
+            hasher.update(data)
+        self.byte_count += len(data)
+
+    def hexdigests(self) -> dict:
+        return {name: hasher.hexdigest() for name, hasher in self._hashers.items()}
+
+
+async def hash_stream(chunks, algorithms: list) -> MultiHasher:
+    # Chunks are coalesced into ~1 MiB buffers and hashed in the threadpool, so the event loop never
+    # blocks on hashing and memory stays bounded by the buffer size.
+    hasher = MultiHasher(algorithms)
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= OFFLOAD_BUFFER_SIZE:
+            await run_in_threadpool(hasher.update, bytes(buffer))
+            buffer.clear()
+    if buffer:
+        await run_in_threadpool(hasher.update, bytes(buffer))
+    return hasher
+
+
+def _hash_slice(texts: list, algorithms: list) -> list:
+    constructors = [(name, HASH_ALGORITHMS[name]) for name in algorithms]
+    results = []
+    for text in texts:
+        data = text.encode("utf-8")
+        results.append({name: constructor(data).hexdigest() for name, constructor in constructors})
+    return results
+
+
+async def hash_many(texts: list, algorithms: list) -> list:
+    # Slices run concurrently in the threadpool; order is preserved.
+    slices = [texts[i:i + BATCH_SLICE_SIZE] for i in range(0, len(texts), BATCH_SLICE_SIZE)]
+    parts = await asyncio.gather(*(run_in_threadpool(_hash_slice, part, algorithms) for part in slices))
+    return [digests for part in parts for digests in part]
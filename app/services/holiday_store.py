@@ -0,0 +1,157 @@
+# app/services/holiday_store.py
+import bisect
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from app.services.lazy import lazy_import
+
+holidays = lazy_import("holidays", group="data")
+
+MIN_YEAR = 1950
+MAX_YEAR = 2050
+HOLIDAY_CACHE_SIZE = int(os.getenv("HOLIDAY_CACHE_SIZE", "512"))
+# Comma-separated ISO2 codes to precompute at startup, e.g. "US,GB,CA,IN". Empty disables warm-up.
+HOLIDAY_WARMUP_COUNTRIES = os.getenv("HOLIDAY_WARMUP_COUNTRIES", "")
+
+
+class UnknownCountryError(Exception):
+    pass
+
+
+class YearHolidays:
+    """Precomputed holidays of one country for one year."""
+
+    __slots__ = ("country_code", "year", "by_date", "items", "weekday_ordinals")
+
+    def __init__(self, country_code: str, year: int, calendar):
+        self.country_code = country_code
+        self.year = year
+        self.items = sorted(calendar.items())  # [(date, name)], sorted by date
+        self.by_date = dict(self.items)
+        # Only holidays falling on Mon-Fri affect business-day math; weekends are excluded anyway.
+        self.weekday_ordinals = [day.toordinal() for day, _ in self.items if day.weekday() < 5]
+
+
+def _weekdays_between(start_ordinal: int, end_ordinal: int) -> int:
+    # Number of Mon-Fri days in [start, end). date.fromordinal(1) is a Monday, so ordinal - 1 gives weekday.
+    days = end_ordinal - start_ordinal
+    if days <= 0:
+        return 0
+    full_weeks, remainder = divmod(days, 7)
+    first_weekday = (start_ordinal - 1) % 7
+    return full_weeks * 5 + sum(1 for offset in range(remainder) if (first_weekday + offset) % 7 < 5)
+
+
+class HolidayStore:
+    """LRU-bounded memo of per-(country, year) holiday calendars with business-day queries."""
+
+    def __init__(self, max_entries: int = HOLIDAY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_year(self, country_code: str, year: int) -> YearHolidays:
+        key = (country_code.upper(), year)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        if not MIN_YEAR <= year <= MAX_YEAR:
+            raise ValueError(f"Year {year} is outside the supported range {MIN_YEAR}-{MAX_YEAR}.")
+        try:
+            calendar = holidays.country_holidays(key[0], years=year)
+        except (KeyError, NotImplementedError):  # Older releases raise KeyError, newer NotImplementedError
+            raise UnknownCountryError(key[0])
+        entry = YearHolidays(key[0], year, calendar)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def holiday_name(self, country_code: str, day: date):
+        return self.get_year(country_code, day.year).by_date.get(day)
+
+    def holidays_between(self, country_code: str, start: date, end: date) -> list:
+        # Inclusive of both ends.
+        result = []
+        for year in range(start.year, end.year + 1):
+            items = self.get_year(country_code, year).items
+            low = bisect.bisect_left(items, (start,)) if year == start.year else 0
+            for day, name in items[low:]:
+                if day > end:
+                    break
+                result.append((day, name))
+        return result
+
+    def is_business_day(self, country_code: str, day: date) -> bool:
+        return day.weekday() < 5 and self.holiday_name(country_code, day) is None
+
+    def business_days_between(self, country_code: str, start: date, end: date) -> int:
+        # Business days in [start, end), like numpy.busday_count; negative when end < start.
+        if end < start:
+            return -self.business_days_between(country_code, end, start)
+        if end == start:
+            return 0
+        start_ordinal, end_ordinal = start.toordinal(), end.toordinal()
+        count = _weekdays_between(start_ordinal, end_ordinal)
+        for year in range(start.year, (end - timedelta(days=1)).year + 1):
+            ordinals = self.get_year(country_code, year).weekday_ordinals
+            count -= bisect.bisect_left(ordinals, end_ordinal) - bisect.bisect_left(ordinals, start_ordinal)
+        return count
+
+    def add_business_days(self, country_code: str, start: date, days: int) -> date:
+        # Binary search over the calendar using business_days_between, so cost grows with log(days). The
+        # search never probes past the supported years; ValueError only if the answer itself lies beyond them.
+        if days == 0:
+            return start
+        span = abs(days) * 2 + 60  # Generous upper bound: 5/7 weekdays minus at most a few dozen holidays a year
+        if days > 0:
+            def reached(offset):
+                return self.business_days_between(country_code, start + timedelta(days=1),
+                                                  start + timedelta(days=offset + 1)) >= days
+            limit = (date(MAX_YEAR, 12, 31) - start).days
+        else:
+            def reached(offset):
+                return self.business_days_between(country_code, start - timedelta(days=offset), start) >= -days
+            limit = (start - date(MIN_YEAR, 1, 1)).days
+        high = min(span, limit)
+        if high < 1 or not reached(high):
+            raise ValueError(f"Result is outside the supported range {MIN_YEAR}-{MAX_YEAR}.")
+        low = 1
+        while low < high:
+            mid = (low + high) // 2
+            if reached(mid):
+                high = mid
+            else:
+                low = mid + 1
+        return start + timedelta(days=low if days > 0 else -low)
+
+    def warm(self, country_codes, years):
+        for country_code in country_codes:
+            for year in years:
+                try:
+                    self.get_year(country_code, year)
+                except (UnknownCountryError, ValueError):
+                    continue
+
+    def warm_from_env(self):
+        country_codes = [code.strip() for code in HOLIDAY_WARMUP_COUNTRIES.split(",") if code.strip()]
+        if country_codes:
+            this_year = date.today().year
+            self.warm(country_codes, range(this_year - 1, this_year + 2))
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits,
+                "misses": self.misses}
+
+
+holiday_store = HolidayStore()
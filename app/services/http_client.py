@@ -0,0 +1,78 @@
+# app/services/http_client.py
+import asyncio
+import os
+from urllib.parse import urlsplit
+
+from app.services.lazy import lazy_import
+
+httpx = lazy_import("httpx", group="fun")
+
+# Pool sizing can be tuned per deployment without code changes.
+DEFAULT_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "5"))
+MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+PER_HOST_LIMIT = int(os.getenv("UPSTREAM_PER_HOST_LIMIT", "10"))
+
+
+class UpstreamClient:
+    """Shared async HTTP client with keep-alive pooling and per-host concurrency limits."""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, max_connections: int = MAX_CONNECTIONS,
+                 max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS, per_host_limit: int = PER_HOST_LIMIT,
+                 transport=None):
+        self.timeout = timeout
+        self.per_host_limit = per_host_limit
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self._transport = transport  # Lets tests point the client at a local stub (e.g. httpx.MockTransport)
+        self._client = None  # httpx.AsyncClient, created by start()
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def is_started(self) -> bool:
+        return self._client is not None
+
+    async def start(self):
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_keepalive_connections,
+                                  keepalive_expiry=KEEPALIVE_EXPIRY)
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=limits, transport=self._transport,
+                                             headers={"Accept": "application/json"})
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._host_semaphores.clear()
+
+    def _semaphore_for(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return semaphore
+
+    async def get(self, url: str, **kwargs):
+        # Started lazily too, so the client still works where the lifespan hook did not run.
+        if self._client is None:
+            await self.start()
+        semaphore = self._semaphore_for(urlsplit(url).netloc)
+        # Waiting for a per-host slot counts against the same timeout budget as the request itself.
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise httpx.PoolTimeout(f"Timed out waiting for a connection slot to {url}")
+        try:
+            return await self._client.get(url, **kwargs)
+        finally:
+            semaphore.release()
+
+    async def get_json(self, url: str, **kwargs):
+        response = await self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+
+# Process-wide instance, closed by the app lifespan in api/index.py (and opened there when prewarmed).
+upstream_client = UpstreamClient()
@@ -0,0 +1,57 @@
+# app/services/import_profile.py
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def run_importtime(target: str = "api.index") -> str:
+    # A fresh interpreter is the only way to see true cold-import costs; this process has them cached.
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {target}"], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True, timeout=120)
+    return completed.stderr
+
+
+def parse_importtime(output: str) -> list:
+    """Parse `-X importtime` lines ("import time: self | cumulative | name") into dicts."""
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        entries.append({"module": stripped, "depth": (len(name) - len(stripped) - 1) // 2,
+                        "self_us": int(fields[0]), "cumulative_us": int(fields[1])})
+    return entries
+
+
+def summarize(entries: list, top: int = 15) -> dict:
+    def row(entry, key):
+        return {"module": entry["module"], "ms": round(entry[key] / 1000, 2)}
+
+    total_us = sum(entry["cumulative_us"] for entry in entries if entry["depth"] == 0)
+    by_cumulative = sorted(entries, key=lambda entry: entry["cumulative_us"], reverse=True)
+    by_self = sorted(entries, key=lambda entry: entry["self_us"], reverse=True)
+    return {"total_ms": round(total_us / 1000, 2), "module_count": len(entries),
+            "top_cumulative": [row(entry, "cumulative_us") for entry in by_cumulative[:top]],
+            "top_self": [row(entry, "self_us") for entry in by_self[:top]]}
+
+
+def profile_startup(target: str = "api.index", top: int = 15) -> dict:
+    return {"target": target, **summarize(parse_importtime(run_importtime(target)), top=top)}
+
+
+def format_report(report: dict) -> str:
+    lines = [f"Import-time profile for {report['target']}: {report['total_ms']} ms across "
+             f"{report['module_count']} modules", "Slowest (cumulative):"]
+    lines += [f"  {item['ms']:>9.2f} ms  {item['module']}" for item in report["top_cumulative"]]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Usage: python -m app.services.import_profile [module]
+    print(format_report(profile_startup(sys.argv[1] if len(sys.argv) > 1 else "api.index")))
@@ -0,0 +1,280 @@
+# app/services/ip_geo.py
+import csv
+import ipaddress
+import json
+import logging
+import mmap
+import os
+import socket
+import struct
+import sys
+import tempfile
+from bisect import bisect_right
+from collections.abc import Sequence
+from functools import lru_cache
+from pathlib import Path
+
+from app.services.lazy import LazyValue
+
+logger = logging.getLogger(__name__)
+
+DATA_PATH = Path(__file__).parent.parent / "data"
+# Source ranges (CSV) and the compiled index that workers memory-map. The index is built ahead of deploys
+# with `python -m app.services.ip_geo build` and shipped with the app; workers never build it themselves.
+SOURCE_PATH = Path(os.getenv("IP_GEO_CSV", str(DATA_PATH / "ip_geo.csv")))
+INDEX_PATH = Path(os.getenv("IP_GEO_INDEX", str(SOURCE_PATH.with_suffix(".index"))))
+
+_INDEX_MAGIC = b"CAIPGEO1"
+_INDEX_HEADER = struct.Struct("<8sQQQ")  # magic, IPv4 ranges, IPv6 ranges, records
+
+# Header names accepted for the range columns; every other column is a record field.
+_COLUMN_ALIASES = {"network": "network", "cidr": "network", "prefix": "network",
+                   "start": "start", "start_ip": "start", "ip_start": "start", "range_start": "start",
+                   "end": "end", "end_ip": "end", "ip_end": "end", "range_end": "end",
+                   "country": "country_code", "country_iso_code": "country_code", "countrycode": "country_code"}
+# Without a header row: start,end (or network) followed by these, any trailing ones may be missing
+DEFAULT_FIELDS = ("country_code", "region", "city", "latitude", "longitude")
+_FLOAT_FIELDS = frozenset(("latitude", "longitude"))
+_IPV4_MAPPED_PREFIX = b"\0" * 10 + b"\xff\xff"
+
+
+def parse_address(address: str):
+    """Returns (4, int) or (6, 16 big-endian bytes); IPv4-mapped IPv6 addresses are looked up as IPv4."""
+    address = address.strip()
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, address), "big")
+    except OSError:
+        pass
+    try:
+        packed = socket.inet_pton(socket.AF_INET6, address.partition("%")[0])  # Zone ids are irrelevant here
+    except OSError:
+        raise ValueError(f"'{address}' is not a valid IPv4 or IPv6 address")
+    if packed[:12] == _IPV4_MAPPED_PREFIX:
+        return 4, int.from_bytes(packed[12:], "big")
+    return 6, packed
+
+
+# --- Building ---
+def _read_ranges(path: Path):
+    """Yields (version, start, end, record dict) for every row of a range CSV."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = csv.reader(row for row in f if row.strip() and not row.startswith("#"))
+        fields = None
+        for row in rows:
+            row = [cell.strip() for cell in row]
+            if fields is None:
+                first = row[0]
+                try:
+                    ipaddress.ip_network(first, strict=False)
+                except ValueError:  # A header row
+                    fields = [_COLUMN_ALIASES.get(name.lower(), name.lower()) for name in row]
+                    continue
+                range_columns = ["network"] if "/" in first else ["start", "end"]
+                fields = range_columns + list(DEFAULT_FIELDS)
+            values = dict(zip(fields, row))
+            if "network" in values:
+                network = ipaddress.ip_network(values.pop("network"), strict=False)
+                version, start, end = network.version, int(network.network_address), int(network.broadcast_address)
+            else:
+                first, last = ipaddress.ip_address(values.pop("start")), ipaddress.ip_address(values.pop("end"))
+                if first.version != last.version or first > last:
+                    raise ValueError(f"Invalid range {first} - {last}")
+                version, start, end = first.version, int(first), int(last)
+            record = {}
+            for name, value in values.items():
+                if value:
+                    record[name] = float(value) if name in _FLOAT_FIELDS else value
+            yield version, start, end, record
+
+
+def _flatten(ranges: list) -> list:
+    # Turns possibly nested/overlapping ranges into sorted disjoint (start, end, record id) segments.
+    # The most specific range wins; on a partial overlap, the range that starts later wins.
+    segments = []
+
+    def emit(start, end, record_id):
+        if segments and segments[-1][2] == record_id and segments[-1][1] + 1 == start:
+            segments[-1][1] = end
+        else:
+            segments.append([start, end, record_id])
+
+    stack = []  # (end, record id) of ranges still open, innermost (smallest end) last
+    cursor = 0
+
+    def close_before(limit):
+        nonlocal cursor
+        while stack and stack[-1][0] < limit:
+            end, record_id = stack.pop()
+            if cursor <= end:
+                emit(cursor, end, record_id)
+                cursor = end + 1
+
+    for start, end, record_id in sorted(ranges, key=lambda item: (item[0], -item[1])):
+        close_before(start)
+        if stack and cursor < start:
+            emit(cursor, start - 1, stack[-1][1])
+        cursor = start
+        while stack and stack[-1][0] <= end:
+            stack.pop()  # Shadowed from here on
+        stack.append((end, record_id))
+    close_before(1 << 128)
+    return segments
+
+
+def build_index(source: Path = SOURCE_PATH, target: Path = INDEX_PATH) -> dict:
+    """Compiles a range CSV into the memory-mappable index file; returns counts."""
+    records, record_ids = [], {}
+    ranges = {4: [], 6: []}
+    for version, start, end, record in _read_ranges(source):
+        encoded = json.dumps(record, ensure_ascii=False, sort_keys=True)
+        record_id = record_ids.get(encoded)
+        if record_id is None:
+            record_id = record_ids[encoded] = len(records)
+            records.append(encoded.encode("utf-8"))
+        ranges[version].append((start, end, record_id))
+    v4, v6 = _flatten(ranges[4]), _flatten(ranges[6])
+
+    # Layout: header, IPv4 starts/ends/record ids (uint32), IPv6 starts/ends (16-byte big-endian) and
+    # record ids (uint32), padding to 8 bytes, record offsets (uint64), then the JSON records blob.
+    offsets = [0]
+    for item in records:
+        offsets.append(offsets[-1] + len(item))
+    # A unique temporary file in the target directory, so concurrent builds never write into the same file
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, len(v4), len(v6), len(records)))
+            for column in range(3):
+                f.write(struct.pack(f"<{len(v4)}I", *(segment[column] for segment in v4)))
+            for column in range(2):
+                f.write(b"".join(segment[column].to_bytes(16, "big") for segment in v6))
+            f.write(struct.pack(f"<{len(v6)}I", *(segment[2] for segment in v6)))
+            f.write(b"\0" * (-f.tell() % 8))
+            f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+            for item in records:
+                f.write(item)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates it owner-only
+        os.replace(tmp_path, target)  # Workers never map a half-written index
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return {"ipv4_ranges": len(v4), "ipv6_ranges": len(v6), "records": len(records)}
+
+
+# --- Lookups ---
+class _Keys16(Sequence):
+    """16-byte big-endian keys in the mapping; bytes compare like the integers they encode, so bisect works."""
+
+    def __init__(self, view: memoryview, count: int):
+        self._view = view
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        return self._view[index * 16:index * 16 + 16].tobytes()
+
+
+class GeoIndex:
+    """Read-only IP range index backed by a memory-mapped file built by build_index().
+
+    Ranges are disjoint and sorted, so a lookup is one binary search over the start addresses (bisect on
+    the mapped uint32 array for IPv4, on 16-byte keys for IPv6) plus a bounds check. Nothing is parsed at
+    load time: opening the index costs one mmap, and pages are read from the OS cache on demand.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n4, n6, n_records = _INDEX_HEADER.unpack_from(self._map, 0)
+        if magic != _INDEX_MAGIC:
+            raise ValueError(f"{path} is not an IP geolocation index")
+        view = memoryview(self._map)
+        position = _INDEX_HEADER.size
+
+        def take(size):
+            nonlocal position
+            section = view[position:position + size]
+            position += size
+            return section
+
+        self._v4_starts, self._v4_ends, self._v4_records = (take(4 * n4).cast("I") for _ in range(3))
+        self._v6_starts, self._v6_ends = _Keys16(take(16 * n6), n6), _Keys16(take(16 * n6), n6)
+        self._v6_records = take(4 * n6).cast("I")
+        position += -position % 8
+        self._record_offsets = take(8 * (n_records + 1)).cast("Q")
+        self._blob_start = position
+        self.ipv4_ranges, self.ipv6_ranges, self.records = n4, n6, n_records
+        self.mapped_bytes = len(self._map)
+        self.record = lru_cache(maxsize=65536)(self._decode_record)
+
+    def _decode_record(self, record_id: int) -> dict:
+        # Shared between callers: must not be mutated
+        start = self._blob_start + self._record_offsets[record_id]
+        end = self._blob_start + self._record_offsets[record_id + 1]
+        return json.loads(self._map[start:end])
+
+    def lookup(self, address: str) -> dict | None:
+        """Record for an address, or None when no range covers it; ValueError if it is not an IP address."""
+        version, key = parse_address(address)
+        if version == 4:
+            starts, ends, record_ids = self._v4_starts, self._v4_ends, self._v4_records
+        else:
+            starts, ends, record_ids = self._v6_starts, self._v6_ends, self._v6_records
+        position = bisect_right(starts, key) - 1
+        if position < 0 or key > ends[position]:
+            return None
+        return self.record(record_ids[position])
+
+    def lookup_many(self, addresses: list) -> list:
+        results = []
+        for address in addresses:
+            try:
+                record = self.lookup(address)
+            except ValueError as e:
+                results.append({"ip": address, "error": str(e)})
+                continue
+            results.append({"ip": address, "found": record is not None, **(record or {})})
+        return results
+
+    def stats(self) -> dict:
+        info = self.record.cache_info()
+        return {"ipv4_ranges": self.ipv4_ranges, "ipv6_ranges": self.ipv6_ranges, "records": self.records,
+                "mapped_bytes": self.mapped_bytes, "record_cache": {"hits": info.hits, "misses": info.misses,
+                                                                    "size": info.currsize}}
+
+
+def _load_index():
+    # Only maps a prebuilt index: parsing the CSV here would stall worker startup (and fail on a read-only
+    # filesystem), so a missing or stale index is reported rather than rebuilt.
+    try:
+        index_mtime = INDEX_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        if SOURCE_PATH.exists():
+            logger.warning("IP geolocation index %s is missing; run `python -m app.services.ip_geo build` before "
+                           "deploying. Lookups are disabled.", INDEX_PATH)
+        else:
+            logger.warning("No IP geolocation database at %s; lookups are disabled.", INDEX_PATH)
+        return None
+    try:
+        if SOURCE_PATH.stat().st_mtime_ns > index_mtime:
+            logger.warning("IP geolocation index %s is older than %s; rebuild it with "
+                           "`python -m app.services.ip_geo build`.", INDEX_PATH, SOURCE_PATH.name)
+    except FileNotFoundError:
+        pass  # Only the index was shipped
+    return GeoIndex(INDEX_PATH)
+
+
+geo_index = LazyValue(_load_index, "ip_geo.index", group="dev")
+
+
+if __name__ == "__main__":
+    # Usage: python -m app.services.ip_geo build [source.csv [target.index]]
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        sys.exit("Usage: python -m app.services.ip_geo build [source.csv [target.index]]")
+    source = Path(sys.argv[2]) if len(sys.argv) > 2 else SOURCE_PATH
+    target = Path(sys.argv[3]) if len(sys.argv) > 3 else source.with_suffix(".index")
+    counts = build_index(source, target)
+    print(f"Wrote {target} ({counts['ipv4_ranges']} IPv4 ranges, {counts['ipv6_ranges']} IPv6 ranges, "
+          f"{counts['records']} distinct records)")
@@ -0,0 +1,270 @@
+# app/services/json_stream.py
+import codecs
+import json
+import json.decoder
+import json.scanner
+import os
+import re
+
+from starlette.concurrency import run_in_threadpool
+
+try:
+    import orjson  # Optional fast serializer (indent 0 or 2); json from the standard library is the fallback
+except ImportError:
+    orjson = None
+
+OFFLOAD_BUFFER_SIZE = 1024 * 1024
+# Values up to this many characters are parsed whole by the C scanner and re-serialized in one call; larger
+# containers are walked item by item instead, so memory stays bounded by roughly this size.
+MAX_BUFFERED_VALUE = int(os.getenv("JSON_STREAM_MAX_VALUE_CHARS", str(1024 * 1024)))
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_VALUE_STARTS = frozenset('"{[-0123456789tfn')
+_NUMBER_CONTINUATION = frozenset("0123456789.eE+-")
+
+# Parser states: what may come next
+VALUE, VALUE_OR_CLOSE, KEY, KEY_OR_CLOSE, COLON, COMMA_OR_CLOSE, DONE = range(7)
+
+
+class JsonStreamError(ValueError):
+    def __init__(self, message: str, offset: int):
+        super().__init__(f"{message} at character {offset}")
+        self.offset = offset
+
+
+def _reject_constant(name: str):
+    raise ValueError(f"{name} is not valid JSON")
+
+
+# The C scanners behind json.loads, used directly to parse one value (or key string) at a given offset.
+_scan_value = json.scanner.make_scanner(json.JSONDecoder(parse_constant=_reject_constant))
+_scan_string = json.decoder.scanstring
+
+
+def _widen_indent(text: str, indent: int) -> str:
+    # orjson only writes 2-space indents. Widen them level by level, deepest first; a marker after every
+    # line break (control characters never appear raw in JSON output) keeps each line from matching twice.
+    if "\n" not in text:
+        return text
+    text = text.replace("\n", "\n\x01")
+    depth = 1
+    while "\x01" + "  " * depth in text:
+        depth += 1
+    for level in range(depth - 1, 0, -1):
+        text = text.replace("\x01" + "  " * level, " " * (indent * level))
+    return text.replace("\x01", "")
+
+
+def _make_serializer(indent: int):
+    separators = None if indent else (",", ":")
+
+    def with_json(value) -> str:
+        return json.dumps(value, indent=indent or None, separators=separators, ensure_ascii=False)
+
+    if orjson is None or indent not in (0, 2):
+        return with_json
+    option = orjson.OPT_INDENT_2 if indent else 0
+
+    def with_orjson(value) -> str:
+        try:
+            return orjson.dumps(value, option=option).decode("utf-8")
+        except TypeError:  # orjson.JSONEncodeError, e.g. integers beyond 64 bits
+            return with_json(value)
+
+    return with_orjson
+
+
+def fast_path_available() -> bool:
+    return orjson is not None
+
+
+class JsonReformatter:
+    """Incremental JSON reformatter: pretty-prints (indent > 0) or minifies text fed in pieces.
+
+    The tree is never built as a whole. Values below MAX_BUFFERED_VALUE are parsed by the C scanner and
+    re-serialized (like json.dumps, so number spelling and escapes are normalized); bigger containers are
+    walked item by item, keeping only the nesting stack and an unfinished value between feed() calls.
+    Key order is preserved. With lines=True the input may hold any number of concatenated or
+    newline-delimited documents and each is written on its own line (JSON Lines).
+    """
+
+    def __init__(self, indent: int = 4, lines: bool = False):
+        self.lines = lines
+        self.indent = indent
+        self.documents = 0
+        # With orjson, other indents are laid out with 2 spaces and widened once per scanned piece of output.
+        self._widen = orjson is not None and indent not in (0, 2)
+        self._layout_indent = 2 if self._widen else indent
+        self._serialize = _make_serializer(self._layout_indent)
+        self._stack = []
+        self._state = VALUE
+        self._pending_open = False  # A walked container whose first item has not been written yet
+        self._buffer = ""
+        self._offset = 0  # Characters consumed before self._buffer
+        self._retry_at = 0  # Unfinished value: wait until the buffer reaches this size before rescanning
+        self._newlines = ["\n" + " " * (self._layout_indent * depth) for depth in range(64)] if indent else None
+
+    def feed(self, text: str) -> str:
+        self._buffer += text
+        if len(self._buffer) < self._retry_at:
+            return ""
+        return self._scan(final=False)
+
+    def finish(self) -> str:
+        out = self._scan(final=True)
+        if self._stack or (self._state != DONE and not (self.lines and self._state == VALUE)):
+            raise JsonStreamError("Unexpected end of JSON", self._offset + len(self._buffer))
+        return out
+
+    def _newline(self, depth: int) -> str:
+        if depth >= len(self._newlines):
+            self._newlines.extend("\n" + " " * (self._layout_indent * d)
+                                  for d in range(len(self._newlines), depth + 1))
+        return self._newlines[depth]
+
+    def _scan(self, final: bool) -> str:
+        buffer = self._buffer
+        end = len(buffer)
+        out = []
+        write = out.append
+        stack = self._stack
+        state = self._state
+        pretty = bool(self.indent)
+        pos = 0
+        try:
+            while True:
+                pos = _WHITESPACE.match(buffer, pos).end()
+                if pos == end:
+                    break
+                char = buffer[pos]
+
+                if state in (VALUE, VALUE_OR_CLOSE, DONE):
+                    if state == DONE:
+                        if not self.lines:
+                            raise JsonStreamError("Extra data", self._offset + pos)
+                        state = VALUE
+                    if state == VALUE_OR_CLOSE and char == "]":
+                        self._pending_open = False
+                        stack.pop()
+                        write("]")
+                        state = self._after_value(write)
+                        pos += 1
+                        continue
+                    if char not in _VALUE_STARTS:
+                        raise JsonStreamError("Expecting value", self._offset + pos)
+                    try:
+                        value, value_end = _scan_value(buffer, pos)
+                    except (StopIteration, ValueError) as e:  # JSONDecodeError is a ValueError
+                        # Probably cut off by the end of the buffer: wait for more input. Only containers can
+                        # be split up, so a single string or number is buffered however long it is.
+                        if not final and (char not in "{[" or end - pos < MAX_BUFFERED_VALUE):
+                            break
+                        if char not in "{[":
+                            raise JsonStreamError(getattr(e, "msg", "Expecting value"),
+                                                  self._offset + getattr(e, "pos", pos))
+                        # Too large to buffer (or invalid somewhere inside): walk into the container instead
+                        self._open_pending(write)
+                        write(char)
+                        stack.append(char)
+                        self._pending_open = True
+                        state = KEY_OR_CLOSE if char == "{" else VALUE_OR_CLOSE
+                        pos += 1
+                        continue
+                    if not final and char not in '"{[' and (value_end == end
+                                                            or buffer[value_end] in _NUMBER_CONTINUATION):
+                        break  # A number at the end of the buffer ("12", "1." or "1e") may continue
+                    self._open_pending(write)
+                    text = self._serialize(value)
+                    if pretty and stack and char in "{[":
+                        text = text.replace("\n", self._newline(len(stack)))
+                    write(text)
+                    state = self._after_value(write)
+                    pos = value_end
+                elif state == COMMA_OR_CLOSE:
+                    if char == ",":
+                        write(",")
+                        if pretty:
+                            write(self._newline(len(stack)))
+                        state = KEY if stack[-1] == "{" else VALUE
+                    elif char == ("}" if stack[-1] == "{" else "]"):
+                        stack.pop()
+                        if pretty:
+                            write(self._newline(len(stack)))
+                        write(char)
+                        state = self._after_value(write)
+                    else:
+                        raise JsonStreamError("Expecting ',' or closing bracket", self._offset + pos)
+                    pos += 1
+                elif state == COLON:
+                    if char != ":":
+                        raise JsonStreamError("Expecting ':'", self._offset + pos)
+                    write(": " if pretty else ":")
+                    state = VALUE
+                    pos += 1
+                elif char == '"':  # KEY or KEY_OR_CLOSE
+                    try:
+                        key, key_end = _scan_string(buffer, pos + 1)
+                    except ValueError as e:
+                        if not final:
+                            break
+                        raise JsonStreamError(e.msg, self._offset + e.pos)
+                    self._open_pending(write)
+                    write(json.dumps(key, ensure_ascii=False))
+                    state = COLON
+                    pos = key_end
+                elif state == KEY_OR_CLOSE and char == "}":
+                    self._pending_open = False
+                    stack.pop()
+                    write("}")
+                    state = self._after_value(write)
+                    pos += 1
+                else:
+                    raise JsonStreamError("Expecting property name in double quotes", self._offset + pos)
+        finally:
+            self._state = state
+            self._buffer = buffer[pos:]
+            self._offset += pos
+        # An unfinished value is only rescanned once the buffer has doubled, keeping the total work linear.
+        self._retry_at = 2 * len(self._buffer)
+        return _widen_indent("".join(out), self.indent) if self._widen else "".join(out)
+
+    def _open_pending(self, write):
+        # First item of a walked container: its line break is only known to be needed now.
+        if self._pending_open:
+            self._pending_open = False
+            if self.indent:
+                write(self._newline(len(self._stack)))
+
+    def _after_value(self, write) -> int:
+        if self._stack:
+            return COMMA_OR_CLOSE
+        self.documents += 1
+        if self.lines:
+            write("\n")
+        return DONE
+
+
+async def reformat_stream(chunks, indent: int = 4, lines: bool = False):
+    """Async generator of reformatted text pieces; raises JsonStreamError (a ValueError) on invalid input."""
+    reformatter = JsonReformatter(indent, lines)
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= OFFLOAD_BUFFER_SIZE:
+            piece = await run_in_threadpool(_feed, reformatter, decoder, bytes(buffer))
+            buffer.clear()
+            if piece:
+                yield piece
+    piece = await run_in_threadpool(_feed, reformatter, decoder, bytes(buffer), True)
+    if piece:
+        yield piece
+
+
+def _feed(reformatter: JsonReformatter, decoder, data: bytes, final: bool = False) -> str:
+    try:
+        text = decoder.decode(data, final)
+    except UnicodeDecodeError:
+        raise JsonStreamError("Invalid UTF-8", reformatter._offset + len(reformatter._buffer))
+    out = reformatter.feed(text)
+    return out + reformatter.finish() if final else out
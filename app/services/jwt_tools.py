@@ -0,0 +1,208 @@
+# app/services/jwt_tools.py
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from app.services.lazy import lazy_import
+
+jwk = lazy_import("jose.jwk", group="dev")
+jwt = lazy_import("jose.jwt", group="dev")
+jose_exceptions = lazy_import("jose.exceptions", group="dev")
+
+KEY_CACHE_SIZE = int(os.getenv("JWT_KEY_CACHE_SIZE", "256"))
+MAX_REGISTERED_KEYS = int(os.getenv("JWT_MAX_REGISTERED_KEYS", "1024"))  # Registration is unauthenticated
+VERIFY_CACHE_SIZE = int(os.getenv("JWT_VERIFY_CACHE_SIZE", "10000"))
+# Successful verifications are remembered until the token's `exp` (capped); failures only briefly.
+VERIFY_CACHE_MAX_TTL = float(os.getenv("JWT_VERIFY_CACHE_MAX_TTL", "300"))
+VERIFY_CACHE_FAILURE_TTL = float(os.getenv("JWT_VERIFY_CACHE_FAILURE_TTL", "30"))
+SUPPORTED_ALGORITHMS = ("HS256", "HS384", "HS512", "RS256", "RS384", "RS512", "ES256", "ES384", "ES512")
+
+
+class KeyNotFoundError(KeyError):
+    pass
+
+
+class KeyExistsError(ValueError):
+    """A different key is already registered under this kid; kids are never overwritten."""
+
+
+class KeyRegistryFullError(ValueError):
+    pass
+
+
+def _key_digest(material) -> str:
+    if isinstance(material, dict):
+        material = json.dumps(material, sort_keys=True)
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+class KeyCache:
+    """Parsed jose Key objects, so PEM/JWK parsing happens once per key rather than once per token.
+
+    Keys registered under a key id (`kid`) are kept for the life of the process and can not be replaced (a
+    token's `kid` header picks its key, so replacing one would let anyone mint tokens that verify); at most
+    `max_registered` are accepted. Inline keys are cached by a digest of their material in a bounded LRU.
+    """
+
+    def __init__(self, maxsize: int = KEY_CACHE_SIZE, max_registered: int = MAX_REGISTERED_KEYS):
+        self.maxsize = maxsize
+        self.max_registered = max_registered
+        self._registered = {}
+        self._inline = OrderedDict()
+        self._lock = threading.Lock()  # Batch verification runs in the threadpool
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _construct(material, algorithm: str):
+        if algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported algorithm '{algorithm}'. Supported: {', '.join(SUPPORTED_ALGORITHMS)}.")
+        try:
+            return jwk.construct(material, algorithm)
+        except jose_exceptions.JOSEError as e:
+            raise ValueError(f"Invalid key for {algorithm}: {e}")
+
+    def register(self, kid: str, material, algorithm: str) -> dict:
+        identity = f"kid:{kid}:{algorithm}:{_key_digest(material)}"
+        existing = self._registered.get(kid)
+        if existing is not None:
+            if existing[2] != identity:
+                raise KeyExistsError(f"Key id {kid!r} is already registered with a different key.")
+            return {"kid": kid, "algorithm": algorithm}  # Same key again: nothing to do
+        if len(self._registered) >= self.max_registered:
+            raise KeyRegistryFullError(f"At most {self.max_registered} key ids can be registered.")
+        entry = (self._construct(material, algorithm), algorithm, identity)
+        with self._lock:
+            self._registered.setdefault(kid, entry)
+        return {"kid": kid, "algorithm": algorithm}
+
+    def resolve(self, material=None, algorithm: str | None = None, kid: str | None = None) -> tuple:
+        """(Key, algorithm, cache identity) for inline material, or for a registered `kid`."""
+        if material is None:
+            if kid not in self._registered:
+                raise KeyNotFoundError(kid)
+            self.hits += 1
+            return self._registered[kid]
+        algorithm = algorithm or "HS256"
+        identity = f"{algorithm}:{_key_digest(material)}"
+        with self._lock:
+            entry = self._inline.get(identity)
+            if entry is not None:
+                self.hits += 1
+                self._inline.move_to_end(identity)
+                return entry
+        self.misses += 1
+        entry = (self._construct(material, algorithm), algorithm, identity)
+        with self._lock:
+            self._inline[identity] = entry
+            if len(self._inline) > self.maxsize:
+                self._inline.popitem(last=False)
+        return entry
+
+    def stats(self) -> dict:
+        # Only the count: key ids are not listed to other callers
+        return {"registered": len(self._registered), "max_registered": self.max_registered,
+                "inline": len(self._inline), "hits": self.hits, "misses": self.misses}
+
+
+class VerificationCache:
+    """Memoized verification results keyed by (token, key identity, audience, issuer)."""
+
+    def __init__(self, maxsize: int = VERIFY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()  # Batch verification runs in the threadpool
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, cache_key):
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None or entry[0] <= time.time():
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(cache_key)
+            return entry[1]
+
+    def put(self, cache_key, result: dict, ttl: float):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[cache_key] = (time.time() + ttl, result)
+            self._entries.move_to_end(cache_key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+key_cache = KeyCache()
+verification_cache = VerificationCache()
+
+
+def sign(claims: dict, material=None, algorithm: str | None = None, kid: str | None = None,
+         expires_in: int | None = None, headers: dict | None = None) -> str:
+    key, algorithm, _ = key_cache.resolve(material, algorithm, kid)
+    claims = dict(claims)
+    if expires_in is not None:
+        now = int(time.time())
+        claims.setdefault("iat", now)
+        claims["exp"] = now + expires_in
+    headers = dict(headers or {})
+    if kid:
+        headers.setdefault("kid", kid)
+    return jwt.encode(claims, key, algorithm=algorithm, headers=headers or None)
+
+
+def decode_unverified(token: str) -> dict:
+    """Header and claims without any signature or claim checks (for inspection only)."""
+    try:
+        return {"header": jwt.get_unverified_header(token), "claims": jwt.get_unverified_claims(token)}
+    except jose_exceptions.JOSEError as e:
+        raise ValueError(f"Malformed token: {e}")
+
+
+def verify(token: str, material=None, algorithm: str | None = None, kid: str | None = None,
+           audience: str | None = None, issuer: str | None = None) -> dict:
+    """{"valid", "claims" or "error", "cached"}; a missing `kid` falls back to the token's own header."""
+    if material is None and kid is None:
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except jose_exceptions.JOSEError as e:
+            return {"valid": False, "error": f"Malformed token: {e}", "cached": False}
+    try:
+        key, algorithm, identity = key_cache.resolve(material, algorithm, kid)
+    except KeyNotFoundError:
+        return {"valid": False, "error": f"Unknown key id: {kid!r}.", "cached": False}
+    cache_key = (token, identity, audience, issuer)
+    cached = verification_cache.get(cache_key)
+    if cached is not None:
+        return {**cached, "cached": True}
+    try:
+        # Only the key's own algorithm is accepted, which rules out algorithm-confusion attacks.
+        claims = jwt.decode(token, key, algorithms=[algorithm], audience=audience, issuer=issuer,
+                                 options={"verify_aud": audience is not None})
+    except jose_exceptions.JOSEError as e:
+        result = {"valid": False, "error": str(e)}
+        verification_cache.put(cache_key, result, VERIFY_CACHE_FAILURE_TTL)
+        return {**result, "cached": False}
+    result = {"valid": True, "claims": claims}
+    ttl = VERIFY_CACHE_MAX_TTL
+    if isinstance(claims.get("exp"), (int, float)):
+        ttl = min(ttl, claims["exp"] - time.time())
+    verification_cache.put(cache_key, result, ttl)
+    return {**result, "cached": False}
+
+
+def verify_many(tokens: list, material=None, algorithm: str | None = None, kid: str | None = None,
+                audience: str | None = None, issuer: str | None = None) -> list:
+    return [verify(token, material, algorithm, kid, audience, issuer) for token in tokens]
+
+
+def stats() -> dict:
+    return {"keys": key_cache.stats(), "verifications": verification_cache.stats()}
@@ -0,0 +1,107 @@
+# app/services/lazy.py
+import importlib
+import os
+import threading
+import time
+
+# Comma-separated router groups (text, fun, dev, data) whose heavy dependencies and datasets are loaded at
+# startup instead of on first use, or "all". Empty keeps everything lazy, which is best for cold starts.
+PREWARM_ROUTERS = os.getenv("PREWARM_ROUTERS", "")
+
+_registry: list = []
+_modules: dict = {}  # module name -> LazyModule, so every importer shares one proxy
+_registry_lock = threading.Lock()
+
+
+class LazyResource:
+    """Base for anything loaded on first use; instances register themselves for prewarm() and load_report()."""
+
+    kind = ""
+
+    def __init__(self, name: str, group: str):
+        self.name = name
+        self.group = group
+        self.load_seconds = None
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    @property
+    def loaded(self) -> bool:
+        return self.load_seconds is not None
+
+    def report(self) -> dict:
+        return {"name": self.name, "kind": self.kind, "group": self.group, "loaded": self.loaded,
+                "load_ms": round(self.load_seconds * 1000, 2) if self.loaded else None}
+
+
+class LazyModule(LazyResource):
+    """Module proxy that imports the real module on first attribute access."""
+
+    kind = "module"
+
+    def __init__(self, name: str, group: str):
+        super().__init__(name, group)
+        self._module = None
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self.name)
+                    self.load_seconds = time.perf_counter() - started
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        # Only reached for attributes not set in __init__, i.e. the wrapped module's own.
+        return getattr(self.load(), attr)
+
+
+class LazyValue(LazyResource):
+    """Value (dataset, index, ...) built by `factory` on first get()."""
+
+    kind = "value"
+    _UNSET = object()
+
+    def __init__(self, factory, name: str, group: str):
+        super().__init__(name, group)
+        self._factory = factory
+        self._value = self._UNSET
+
+    def get(self):
+        if self._value is self._UNSET:
+            with self._lock:
+                if self._value is self._UNSET:
+                    started = time.perf_counter()
+                    value = self._factory()
+                    self.load_seconds = time.perf_counter() - started
+                    self._value = value
+        return self._value
+
+    load = get
+
+
+def lazy_import(name: str, group: str) -> LazyModule:
+    proxy = _modules.get(name)
+    if proxy is None:
+        proxy = _modules[name] = LazyModule(name, group)
+    return proxy
+
+
+def prewarm(groups=PREWARM_ROUTERS) -> list:
+    """Load every lazy module/value in the given groups; returns the names that were loaded."""
+    if isinstance(groups, str):
+        groups = [group.strip() for group in groups.split(",") if group.strip()]
+    wanted = set(groups)
+    loaded = []
+    for entry in list(_registry):
+        if "all" in wanted or entry.group in wanted:
+            entry.load()
+            loaded.append(entry.name)
+    return loaded
+
+
+def load_report() -> list:
+    return [entry.report() for entry in _registry]
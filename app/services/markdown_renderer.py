@@ -0,0 +1,112 @@
+# app/services/markdown_renderer.py
+import asyncio
+import hashlib
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+from starlette.concurrency import run_in_threadpool
+
+from app.services.lazy import lazy_import
+
+md_parser = lazy_import("markdown", group="text")
+
+# Extensions used when a request does not ask for any, e.g. MARKDOWN_EXTENSIONS="extra,toc".
+DEFAULT_EXTENSIONS = tuple(ext.strip() for ext in os.getenv("MARKDOWN_EXTENSIONS", "").split(",") if ext.strip())
+# Extensions a request may opt into; anything else is rejected so callers cannot load arbitrary modules.
+ALLOWED_EXTENSIONS = frozenset({"abbr", "admonition", "attr_list", "codehilite", "def_list", "extra", "fenced_code",
+                                "footnotes", "md_in_html", "meta", "nl2br", "sane_lists", "smarty", "tables", "toc",
+                                "wikilinks"}) | frozenset(DEFAULT_EXTENSIONS)
+POOL_SIZE = int(os.getenv("MARKDOWN_POOL_SIZE", "8"))
+CACHE_SIZE = int(os.getenv("MARKDOWN_CACHE_SIZE", "1024"))
+BATCH_SLICE_SIZE = 50
+
+
+def normalize_extensions(extensions) -> tuple:
+    """Sorted, de-duplicated extension names; raises ValueError for one that is not allowed."""
+    if extensions is None:
+        return DEFAULT_EXTENSIONS
+    if isinstance(extensions, str):
+        extensions = extensions.split(",")
+    names = sorted({name.strip() for name in extensions if name.strip()})
+    for name in names:
+        if name not in ALLOWED_EXTENSIONS:
+            raise ValueError(name)
+    return tuple(names)
+
+
+class MarkdownRenderer:
+    """Pools of reusable Markdown instances per extension set, fronted by a content-hash LRU cache."""
+
+    def __init__(self, pool_size: int = POOL_SIZE, cache_size: int = CACHE_SIZE):
+        self.pool_size = pool_size
+        self.cache_size = cache_size
+        self._pools: dict = {}  # extensions -> queue.SimpleQueue of Markdown instances
+        self._cache: OrderedDict = OrderedDict()  # content key -> html
+        self._lock = threading.Lock()  # Renders also run on threadpool workers
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_key(text: str, extensions: tuple) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(",".join(extensions).encode())
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def etag(self, text: str, extensions: tuple) -> str:
+        return f'"{self.content_key(text, extensions)}"'
+
+    def _acquire(self, extensions: tuple):
+        with self._lock:
+            pool = self._pools.setdefault(extensions, queue.SimpleQueue())
+        try:
+            return pool.get_nowait()
+        except queue.Empty:
+            return md_parser.Markdown(extensions=list(extensions))
+
+    def _release(self, extensions: tuple, instance):
+        instance.reset()  # Clears per-document state (footnotes, toc, references) before reuse
+        pool = self._pools[extensions]
+        if pool.qsize() < self.pool_size:
+            pool.put(instance)
+
+    def render(self, text: str, extensions: tuple = DEFAULT_EXTENSIONS) -> str:
+        key = self.content_key(text, extensions)
+        with self._lock:
+            html = self._cache.get(key)
+            if html is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return html
+            self.misses += 1
+        instance = self._acquire(extensions)
+        try:
+            html = instance.convert(text)
+        finally:
+            self._release(extensions, instance)
+        with self._lock:
+            self._cache[key] = html
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return html
+
+    def _render_slice(self, texts: list, extensions: tuple) -> list:
+        return [self.render(text, extensions) for text in texts]
+
+    async def render_many(self, texts: list, extensions: tuple = DEFAULT_EXTENSIONS) -> list:
+        # Slices render concurrently on threadpool workers, each with its own pooled instance.
+        slices = [texts[i:i + BATCH_SLICE_SIZE] for i in range(0, len(texts), BATCH_SLICE_SIZE)]
+        parts = await asyncio.gather(*(run_in_threadpool(self._render_slice, part, extensions) for part in slices))
+        return [html for part in parts for html in part]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"cache_entries": len(self._cache), "cache_size": self.cache_size, "hits": self.hits,
+                "misses": self.misses, "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "pooled_instances": {",".join(ext) or "(none)": pool.qsize() for ext, pool in self._pools.items()}}
+
+
+markdown_renderer = MarkdownRenderer()
@@ -0,0 +1,288 @@
+# app/services/metrics.py
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from collections import Counter
+
+from app.services.profiler import PROFILING_ENABLED, profile_request, wants_profile
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.5"))  # Seconds between event-loop lag probes
+
+# Latency buckets: 1, 1.5, 2, 3, 5, 7 per decade from 0.1 ms to 70 s, fine enough for useful p50/p95/p99 estimates
+LATENCY_BUCKETS = tuple(round(step * 10.0 ** exponent, 6)
+                        for exponent in range(-4, 2) for step in (1, 1.5, 2, 3, 5, 7))
+SIZE_BUCKETS = tuple(64 * 4 ** i for i in range(11))  # 64 B to 64 MiB
+LOOP_LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUANTILES = (0.5, 0.95, 0.99)
+
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+UNMATCHED = "<unmatched>"  # 404s and CORS preflights: one series, whatever the path
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus `le` semantics) with quantile estimates from the buckets."""
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # The last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float | None:
+        # Linear interpolation inside the bucket holding the q-th observation, like histogram_quantile()
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                if index == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[index - 1] if index else 0.0
+                return lower + (self.bounds[index] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.bounds[-1]
+
+    def cumulative(self):
+        running = 0
+        for bound, bucket_count in zip(self.bounds + ("+Inf",), self.counts):
+            running += bucket_count
+            yield bound, running
+
+
+class RouteStats:
+    __slots__ = ("statuses", "latency", "request_size", "response_size")
+
+    def __init__(self):
+        self.statuses = Counter()
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.request_size = Histogram(SIZE_BUCKETS)
+        self.response_size = Histogram(SIZE_BUCKETS)
+
+
+class MetricsRegistry:
+    """In-process request metrics, keyed by (method, route template).
+
+    Updated only from the event loop thread, so no locking. Each worker process keeps its own numbers;
+    quantiles are estimated over everything since startup.
+    """
+
+    def __init__(self):
+        self.routes: dict[tuple, RouteStats] = {}
+        self.in_flight = Counter()  # method -> requests being handled
+        self.loop_lag = Histogram(LOOP_LAG_BUCKETS)
+        self.loop_lag_max = 0.0
+        self.started_at = time.time()
+
+    def record(self, method: str, route: str, status: int, duration: float, request_bytes: int,
+               response_bytes: int):
+        stats = self.routes.get((method, route))
+        if stats is None:
+            stats = self.routes[(method, route)] = RouteStats()
+        stats.statuses[status] += 1
+        stats.latency.observe(duration)
+        stats.request_size.observe(request_bytes)
+        stats.response_size.observe(response_bytes)
+
+    def observe_loop_lag(self, lag: float):
+        self.loop_lag.observe(lag)
+        if lag > self.loop_lag_max:
+            self.loop_lag_max = lag
+
+    def summary(self) -> dict:
+        # Slowest routes by total time first: where the process actually spends its time
+        routes = []
+        for (method, route), stats in sorted(self.routes.items(), key=lambda item: -item[1].latency.total):
+            latency = stats.latency
+            routes.append({
+                "method": method,
+                "route": route,
+                "requests": latency.count,
+                "errors": sum(count for status, count in stats.statuses.items() if status >= 500),
+                "statuses": {str(status): count for status, count in sorted(stats.statuses.items())},
+                "total_seconds": round(latency.total, 4),
+                "mean_ms": round(latency.total / latency.count * 1000, 3),
+                **{f"p{round(q * 100)}_ms": round(latency.quantile(q) * 1000, 3) for q in QUANTILES},
+                "mean_request_bytes": round(stats.request_size.total / latency.count),
+                "mean_response_bytes": round(stats.response_size.total / latency.count),
+            })
+        lag = self.loop_lag
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "in_flight": dict(self.in_flight),
+            "event_loop_lag": {"samples": lag.count, "max_ms": round(self.loop_lag_max * 1000, 3),
+                               **{f"p{round(q * 100)}_ms": round(lag.quantile(q) * 1000, 3) if lag.count else None
+                                  for q in QUANTILES}},
+            "routes": routes,
+        }
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        write = lines.append
+        routes = sorted(self.routes.items())
+
+        write("# HELP http_requests_total Requests handled, by method, route template and status code.")
+        write("# TYPE http_requests_total counter")
+        for (method, route), stats in routes:
+            labels = _labels(method=method, route=route)
+            for status, count in sorted(stats.statuses.items()):
+                write(f'http_requests_total{{{labels},status="{status}"}} {count}')
+
+        for name, attribute, help_text in (
+                ("http_request_duration_seconds", "latency", "Time from request start until the response is sent."),
+                ("http_request_size_bytes", "request_size", "Request body size."),
+                ("http_response_size_bytes", "response_size", "Response body size.")):
+            write(f"# HELP {name} {help_text}")
+            write(f"# TYPE {name} histogram")
+            for (method, route), stats in routes:
+                _write_histogram(write, name, _labels(method=method, route=route), getattr(stats, attribute))
+
+        write("# HELP http_request_duration_quantile_seconds Latency quantiles estimated from the histogram buckets.")
+        write("# TYPE http_request_duration_quantile_seconds gauge")
+        for (method, route), stats in routes:
+            labels = _labels(method=method, route=route)
+            for q in QUANTILES:
+                write(f'http_request_duration_quantile_seconds{{{labels},quantile="{q}"}} '
+                      f'{stats.latency.quantile(q):.6f}')
+
+        write("# HELP http_requests_in_flight Requests currently being handled.")
+        write("# TYPE http_requests_in_flight gauge")
+        for method, count in sorted(self.in_flight.items()):
+            write(f"http_requests_in_flight{{{_labels(method=method)}}} {count}")
+
+        write("# HELP event_loop_lag_seconds How late the event loop ran a timer scheduled every "
+              f"{LOOP_LAG_INTERVAL}s.")
+        write("# TYPE event_loop_lag_seconds histogram")
+        _write_histogram(write, "event_loop_lag_seconds", "", self.loop_lag)
+        write("# HELP event_loop_lag_max_seconds Largest event loop lag seen since startup.")
+        write("# TYPE event_loop_lag_max_seconds gauge")
+        write(f"event_loop_lag_max_seconds {self.loop_lag_max:.6f}")
+
+        write("# HELP process_start_time_seconds Start time of the process since the Unix epoch.")
+        write("# TYPE process_start_time_seconds gauge")
+        write(f"process_start_time_seconds {self.started_at:.3f}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_histogram(write, name: str, labels: str, histogram: Histogram):
+    prefix = labels + "," if labels else ""
+    for bound, running in histogram.cumulative():
+        write(f'{name}_bucket{{{prefix}le="{bound}"}} {running}')
+    suffix = f"{{{labels}}}" if labels else ""
+    write(f"{name}_sum{suffix} {histogram.total:.6f}")
+    write(f"{name}_count{suffix} {histogram.count}")
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route counts, latency, in-flight requests and payload sizes.
+
+    The route template (e.g. /data/country-info/{name}) is read from the shared scope once the router has
+    filled it in (see route_template), so recording costs a few dict and bisect operations per request. Streaming
+    responses are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = metrics, profiling: bool = PROFILING_ENABLED):
+        self.app = app
+        self.registry = registry
+        self.profiling = profiling
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if self.profiling and wants_profile(scope["query_string"]):
+            await profile_request(self.app, scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in METHODS else "OTHER"
+        status = 500  # Unless a response starts, an exception escaped: ServerErrorMiddleware answers 500
+        request_bytes = response_bytes = 0
+
+        async def counting_receive():
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            elif message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = self.registry.in_flight
+        in_flight[method] += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            duration = time.perf_counter() - started
+            in_flight[method] -= 1
+            self.registry.record(method, route_template(scope), status, duration, request_bytes, response_bytes)
+
+
+def route_template(scope) -> str:
+    # Recent FastAPI versions match include_router() routers lazily: scope["route"] is then the APIRoute
+    # relative to its router, and the full template (prefix included) is on the effective route context.
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    route = context if context is not None else scope.get("route")
+    return getattr(route, "path_format", None) or UNMATCHED
+
+
+class LoopLagMonitor:
+    """Background task measuring how late the event loop wakes a periodic timer.
+
+    Lag well above zero means something blocked the loop (CPU work or blocking I/O in an async route).
+    """
+
+    def __init__(self, registry: MetricsRegistry = metrics, interval: float = LOOP_LAG_INTERVAL):
+        self.registry = registry
+        self.interval = interval
+        self._task = None
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.registry.observe_loop_lag(max(0.0, loop.time() - expected))
+
+
+loop_lag_monitor = LoopLagMonitor()
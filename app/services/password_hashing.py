@@ -0,0 +1,199 @@
+# app/services/password_hashing.py
+import asyncio
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+# bcrypt/argon2 are deliberately slow, so they run in a separate, bounded process pool: the event loop and the
+# default threadpool stay free for cheap endpoints, and workers run at a lower CPU priority (PASSWORD_HASH_NICE).
+WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(WORKERS * 8)))
+WORKER_NICE = int(os.getenv("PASSWORD_HASH_NICE", "5"))
+
+# Cost factors: bcrypt "rounds" (log2 iterations) and argon2 "time_cost"
+DEFAULT_COST = {"bcrypt": int(os.getenv("BCRYPT_ROUNDS", "12")), "argon2": int(os.getenv("ARGON2_TIME_COST", "3"))}
+COST_LIMITS = {"bcrypt": (4, int(os.getenv("BCRYPT_MAX_ROUNDS", "15"))),
+               "argon2": (1, int(os.getenv("ARGON2_MAX_TIME_COST", "10")))}
+# Verification runs at the cost stored in the hash itself, so these bound argon2's other parameters as well
+ARGON2_MAX_MEMORY_COST = int(os.getenv("ARGON2_MAX_MEMORY_COST", str(256 * 1024)))  # KiB
+ARGON2_MAX_PARALLELISM = int(os.getenv("ARGON2_MAX_PARALLELISM", "8"))
+SCHEMES = tuple(DEFAULT_COST)
+
+_BCRYPT_HASH = re.compile(r"\$2[abxy]?\$(\d{1,2})\$")
+_ARGON2_HASH = re.compile(r"\$argon2(?:id|i|d)\$(?:v=\d+\$)?m=(\d{1,10}),t=(\d{1,10}),p=(\d{1,10})[,$]")
+
+
+class PoolSaturatedError(Exception):
+    """Raised instead of queueing when the hashing pool already has MAX_PENDING jobs."""
+
+
+class SchemeUnavailableError(ValueError):
+    pass
+
+
+# --- Worker side (runs in the child processes) ---
+def _init_worker(nice: int):
+    if nice and hasattr(os, "nice"):
+        os.nice(nice)
+
+
+def _cost_setting(scheme: str) -> str:
+    return "rounds" if scheme == "bcrypt" else "time_cost"
+
+
+@lru_cache(maxsize=None)
+def _handler(scheme: str, cost: int):
+    from passlib import hash as passlib_hash
+
+    handler = getattr(passlib_hash, scheme)
+    if not handler.has_backend():
+        raise SchemeUnavailableError(f"Scheme '{scheme}' is not available on this server (missing backend).")
+    return handler.using(**{_cost_setting(scheme): cost})
+
+
+@lru_cache(maxsize=1)
+def _context():
+    from passlib.context import CryptContext
+
+    # Only schemes whose backend is installed; the default costs decide `needs_rehash`.
+    from passlib import hash as passlib_hash
+    schemes = [scheme for scheme in SCHEMES if getattr(passlib_hash, scheme).has_backend()]
+    settings = {f"{scheme}__{_cost_setting(scheme)}": DEFAULT_COST[scheme] for scheme in schemes}
+    return CryptContext(schemes=schemes, **settings)
+
+
+def _hash(password: str, scheme: str, cost: int) -> str:
+    return _handler(scheme, cost).hash(password)
+
+
+def _verify(password: str, hashed: str) -> dict:
+    context = _context()
+    try:
+        valid = context.verify(password, hashed)
+    except (ValueError, TypeError):
+        return {"valid": False, "needs_rehash": False, "error": "Unrecognized or malformed hash."}
+    return {"valid": valid, "needs_rehash": valid and context.needs_update(hashed)}
+
+
+def _verify_many(pairs: list) -> list:
+    return [_verify(password, hashed) for password, hashed in pairs]
+
+
+# --- Event loop side ---
+def resolve_cost(scheme: str, cost: int | None) -> int:
+    if scheme not in DEFAULT_COST:
+        raise ValueError(f"Unsupported scheme '{scheme}'. Supported: {', '.join(SCHEMES)}.")
+    if cost is None:
+        return DEFAULT_COST[scheme]
+    low, high = COST_LIMITS[scheme]
+    if not low <= cost <= high:
+        raise ValueError(f"Cost for {scheme} must be between {low} and {high}.")
+    return cost
+
+
+def check_hash_cost(hashed: str):
+    """Raises ValueError when a hash asks for more work than COST_LIMITS allow; other strings pass unchanged.
+
+    Must run before a hash reaches a worker: a single `$2b$31$` hash would otherwise occupy it for days.
+    """
+    if hashed.startswith("$2"):
+        match = _BCRYPT_HASH.match(hashed)
+        if match is None:
+            raise ValueError("Malformed bcrypt hash.")
+        low, high = COST_LIMITS["bcrypt"]
+        if not low <= int(match.group(1)) <= high:
+            raise ValueError(f"bcrypt rounds in the hash must be between {low} and {high}.")
+    elif hashed.startswith("$argon2"):
+        match = _ARGON2_HASH.match(hashed)
+        if match is None:
+            raise ValueError("Malformed argon2 hash.")
+        memory_cost, time_cost, parallelism = (int(value) for value in match.groups())
+        low, high = COST_LIMITS["argon2"]
+        if not low <= time_cost <= high:
+            raise ValueError(f"argon2 time cost (t) in the hash must be between {low} and {high}.")
+        if memory_cost > ARGON2_MAX_MEMORY_COST:
+            raise ValueError(f"argon2 memory cost (m) in the hash must be at most {ARGON2_MAX_MEMORY_COST} KiB.")
+        if not 1 <= parallelism <= ARGON2_MAX_PARALLELISM:
+            raise ValueError(f"argon2 parallelism (p) in the hash must be between 1 and {ARGON2_MAX_PARALLELISM}.")
+
+
+class PasswordHashPool:
+    def __init__(self, workers: int = WORKERS, max_pending: int = MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self.pending = 0
+        self.completed = 0
+        self.shed = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=(WORKER_NICE,))
+        return self._executor
+
+    def _reserve(self, weight: int):
+        # Shed load up front rather than letting an unbounded queue build behind the workers. A job heavier
+        # than max_pending on its own (a large batch) is still admitted when nothing else is pending.
+        if self.pending and self.pending + weight > self.max_pending:
+            self.shed += 1
+            raise PoolSaturatedError()
+        self.pending += weight
+
+    def _release(self, weight: int):
+        self.pending -= weight
+        self.completed += weight
+
+    async def _run(self, func, *args):
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        except BrokenProcessPool:
+            self._executor = None  # A worker died; start a fresh pool on the next request
+            raise
+
+    async def _submit(self, func, *args):
+        self._reserve(1)
+        try:
+            return await self._run(func, *args)
+        finally:
+            self._release(1)
+
+    async def hash(self, password: str, scheme: str = "bcrypt", cost: int | None = None) -> str:
+        return await self._submit(_hash, password, scheme, resolve_cost(scheme, cost))
+
+    async def verify(self, password: str, hashed: str) -> dict:
+        check_hash_cost(hashed)
+        return await self._submit(_verify, password, hashed)
+
+    async def verify_many(self, pairs: list) -> list:
+        """Verify (password, hash) pairs, split into at most one chunk per worker."""
+        if not pairs:
+            return []
+        for index, (_, hashed) in enumerate(pairs):
+            try:
+                check_hash_cost(hashed)
+            except ValueError as e:
+                raise ValueError(f"Item {index}: {e}")
+        chunk_size = -(-len(pairs) // self.workers)
+        chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+        # One unit per pair, as for single requests; the whole batch is admitted or rejected as one
+        self._reserve(len(pairs))
+        try:
+            results = await asyncio.gather(*(self._run(_verify_many, chunk) for chunk in chunks))
+        finally:
+            self._release(len(pairs))
+        return [result for chunk_results in results for result in chunk_results]
+
+    def stats(self) -> dict:
+        return {"workers": self.workers, "max_pending": self.max_pending, "pending": self.pending,
+                "completed": self.completed, "shed": self.shed, "default_cost": DEFAULT_COST}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordHashPool()
@@ -0,0 +1,99 @@
+# app/services/profiler.py
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Dev-only: with REQUEST_PROFILING=1, adding ?__profile=1 to any request returns a sampled stack profile of it
+# instead of its response. Never enable this on a public deployment.
+PROFILING_ENABLED = os.getenv("REQUEST_PROFILING", "") == "1"
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "1")) / 1000
+
+# Leaf frames of threads that are only waiting (an idle event loop, parked threadpool workers)
+_IDLE_LEAVES = {("selectors.py", "select"), ("threading.py", "wait"), ("queue.py", "get"), ("runners.py", "run"),
+                ("base_events.py", "run_forever"), ("base_events.py", "run_until_complete")}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{code.co_qualname} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class StackSampler(threading.Thread):
+    """Samples the Python stacks of every other thread at a fixed interval.
+
+    Stacks are aggregated in the collapsed ("folded") format read by flamegraph.pl, speedscope and
+    inferno: one `thread;outer;...;inner count` line per distinct stack. Threads that are only waiting are
+    skipped. Everything running in the process is sampled, so other concurrent requests show up too.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        super().__init__(name="request-profiler", daemon=True)
+        self.interval = interval
+        self.samples = 0
+        self._stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self._stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+
+def wants_profile(query_string: bytes) -> bool:
+    return b"__profile=1" in query_string.split(b"&")
+
+
+async def profile_request(app, scope, receive, send):
+    """Runs the request under a StackSampler and answers with the folded stacks (text/plain).
+
+    The route's own response is discarded; its status code and the wall time are reported in headers.
+    """
+    status = None
+
+    async def discard(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    sampler = StackSampler()
+    started = time.perf_counter()
+    sampler.start()
+    try:
+        await app(scope, receive, discard)
+    finally:
+        sampler.stop()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    body = sampler.folded().encode("utf-8")
+    await send({"type": "http.response.start", "status": 200, "headers": [
+        (b"content-type", b"text/plain; charset=utf-8"),
+        (b"content-length", str(len(body)).encode()),
+        (b"x-profile-status", str(status).encode()),
+        (b"x-profile-samples", str(sampler.samples).encode()),
+        (b"x-profile-duration-ms", f"{elapsed_ms:.2f}".encode()),
+    ]})
+    await send({"type": "http.response.body", "body": body})
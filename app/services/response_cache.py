@@ -0,0 +1,156 @@
+# app/services/response_cache.py
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+# Set RESPONSE_CACHE=0 to run every request through its handler (ETag and Cache-Control are still sent).
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE", "1") != "0"
+# Larger bodies still get an ETag but are not kept in memory
+MAX_CACHED_BODY = int(os.getenv("RESPONSE_CACHE_MAX_BODY", str(256 * 1024)))
+
+CONDITIONAL_METHODS = ("GET", "HEAD")  # 304 and Cache-Control only make sense for these
+_HOP_HEADERS = frozenset((b"content-length", b"etag", b"cache-control", b"x-cache"))
+
+response_caches: dict[str, "ResponseCache"] = {}  # "router_module.endpoint" -> cache, for /diagnostics/response-cache
+
+
+class ResponseCache:
+    """LRU of rendered responses for one route, bounded by entry count and age.
+
+    Entries are (stored_at, status, headers, body, etag). Only complete 200 responses are stored.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_age: int | None, when=None, precompress: bool = False):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_age = ttl if max_age is None else max_age
+        self.when = when  # Optional predicate on the Request: False skips the cache for that request
+        self.precompress = precompress
+        self.cache_control = f"public, max-age={int(self.max_age)}" if self.max_age > 0 else "no-cache"
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: bytes):
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: bytes, response: Response):
+        body = response.body
+        headers = [(name, value) for name, value in response.raw_headers if name not in _HOP_HEADERS]
+        entry = (time.monotonic(), response.status_code, headers, body, strong_etag(body))
+        if RESPONSE_CACHE_ENABLED and len(body) <= MAX_CACHED_BODY:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"size": len(self._entries), "max_entries": self.max_entries, "ttl": self.ttl,
+                "max_age": self.max_age, "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None}
+
+
+def cached(ttl: float = 3600, max_entries: int = 1024, max_age: int | None = None, when=None,
+           precompress: bool = False):
+    """Marks a route as a pure function of its request, for routers created with route_class=CachedRoute.
+
+    Put it below the @router decorator. Responses are cached in-process for `ttl` seconds (LRU beyond
+    `max_entries`); GET responses also carry an ETag and `Cache-Control: public, max-age` (default: ttl) for
+    browsers and the CDN, and a matching If-None-Match is answered with 304. `precompress=True` is for routes
+    with a handful of static payloads: CompressionMiddleware then compresses each once, at the highest level.
+    """
+    def decorate(endpoint):
+        name = f"{endpoint.__module__.rsplit('.', 1)[-1]}.{endpoint.__qualname__}"
+        endpoint.response_cache = response_caches[name] = ResponseCache(ttl, max_entries, max_age, when,
+                                                                        precompress)
+        return endpoint
+
+    return decorate
+
+
+def strong_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+async def request_key(request: Request) -> bytes:
+    # Path (with path parameters) + query parameters in sorted order + canonical JSON body, so that
+    # parameter order, JSON key order and whitespace do not split the cache.
+    query = sorted(request.query_params.multi_items())
+    body = await request.body()  # Cached on the Request, so the handler does not read it again
+    if body:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        except ValueError:
+            pass  # Not JSON: the raw bytes are the key (the handler will reject it anyway)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{request.method} {request.url.path} {query!r}\n".encode("utf-8"))
+    digest.update(body)
+    return digest.digest()
+
+
+def _respond(request: Request, cache: ResponseCache, entry, hit: bool) -> Response:
+    _, status_code, headers, body, etag = entry
+    conditional = request.method in CONDITIONAL_METHODS
+    if conditional and etag_matches(request.headers.get("if-none-match", ""), etag):
+        response = Response(status_code=304)
+    else:
+        response = Response(body, status_code=status_code)  # Sets content-length only
+        response.raw_headers += headers
+    if conditional:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = cache.cache_control
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+
+class CachedRoute(APIRoute):
+    """APIRoute that serves routes marked with @cached from their ResponseCache; other routes are unchanged."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        cache = getattr(self.endpoint, "response_cache", None)
+        if cache is None:
+            return handler
+
+        async def cached_handler(request: Request) -> Response:
+            if cache.when is not None and not cache.when(request):
+                return await handler(request)
+            if cache.precompress:
+                request.state.precompress = True  # Read by CompressionMiddleware
+            key = await request_key(request)
+            entry = cache.get(key)
+            if entry is not None:
+                return _respond(request, cache, entry, hit=True)
+            response = await handler(request)
+            # Errors, streams and other statuses pass through untouched
+            if response.status_code != 200 or not hasattr(response, "body") or response.background is not None:
+                return response
+            return _respond(request, cache, cache.store(key, response), hit=False)
+
+        return cached_handler
+
+
+def stats() -> dict:
+    return {name: cache.stats() for name, cache in sorted(response_caches.items())}
@@ -0,0 +1,64 @@
+# app/services/responses.py
+import json
+import os
+
+from fastapi.responses import JSONResponse
+
+# Optional fast encoders, tried in this order; json from the standard library is the fallback.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Set FAST_JSON_RESPONSES=0 to render everything with the stock JSONResponse (e.g. to compare, see
+# benchmarks/bench_responses.py). Trusted routes then also go back through FastAPI's validation and encoding.
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "1") != "0"
+
+
+def _encode_with_json(content) -> bytes:
+    # Same output as Starlette's JSONResponse
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+if orjson is not None:
+    ENCODER = "orjson"
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def _encode(content) -> bytes:
+        return orjson.dumps(content, option=_OPTIONS)
+elif msgspec is not None:
+    ENCODER = "msgspec"
+    _encode = msgspec.json.Encoder().encode
+else:
+    ENCODER = "json"
+    _encode = _encode_with_json
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson or msgspec when installed.
+
+    Content the fast encoder refuses (integers beyond 64 bits, unusual types) is rendered by json instead,
+    so the output never depends on which encoder is available.
+    """
+
+    def render(self, content) -> bytes:
+        try:
+            return _encode(content)
+        except (TypeError, ValueError, OverflowError):  # orjson.JSONEncodeError is a TypeError
+            return _encode_with_json(content)
+
+
+DefaultJSONResponse = FastJSONResponse if FAST_JSON_RESPONSES else JSONResponse
+
+
+def trusted_json(content):
+    """Response for hot routes whose content is already plain JSON data (dicts, lists, str, int, float, bool, None).
+
+    Returning a Response skips FastAPI's response_model validation and jsonable_encoder pass, which for
+    large lists costs more than the encoding itself. The route's response_model still documents the shape.
+    """
+    return FastJSONResponse(content) if FAST_JSON_RESPONSES else content
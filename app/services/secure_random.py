@@ -0,0 +1,101 @@
+# app/services/secure_random.py
+import os
+import secrets
+import string
+from functools import lru_cache
+
+CHARACTER_CLASSES = {
+    "lowercase": string.ascii_lowercase,
+    "uppercase": string.ascii_uppercase,
+    "digits": string.digits,
+    "symbols": string.punctuation,
+}
+MAX_COVERAGE_ATTEMPTS = 1000
+
+
+class Alphabet:
+    """An ASCII alphabet (2-256 chars) with a precomputed byte translation table.
+
+    Random bytes are mapped with bytes.translate(): values below the largest multiple of the
+    alphabet size map to alphabet[b % size] and the rest are deleted (rejection sampling), so every
+    character is equally likely and the whole mapping runs in C.
+    """
+
+    def __init__(self, characters: str):
+        if not 2 <= len(characters) <= 256 or len(set(characters)) != len(characters):
+            raise ValueError("Alphabet must have 2-256 unique characters.")
+        if not characters.isascii():
+            raise ValueError("Alphabet must be ASCII.")
+        self.characters = characters
+        size = len(characters)
+        self._limit = 256 - (256 % size)
+        self._table = bytes(ord(characters[b % size]) for b in range(256))
+        self._rejected = bytes(range(self._limit, 256))
+        self._acceptance = self._limit / 256
+
+    def draw(self, count: int) -> bytes:
+        """`count` uniformly random characters from the alphabet, as ASCII bytes."""
+        result = bytearray()
+        while len(result) < count:
+            missing = count - len(result)
+            # Over-draw a little so one urandom call almost always suffices.
+            raw = os.urandom(int(missing / self._acceptance * 1.05) + 16)
+            result += raw.translate(self._table, self._rejected)
+        return bytes(result[:count])
+
+
+@lru_cache(maxsize=64)
+def get_alphabet(characters: str) -> Alphabet:
+    return Alphabet(characters)
+
+
+def password_alphabet(classes: tuple) -> Alphabet:
+    return get_alphabet("".join(CHARACTER_CLASSES[name] for name in classes))
+
+
+def _covers(password: bytes, class_sets: list) -> bool:
+    return all(not class_set.isdisjoint(password) for class_set in class_sets)
+
+
+@lru_cache(maxsize=16)
+def _class_sets(classes: tuple) -> list:
+    return [frozenset(CHARACTER_CLASSES[name].encode()) for name in classes]
+
+
+def generate_passwords(length: int, count: int = 1, classes: tuple = ("lowercase", "uppercase", "digits", "symbols"),
+                       require_each_class: bool = True) -> list:
+    """Cryptographically secure passwords drawn in bulk from os.urandom.
+
+    With require_each_class, candidates missing a selected class are rejected and redrawn, which keeps
+    the result uniform over all passwords that contain every class.
+    """
+    if require_each_class and length < len(classes):
+        raise ValueError("Password length must be at least the number of required character classes.")
+    alphabet = password_alphabet(classes)
+    class_sets = _class_sets(classes) if require_each_class else []
+    passwords = []
+    attempts = 0
+    while len(passwords) < count:
+        needed = count - len(passwords)
+        pool = alphabet.draw(needed * length)
+        for start in range(0, needed * length, length):
+            candidate = pool[start:start + length]
+            if not class_sets or _covers(candidate, class_sets):
+                passwords.append(candidate.decode("ascii"))
+        attempts += 1
+        if attempts > MAX_COVERAGE_ATTEMPTS:
+            raise RuntimeError("Could not satisfy character class coverage.")
+    return passwords
+
+
+def generate_tokens(kind: str, count: int = 1, nbytes: int = 32, length: int = 32, alphabet: str | None = None,
+                    prefix: str = "") -> list:
+    """API keys/tokens: 'hex' and 'urlsafe' encode `nbytes` of entropy; 'alphabet' draws `length` characters."""
+    if kind == "hex":
+        return [prefix + secrets.token_hex(nbytes) for _ in range(count)]
+    if kind == "urlsafe":
+        return [prefix + secrets.token_urlsafe(nbytes) for _ in range(count)]
+    if kind == "alphabet":
+        chars = get_alphabet(alphabet).draw(count * length).decode("ascii")
+        return [prefix + chars[i:i + length] for i in range(0, count * length, length)]
+    raise ValueError(kind)
@@ -0,0 +1,210 @@
+# app/services/text_ops.py
+import string
+import unicodedata
+from functools import partial
+
+from app.services.base64_stream import CODECS as BASE64_CODECS
+from app.services.hashing import HASH_ALGORITHMS
+
+CASE_TARGETS = ("uppercase", "lowercase", "titlecase", "camelcase", "pascalcase", "snakecase", "constantcase",
+                "kebabcase", "dotcase")
+
+# --- Translation tables (built once; str.translate does the per-character work in C) ---
+# Letters that NFKD does not decompose into ASCII, plus typographic dashes.
+_TRANSLITERATIONS = {
+    "ß": "ss", "ẞ": "SS", "æ": "ae", "Æ": "AE", "œ": "oe", "Œ": "OE", "ø": "o", "Ø": "O", "đ": "d", "Đ": "D",
+    "ð": "d", "Ð": "D", "ł": "l", "Ł": "L", "þ": "th", "Þ": "TH", "ı": "i", "ĸ": "k", "ŋ": "n", "Ŋ": "N",
+    "ſ": "s", "\u2010": "-", "\u2011": "-", "\u2012": "-", "\u2013": "-", "\u2014": "-", "\u2212": "-",
+}
+# After lower-casing ASCII text: keep [a-z0-9], turn whitespace and '-' into word breaks, drop everything else.
+_SLUG_TABLE = {code: None for code in range(128)}
+_SLUG_TABLE.update({ord(char): char for char in string.ascii_lowercase + string.digits})
+_SLUG_TABLE.update({ord(char): " " for char in string.whitespace + "-" + "\x1c\x1d\x1e\x1f"})
+# Bulk mode joins a whole list with a NUL sentinel and converts it in one pass of each step.
+_BULK_SENTINEL = "\x00"
+_BULK_SLUG_TABLE = {**_SLUG_TABLE, 0: _BULK_SENTINEL}  # 1:1 ASCII mappings keep translate() on its fast path
+
+
+# --- Single-string transformations (shared by the /text endpoints and /text/pipeline) ---
+def transliterate(text: str) -> str:
+    """Closest ASCII spelling ("Café" -> "Cafe", "Straße" -> "Strasse"); characters without one are dropped."""
+    if text.isascii():
+        return text
+    # A handful of substring scans beats a per-character lookup, especially on the joined text of bulk mode.
+    for char, replacement in _TRANSLITERATIONS.items():
+        if char in text:
+            text = text.replace(char, replacement)
+    # NFKD splits accented letters into base letter + combining mark; the ASCII encode drops the marks.
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def slugify(text: str, separator: str = "-") -> str:
+    return separator.join(transliterate(text).lower().translate(_SLUG_TABLE).split())
+
+
+def _camel_words(text: str) -> list:
+    # Word delimiters: whitespace, '_' and '-'. replace() stays fast on non-ASCII text, translate() does not.
+    return text.replace("_", " ").replace("-", " ").split()
+
+
+def convert_case(text: str, to_case: str) -> str:
+    """Raises ValueError for an unknown target case."""
+    converter = CASE_CONVERTERS.get(to_case)
+    if converter is None:
+        raise ValueError(f"Invalid case '{to_case}'. Supported: {', '.join(CASE_TARGETS)}.")
+    return converter(text)
+
+
+def _camelcase(text: str) -> str:
+    words = _camel_words(text)
+    if not words:
+        return ""
+    return words[0].lower() + "".join(map(str.capitalize, words[1:]))
+
+
+def _pascalcase(text: str) -> str:
+    return "".join(map(str.capitalize, _camel_words(text)))
+
+
+CASE_CONVERTERS = {
+    "uppercase": str.upper,
+    "lowercase": str.lower,
+    "titlecase": str.title,
+    "camelcase": _camelcase,
+    "pascalcase": _pascalcase,
+    "snakecase": partial(slugify, separator="_"),
+    "constantcase": lambda text: slugify(text, "_").upper(),
+    "kebabcase": slugify,
+    "dotcase": partial(slugify, separator="."),
+}
+
+
+def _slugify_joined(joined: str, separator: str) -> str:
+    joined = transliterate(joined).lower().translate(_BULK_SLUG_TABLE).replace(_BULK_SENTINEL, " \x00 ")
+    joined = separator.join(joined.split())  # The padded sentinel survives split() as a token of its own
+    # Words on either side of a sentinel belong to different inputs: drop the separators around it.
+    return joined.replace(separator + _BULK_SENTINEL, _BULK_SENTINEL).replace(_BULK_SENTINEL + separator,
+                                                                                _BULK_SENTINEL)
+
+
+# to_case -> function over the joined text; camel/Pascal case need per-word work and are mapped per string.
+_BULK_CONVERTERS = {
+    "uppercase": str.upper,
+    "lowercase": str.lower,
+    "titlecase": str.title,
+    "snakecase": partial(_slugify_joined, separator="_"),
+    "constantcase": lambda joined: _slugify_joined(joined, "_").upper(),
+    "kebabcase": partial(_slugify_joined, separator="-"),
+    "dotcase": partial(_slugify_joined, separator="."),
+}
+
+
+def convert_many(texts: list, to_case: str) -> list:
+    """Bulk convert_case with the same results as converting each string on its own."""
+    convert_case("", to_case)  # validates to_case
+    bulk = _BULK_CONVERTERS.get(to_case)
+    if bulk is None or not texts:
+        return list(map(CASE_CONVERTERS[to_case], texts))
+    joined = _BULK_SENTINEL.join(texts)
+    if joined.count(_BULK_SENTINEL) != len(texts) - 1:  # An input contains the sentinel itself
+        return list(map(CASE_CONVERTERS[to_case], texts))
+    return bulk(joined).split(_BULK_SENTINEL)
+
+
+def word_stats(text: str) -> dict:
+    return {
+        "word_count": len(text.split()) if text else 0,
+        "character_count_with_spaces": len(text),
+        "character_count_without_spaces": len(text.replace(" ", "")),
+        "line_count": len(text.splitlines()) if text else 0,
+    }
+
+
+# --- Pipeline ---
+def _hash(algorithm: str, text: str) -> str:
+    return HASH_ALGORITHMS[algorithm](text.encode("utf-8")).hexdigest()
+
+
+def _base64(action: str, variant: str, text: str) -> str:
+    encode, decode = BASE64_CODECS[variant][:2]
+    if action == "encode":
+        return encode(text.encode("utf-8")).decode("ascii")
+    return decode(text.encode("ascii")).decode("utf-8")
+
+
+def _build_case(options: dict):
+    to_case = options.get("to_case", "lowercase")
+    if to_case not in CASE_CONVERTERS:
+        raise ValueError(f"Invalid case '{to_case}'. Supported: {', '.join(CASE_TARGETS)}.")
+    return CASE_CONVERTERS[to_case]
+
+
+def _build_hash(options: dict):
+    algorithm = str(options.get("algorithm", "sha256")).lower()
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Unsupported hash algorithm '{algorithm}'. Supported: {', '.join(HASH_ALGORITHMS)}.")
+    return partial(_hash, algorithm)
+
+
+def _build_base64(options: dict):
+    action = options.get("action", "encode")
+    variant = options.get("variant", "standard")
+    if action not in ("encode", "decode"):
+        raise ValueError("Invalid base64 action. Supported: encode, decode.")
+    if variant not in BASE64_CODECS:
+        raise ValueError(f"Invalid base64 variant. Supported: {', '.join(BASE64_CODECS)}.")
+    return partial(_base64, action, variant)
+
+
+# op name -> builder(options) returning a str -> value function. "word-count" returns a dict, so it must come last.
+OPERATIONS = {
+    "case": _build_case,
+    "slug": lambda options: slugify,
+    "reverse": lambda options: lambda text: text[::-1],
+    "strip": lambda options: str.strip,
+    "hash": _build_hash,
+    "base64": _build_base64,
+    "word-count": lambda options: word_stats,
+}
+TERMINAL_OPERATIONS = {"word-count"}
+# Shorthands: "uppercase", "snakecase", ... are "case" with that target.
+OPERATION_ALIASES = {to_case: ("case", {"to_case": to_case}) for to_case in CASE_TARGETS}
+SUPPORTED_OPERATIONS = ", ".join([*OPERATIONS, *OPERATION_ALIASES])
+
+
+def compile_pipeline(steps: list) -> list:
+    """Validate a chain of steps once and return the functions to apply, in order.
+
+    A step is an op name ("slug") or a dict {"op": "hash", "options": {"algorithm": "md5"}}.
+    Raises ValueError describing the first invalid step.
+    """
+    functions = []
+    for position, step in enumerate(steps):
+        op, options = (step, {}) if isinstance(step, str) else (step.get("op"), step.get("options") or {})
+        if op in OPERATION_ALIASES:
+            op, alias_options = OPERATION_ALIASES[op]
+            options = {**alias_options, **options}
+        if op not in OPERATIONS:
+            raise ValueError(f"Step {position}: unknown operation '{op}'. Supported: {SUPPORTED_OPERATIONS}.")
+        if op in TERMINAL_OPERATIONS and position != len(steps) - 1:
+            raise ValueError(f"Step {position}: '{op}' produces counts and must be the last step.")
+        try:
+            functions.append(OPERATIONS[op](options))
+        except ValueError as e:
+            raise ValueError(f"Step {position}: {e}")
+    return functions
+
+
+def run_pipeline(functions: list, text: str):
+    for function in functions:
+        text = function(text)
+    return text
+
+
+def iter_pipeline(functions: list, texts: list):
+    """(index, result, error) per input; a failing input (e.g. invalid base64) does not stop the batch."""
+    for index, text in enumerate(texts):
+        try:
+            yield index, run_pipeline(functions, text), None
+        except (ValueError, UnicodeError) as e:  # binascii.Error is a ValueError
+            yield index, None, str(e) or e.__class__.__name__
@@ -0,0 +1,136 @@
+# app/services/text_stats.py
+import codecs
+import os
+import string
+from collections import Counter
+
+from starlette.concurrency import run_in_threadpool
+
+OFFLOAD_BUFFER_SIZE = 1024 * 1024
+# Bounds the word-frequency table: past this many distinct words the rarest half is dropped and the
+# reported counts become approximate (lower bounds).
+TOP_WORDS_MAX_DISTINCT = int(os.getenv("TEXT_STATS_MAX_DISTINCT_WORDS", "500000"))
+MAX_TRACKED_WORD_LENGTH = 256
+
+# Everything str.splitlines() treats as a line boundary, besides "\r\n" (one boundary, two characters).
+_ASCII_LINE_BREAKS = ("\n", "\r", "\v", "\f", "\x1c", "\x1d", "\x1e")
+_UNICODE_LINE_BREAKS = ("\x85", "\u2028", "\u2029")
+_LINE_BREAKS = frozenset(_ASCII_LINE_BREAKS + _UNICODE_LINE_BREAKS)
+_WORD_PUNCTUATION = string.punctuation + "“”‘’«»…"
+# ASCII text: whitespace (as str.split() sees it) -> " ", anything else -> "x"; words are then counted as " x"
+# boundaries without building a list of words.
+_ASCII_WHITESPACE = " \t\n\r\v\f\x1c\x1d\x1e\x1f"
+_WORD_SHAPE = {code: " " if chr(code) in _ASCII_WHITESPACE else "x" for code in range(128)}
+
+
+class TextStats:
+    """Incremental version of text_ops.word_stats over a stream of bytes, plus byte count and word frequencies.
+
+    Chunks may split multi-byte characters, words and "\\r\\n" pairs; the counts come out the same as
+    for the whole text at once. Only the current chunk and a partial word are held between updates.
+    """
+
+    def __init__(self, top: int = 0, encoding: str = "utf-8"):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self.top = top
+        self.byte_count = 0
+        self.characters = 0
+        self.spaces = 0
+        self.words = 0
+        self.line_breaks = 0
+        self._last_char = ""
+        # Word cut by a chunk edge: _mid_word is True and _carry holds its text (None once it is too long to track)
+        self._mid_word = False
+        self._carry = ""
+        self._frequencies = Counter()
+        self.approximate = False
+
+    def update(self, data: bytes):
+        self.byte_count += len(data)
+        self._feed(self._decoder.decode(data))
+
+    def finish(self) -> dict:
+        self._feed(self._decoder.decode(b"", final=True))
+        if self._mid_word:
+            self._tally([self._carry])
+            self._mid_word = False
+        return self.result()
+
+    def _feed(self, text: str):
+        if not text:
+            return
+        self.characters += len(text)
+        self.spaces += text.count(" ")
+        self._count_line_breaks(text)
+
+        continues_word = self._mid_word and not text[0].isspace()
+        if self.top or not text.isascii():
+            words = text.split()
+            self.words += len(words) - (1 if continues_word and words else 0)
+            if self.top:
+                self._collect(text, words, continues_word)
+        else:
+            shape = text.translate(_WORD_SHAPE)
+            self.words += shape.count(" x") + (shape[0] == "x" and not continues_word)
+        self._mid_word = not text[-1].isspace()
+        self._last_char = text[-1]
+
+    def _count_line_breaks(self, text: str):
+        breaks = sum(text.count(char) for char in _ASCII_LINE_BREAKS) - text.count("\r\n")
+        if not text.isascii():
+            breaks += sum(text.count(char) for char in _UNICODE_LINE_BREAKS)
+        if self._last_char == "\r" and text[0] == "\n":
+            breaks -= 1  # "\r\n" split across chunks
+        self.line_breaks += breaks
+
+    def _collect(self, text: str, words: list, continues_word: bool):
+        if continues_word:
+            first = words.pop(0)
+            if self._carry is not None:
+                words.insert(0, self._carry + first)
+        elif self._mid_word:
+            self._tally([self._carry])
+        if not text[-1].isspace():
+            carry = words.pop() if words else ""
+            self._carry = carry if len(carry) <= MAX_TRACKED_WORD_LENGTH else None
+        self._tally(words)
+
+    def _tally(self, words: list):
+        # Count raw tokens in C first, then normalize each distinct token once.
+        frequencies = self._frequencies
+        for token, count in Counter(words).items():
+            word = token.strip(_WORD_PUNCTUATION).lower() if token is not None else ""
+            if word:
+                frequencies[word] += count
+        if len(self._frequencies) > TOP_WORDS_MAX_DISTINCT:
+            self._frequencies = Counter(dict(self._frequencies.most_common(TOP_WORDS_MAX_DISTINCT // 2)))
+            self.approximate = True
+
+    def result(self) -> dict:
+        lines = self.line_breaks + (1 if self.characters and self._last_char not in _LINE_BREAKS else 0)
+        result = {
+            "word_count": self.words,
+            "character_count_with_spaces": self.characters,
+            "character_count_without_spaces": self.characters - self.spaces,
+            "line_count": lines,
+            "byte_count": self.byte_count,
+        }
+        if self.top:
+            result["top_words"] = [{"word": word, "count": count}
+                                   for word, count in self._frequencies.most_common(self.top)]
+            result["top_words_approximate"] = self.approximate
+        return result
+
+
+async def stats_stream(chunks, top: int = 0, encoding: str = "utf-8") -> dict:
+    # Same buffering as hashing.hash_stream: ~1 MiB pieces counted in the threadpool, memory bounded.
+    stats = TextStats(top, encoding)
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= OFFLOAD_BUFFER_SIZE:
+            await run_in_threadpool(stats.update, bytes(buffer))
+            buffer.clear()
+    if buffer:
+        await run_in_threadpool(stats.update, bytes(buffer))
+    return stats.finish()
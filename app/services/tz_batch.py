@@ -0,0 +1,103 @@
+# app/services/tz_batch.py
+import bisect
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from app.services.lazy import lazy_import
+
+pytz = lazy_import("pytz", group="data")
+
+DT_FORMAT = "%Y-%m-%d %H:%M:%S"
+_REFERENCE_DT = datetime(2000, 1, 1)
+
+
+def _format_offset(offset: timedelta) -> str:
+    # Same output as strftime("%z"), including seconds for historic LMT offsets.
+    sign = "-" if offset < timedelta(0) else "+"
+    seconds = int(abs(offset).total_seconds())
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{sign}{hours:02d}{minutes:02d}" + (f"{seconds:02d}" if seconds else "")
+
+
+def parse_naive(dt_str: str) -> datetime:
+    # Strict "YYYY-MM-DD HH:MM:SS", like the single-conversion endpoint, but via the much faster fromisoformat.
+    if len(dt_str) != 19 or dt_str[10] != " ":
+        raise ValueError(dt_str)
+    return datetime.fromisoformat(dt_str)
+
+
+class ZoneTable:
+    """A pytz zone flattened into its UTC transition table, for conversions without per-row tzinfo work."""
+
+    __slots__ = ("name", "tz", "times", "offsets", "suffixes")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.tz = pytz.timezone(name)
+        transition_times = getattr(self.tz, "_utc_transition_times", None)
+        if transition_times:
+            self.times = transition_times
+            infos = [(offset, tzname) for offset, _, tzname in self.tz._transition_info]
+        else:  # UTC and fixed-offset zones
+            self.times = [datetime.min]
+            infos = [(self.tz.utcoffset(_REFERENCE_DT), self.tz.tzname(_REFERENCE_DT))]
+        self.offsets = [offset for offset, _ in infos]
+        self.suffixes = [f" {tzname}{_format_offset(offset)}" for offset, tzname in infos]
+
+    def index_for_utc(self, utc_naive: datetime) -> int:
+        return max(0, bisect.bisect_right(self.times, utc_naive) - 1)
+
+    def from_utc(self, utc_naive: datetime) -> str:
+        index = self.index_for_utc(utc_naive)
+        return (utc_naive + self.offsets[index]).isoformat(" ") + self.suffixes[index]
+
+    def to_utc(self, local_naive: datetime):
+        # Returns (utc_naive, formatted local). Only DST gaps/overlaps fall back to pytz's localize().
+        guess = self.index_for_utc(local_naive)
+        candidates = []
+        for index in (guess - 1, guess, guess + 1):
+            if 0 <= index < len(self.offsets):
+                utc_naive = local_naive - self.offsets[index]
+                if self.index_for_utc(utc_naive) == index:
+                    candidates.append((utc_naive, index))
+        if len(candidates) == 1:
+            utc_naive, index = candidates[0]
+            return utc_naive, local_naive.isoformat(" ") + self.suffixes[index]
+        aware = self.tz.localize(local_naive)
+        return aware.astimezone(pytz.utc).replace(tzinfo=None), aware.strftime(DT_FORMAT + " %Z%z")
+
+
+@lru_cache(maxsize=1024)
+def get_zone_table(name: str) -> ZoneTable:
+    return ZoneTable(name)
+
+
+def convert_batch(rows) -> list:
+    """Convert (dt_str, from_tz, to_tz) rows, grouped by zone pair. Results keep input order."""
+    groups: dict = {}
+    for position, (dt_str, from_tz, to_tz) in enumerate(rows):
+        groups.setdefault((from_tz, to_tz), []).append((position, dt_str))
+
+    results: list = [None] * len(rows)
+    for (from_tz, to_tz), members in groups.items():
+        try:
+            source, target = get_zone_table(from_tz), get_zone_table(to_tz)
+        except pytz.UnknownTimeZoneError as e:
+            error = {"error": f"Unknown timezone: {e.args[0] if e.args else e}"}
+            for position, _ in members:
+                results[position] = error
+            continue
+        for position, dt_str in members:
+            try:
+                utc_naive, source_str = source.to_utc(parse_naive(dt_str))
+                target_str = target.from_utc(utc_naive)
+            except ValueError:
+                results[position] = {"error": "Invalid datetime format. Use YYYY-MM-DD HH:MM:SS"}
+                continue
+            except OverflowError:
+                results[position] = {"error": "Datetime out of range for conversion."}
+                continue
+            results[position] = {"source_datetime": source_str, "source_timezone": from_tz,
+                                 "target_datetime": target_str, "target_timezone": to_tz}
+    return results
@@ -0,0 +1,81 @@
+# app/services/ua_parser.py
+import os
+from collections import Counter
+from functools import lru_cache
+
+from app.services.lazy import lazy_import
+
+user_agents = lazy_import("user_agents", group="dev")
+
+UA_CACHE_SIZE = int(os.getenv("UA_CACHE_SIZE", "4096"))
+
+
+@lru_cache(maxsize=UA_CACHE_SIZE)
+def parse_user_agent(ua_string: str) -> dict:
+    # Real traffic has few distinct UA strings, so the regex-heavy parse runs once per string.
+    # The returned dict is shared between callers and must not be mutated.
+    user_agent = user_agents.parse(ua_string)
+    return {
+        "user_agent_string": ua_string,
+        "browser_family": user_agent.browser.family,
+        "browser_version": user_agent.browser.version_string,
+        "os_family": user_agent.os.family,
+        "os_version": user_agent.os.version_string,
+        "device_family": user_agent.device.family,
+        "device_brand": user_agent.device.brand,
+        "device_model": user_agent.device.model,
+        "is_mobile": user_agent.is_mobile,
+        "is_tablet": user_agent.is_tablet,
+        "is_pc": user_agent.is_pc,
+        "is_bot": user_agent.is_bot,
+    }
+
+
+def cache_stats() -> dict:
+    info = parse_user_agent.cache_info()
+    lookups = info.hits + info.misses
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize,
+            "hit_rate": round(info.hits / lookups, 4) if lookups else None}
+
+
+def extract_from_log_line(line: str) -> str:
+    # Combined log format ends with "referer" "user-agent"; otherwise the whole line is the UA string.
+    line = line.strip()
+    if len(line) > 1 and line.endswith('"'):
+        start = line.rfind('"', 0, len(line) - 1)
+        if start != -1:
+            return line[start + 1:-1]
+    return line
+
+
+def device_type(parsed: dict) -> str:
+    if parsed["is_bot"]:
+        return "bot"
+    if parsed["is_tablet"]:
+        return "tablet"
+    if parsed["is_mobile"]:
+        return "mobile"
+    if parsed["is_pc"]:
+        return "pc"
+    return "other"
+
+
+def aggregate(ua_counts: Counter) -> tuple:
+    """Parse each distinct UA once and weight the family/OS/device tallies by occurrence count."""
+    parsed_by_ua = {ua_string: parse_user_agent(ua_string) for ua_string in ua_counts}
+    browsers, systems, devices, device_types = Counter(), Counter(), Counter(), Counter()
+    for ua_string, count in ua_counts.items():
+        parsed = parsed_by_ua[ua_string]
+        browsers[parsed["browser_family"]] += count
+        systems[parsed["os_family"]] += count
+        devices[parsed["device_family"]] += count
+        device_types[device_type(parsed)] += count
+    summary = {
+        "total": sum(ua_counts.values()),
+        "distinct": len(ua_counts),
+        "browser_families": dict(browsers.most_common()),
+        "os_families": dict(systems.most_common()),
+        "device_families": dict(devices.most_common()),
+        "device_types": dict(device_types.most_common()),
+    }
+    return parsed_by_ua, summary
@@ -0,0 +1,57 @@
+# benchmarks/bench_case.py
+# Usage: python -m benchmarks.bench_case [count]
+import random
+import re
+import sys
+import time
+
+from app.services.text_ops import convert_many
+
+WORDS = ["Hello", "world", "API", "fast", "snake_case", "kebab-case", "Title", "Example!", "v2.0", "data",
+         "Café", "naïve", "Straße", "Ångström", "crème brûlée", "  spaced  ", "tab\tbed", "CONSTANT"]
+
+
+def legacy_slugify(text: str) -> str:
+    # The previous implementation: four re.sub calls with raw patterns per string, non-ASCII dropped.
+    text = text.lower()
+    text = re.sub(r'[^a-z0-9\s-]', '', text)
+    text = re.sub(r'\s+', '-', text)
+    text = re.sub(r'-+', '-', text)
+    return text.strip('-')
+
+
+def legacy_camelcase(text: str) -> str:
+    words = re.split(r'[\s_-]+', text)
+    if not any(words):
+        return ""
+    return words[0].lower() + "".join(word.capitalize() for word in words[1:] if word)
+
+
+LEGACY = {
+    "kebabcase": legacy_slugify,
+    "snakecase": lambda text: legacy_slugify(text).replace('-', '_'),
+    "camelcase": legacy_camelcase,
+}
+
+
+def make_inputs(count: int) -> list:
+    rng = random.Random(42)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(2, 6))) for _ in range(count)]
+
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    texts = make_inputs(count)
+    for to_case, legacy in LEGACY.items():
+        old = timed(lambda: [legacy(text) for text in texts])
+        new = timed(lambda: convert_many(texts, to_case))
+        print(f"{to_case:<10} legacy {count / old:>12,.0f}/s   new {count / new:>12,.0f}/s   x{old / new:.1f}")
+    for to_case in ("pascalcase", "constantcase", "dotcase"):
+        new = timed(lambda: convert_many(texts, to_case))
+        print(f"{to_case:<12} new {count / new:>12,.0f}/s")
@@ -0,0 +1,45 @@
+# benchmarks/bench_jwt.py
+# Usage: python -m benchmarks.bench_jwt
+import timeit
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwt
+
+from app.services import jwt_tools
+
+COUNT = 2_000
+
+private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+PRIVATE_PEM = private_key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                        serialization.NoEncryption()).decode()
+PUBLIC_PEM = private_key.public_key().public_bytes(serialization.Encoding.PEM,
+                                                   serialization.PublicFormat.SubjectPublicKeyInfo).decode()
+TOKENS = [jwt.encode({"sub": f"service-{i}", "exp": 4_102_444_800}, PRIVATE_PEM, algorithm="RS256")
+          for i in range(COUNT)]
+
+
+def pem_per_request():
+    # What a naive handler does: the PEM is parsed again for every token.
+    for token in TOKENS:
+        jwt.decode(token, PUBLIC_PEM, algorithms=["RS256"])
+
+
+def cached_key():
+    jwt_tools.verification_cache._entries.clear()
+    for token in TOKENS:
+        jwt_tools.verify(token, PUBLIC_PEM, "RS256")
+
+
+def memoized():
+    for token in TOKENS:
+        jwt_tools.verify(token, PUBLIC_PEM, "RS256")
+
+
+if __name__ == "__main__":
+    memoized()  # fill the verification cache
+    for name, func in [("PEM parsed per token", pem_per_request), ("cached key object", cached_key),
+                       ("memoized verification", memoized)]:
+        seconds = min(timeit.repeat(func, number=1, repeat=3))
+        print(f"{name:<24} {COUNT / seconds:>12,.0f} verifications/s")
+    print(jwt_tools.stats())
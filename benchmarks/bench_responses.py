@@ -0,0 +1,89 @@
+# benchmarks/bench_responses.py
+# Usage: python -m benchmarks.bench_responses
+# Each route is timed in a fresh interpreter, once with FAST_JSON_RESPONSES=0 (stock JSONResponse, response
+# models validated, jsonable_encoder) and once with the default fast rendering. Requests are driven straight
+# through the ASGI app, without a server or HTTP client, so the numbers are the app's own cost per request.
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROUTES = [
+    # (label, method, path, JSON body, requests per run)
+    ("user-agent", "GET", "/dev/user-agent", None, 5_000),
+    ("coin-flipper", "GET", "/fun/coin-flipper", None, 5_000),
+    ("random/token x1000", "GET", "/fun/random/token?count=1000", None, 200),
+    ("password/batch x10k", "GET", "/fun/random/password/batch?count=10000", None, 20),
+    ("bulk name x10k", "GET", "/fun/bulk?kind=name&count=10000&seed=1", None, 20),
+    ("user-agent/batch x10k", "POST", "/dev/user-agent/batch",
+     {"user_agents": [f"Mozilla/5.0 (X11; Linux x86_64) Firefox/{i % 50}.0" for i in range(10_000)],
+      "include_results": True}, 10),
+    ("case-converter/batch x10k", "POST", "/text/case-converter/batch",
+     {"texts": [f"Hello World number {i}" for i in range(10_000)], "to_case": "snakecase"}, 20),
+    ("hash/batch x10k", "POST", "/text/hash/batch",
+     {"texts": [f"text {i}" for i in range(10_000)], "algorithms": ["sha256"]}, 10),
+]
+
+
+async def call(app, method: str, path: str, body: bytes) -> int:
+    path, _, query = path.partition("?")
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+             "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+             "root_path": "", "server": ("bench", 80), "client": ("127.0.0.1", 1),
+             "headers": [(b"host", b"bench"), (b"content-type", b"application/json"),
+                         (b"user-agent", b"Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/126.0 Safari/537.36")]}
+    received = False
+    status = 0
+
+    async def receive():
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run_routes() -> dict:
+    from api.index import app
+    results = {}
+    for label, method, path, payload, count in ROUTES:
+        body = json.dumps(payload).encode() if payload is not None else b""
+        status = await call(app, method, path, body)  # warm up lazy imports and caches
+        if status != 200:
+            raise RuntimeError(f"{method} {path} returned {status}")
+        best = float("inf")
+        for _ in range(3):
+            started = time.perf_counter()
+            for _ in range(count):
+                await call(app, method, path, body)
+            best = min(best, time.perf_counter() - started)
+        results[label] = count / best
+    return results
+
+
+def measure(fast: bool) -> dict:
+    env = dict(os.environ, FAST_JSON_RESPONSES="1" if fast else "0")
+    output = subprocess.run([sys.executable, "-m", "benchmarks.bench_responses", "--child"], env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        print(json.dumps(asyncio.run(run_routes())))
+        sys.exit()
+    from app.services.responses import ENCODER
+    before, after = measure(fast=False), measure(fast=True)
+    print(f"{'route':<28} {'before req/s':>13} {'after req/s':>13} {'speedup':>8}   (encoder: {ENCODER})")
+    for label, *_ in ROUTES:
+        print(f"{label:<28} {before[label]:>13,.0f} {after[label]:>13,.0f} {after[label] / before[label]:>7.2f}x")
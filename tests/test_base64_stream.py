@@ -0,0 +1,61 @@
+# tests/test_base64_stream.py
+import asyncio
+import base64
+import binascii
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.index import app
+from app.services.base64_stream import CODECS, transcode
+
+PAYLOAD = bytes(range(256)) * 3 + b"\xff\xfe tail"  # 781 bytes: not a multiple of any block size
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _transcode(data: bytes, chunk_size: int, action: str, variant: str) -> bytes:
+    async def collect():
+        return b"".join([bytes(piece) async for piece in transcode(_chunks(data, chunk_size), action, variant)])
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("variant", CODECS)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 7, 64 * 1024])
+def test_round_trip_at_any_chunk_boundary(variant, chunk_size):
+    encode = CODECS[variant][0]
+    encoded = _transcode(PAYLOAD, chunk_size, "encode", variant)
+    assert encoded == encode(PAYLOAD)
+    assert _transcode(encoded, chunk_size, "decode", variant) == PAYLOAD
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 76])
+def test_decode_ignores_line_breaks_and_missing_padding(chunk_size):
+    encoded = base64.b64encode(PAYLOAD)
+    wrapped = b"\r\n".join(encoded[i:i + 76] for i in range(0, len(encoded), 76)).rstrip(b"=")
+    assert _transcode(wrapped, chunk_size, "decode", "standard") == PAYLOAD
+
+
+def test_invalid_input_is_rejected():
+    with pytest.raises(binascii.Error):
+        _transcode(b"QUJD" * 10 + b"!!!!", 3, "decode", "standard")
+
+
+def test_stream_endpoint():
+    client = TestClient(app)
+    response = client.post("/text/base64/stream?action=encode&variant=urlsafe", content=PAYLOAD,
+                           headers={"content-type": "application/octet-stream"})
+    assert response.status_code == 200
+    assert response.content == base64.urlsafe_b64encode(PAYLOAD)
+
+    response = client.post("/text/base64/stream?action=decode", content=base64.b64encode(PAYLOAD),
+                           headers={"content-type": "text/plain"})
+    assert response.content == PAYLOAD
+
+    response = client.post("/text/base64/stream?action=decode", content=b"*not base64*",
+                           headers={"content-type": "text/plain"})
+    assert response.status_code == 400
@@ -0,0 +1,49 @@
+# tests/test_bulk.py
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.index import app
+from app.routers import fun_creative
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(fun_creative, "BULK_CHUNK_SIZE", 7)  # Several chunks per request
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("kind", fun_creative.BULK_KINDS)
+def test_seed_reproduces_json_and_ndjson(client, kind):
+    response = client.get(f"/fun/bulk?kind={kind}&count=30&seed=42")
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["count"], body["seed"], len(body["results"])) == (30, 42, 30)
+    assert client.get(f"/fun/bulk?kind={kind}&count=30&seed=42").json() == body
+
+    streamed = client.get(f"/fun/bulk?kind={kind}&count=30&seed=42&format=ndjson")
+    assert streamed.headers["x-random-seed"] == "42"
+    assert [json.loads(line) for line in streamed.text.splitlines()] == body["results"]
+
+
+def test_values_come_from_the_requested_population(client):
+    dice = client.get("/fun/bulk?kind=dice&sides=3&count=200").json()["results"]
+    assert set(dice) <= {1, 2, 3}
+    colors = client.get("/fun/bulk?kind=color-hex&count=20").json()["results"]
+    assert all(len(color) == 7 and color.startswith("#") for color in colors)
+    names = client.get("/fun/bulk?kind=name&gender=female&count=20").json()["results"]
+    assert {name["first_name"] for name in names} <= set(fun_creative.FIRST_NAMES_FEMALE)
+
+
+def test_unseeded_runs_report_their_seed(client):
+    body = client.get("/fun/bulk?kind=coin&count=50").json()
+    again = client.get(f"/fun/bulk?kind=coin&count=50&seed={body['seed']}").json()
+    assert again["results"] == body["results"]
+
+
+@pytest.mark.parametrize("query", [
+    "kind=unicorn", "kind=coin&format=xml", f"kind=coin&count={fun_creative.MAX_BULK_JSON + 1}",
+    "kind=name&gender=robot"])
+def test_invalid_requests_are_rejected(client, query):
+    assert client.get(f"/fun/bulk?{query}").status_code == 400
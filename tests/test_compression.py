@@ -0,0 +1,40 @@
+# tests/test_compression.py
+from fastapi.testclient import TestClient
+
+from api.index import app
+
+MARKDOWN = {"markdown_text": "# Title\n\n" + "Some *emphasis* and a [link](https://example.com).\n\n" * 100}
+
+
+def test_compressed_markdown_revalidates_with_the_etag_it_was_sent():
+    client = TestClient(app)
+    response = client.post("/text/markdown-to-html", json=MARKDOWN, headers={"accept-encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')  # Compressed bytes: the ETag is weakened
+    assert "Accept-Encoding" in response.headers["vary"]
+
+    revalidated = client.post("/text/markdown-to-html", json=MARKDOWN,
+                              headers={"accept-encoding": "gzip", "if-none-match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+
+
+def test_cached_route_304_matches_compressed_200_headers():
+    client = TestClient(app)
+    response = client.get("/data/timezones", headers={"accept-encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    revalidated = client.get("/data/timezones", headers={"accept-encoding": "gzip",
+                                                         "if-none-match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == response.headers["etag"]
+    assert "Accept-Encoding" in revalidated.headers["vary"]
+
+
+def test_small_and_identity_responses_are_not_compressed():
+    client = TestClient(app)
+    assert "content-encoding" not in client.get("/fun/coin-flipper", headers={"accept-encoding": "gzip"}).headers
+    response = client.get("/data/timezones", headers={"accept-encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json()["timezones"]
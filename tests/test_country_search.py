@@ -0,0 +1,46 @@
+# tests/test_country_search.py
+import pytest
+
+from app.services.country_index import CountryIndex
+
+COUNTRIES = [
+    {"name": "United States", "capital": "Washington D.C.", "iso2": "US", "iso3": "USA"},
+    {"name": "Canada", "capital": "Ottawa", "iso2": "CA", "iso3": "CAN"},
+    {"name": "United Kingdom", "capital": "London", "iso2": "GB", "iso3": "GBR"},
+    {"name": "Côte d'Ivoire", "capital": "Yamoussoukro", "iso2": "CI", "iso3": "CIV"},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return CountryIndex(COUNTRIES)
+
+
+def _names(results) -> list:
+    return [result["country"]["name"] for result in results]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("unted", ["United Kingdom", "United States"]),  # Short autocomplete input with a typo
+    ("kingdm", ["United Kingdom"]),
+    ("otawa", ["Canada"]),
+    ("cote", ["Côte d'Ivoire"]),
+])
+def test_fuzzy_and_accent_insensitive_matches(index, query, expected):
+    assert _names(index.search(query)) == expected
+
+
+@pytest.mark.parametrize("query, expected, field", [
+    ("gb", "United Kingdom", "iso2"),
+    ("GBR", "United Kingdom", "iso3"),
+    ("usa", "United States", "iso3"),
+])
+def test_iso_codes_are_searchable(index, query, expected, field):
+    best = index.search(query)[0]
+    assert (best["country"]["name"], best["match"], best["matched_on"]) == (expected, "exact", field)
+
+
+def test_prefix_ranks_before_fuzzy(index):
+    results = index.search("united st")
+    assert [(result["country"]["name"], result["match"]) for result in results][0] == ("United States", "prefix")
+    assert index.search("xyz") == []
@@ -0,0 +1,74 @@
+# tests/test_csv_stream.py
+import asyncio
+import csv
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.index import app
+from app.services.csv_stream import MAX_RECORD_CHARS, RecordTooLargeError, iter_csv_records
+
+CSV_CASES = [
+    "name,age\nAlice,30\nBob,24\n",
+    'name,note\n"Smith, J","line one\nline two"\nDoe,"say ""hi"""\n',
+    'name,height\nAlice,5" tall\nBob,"6\'1"\nCarol,5\n',  # Stray quote inside an unquoted field
+    "name,city\nJosé,Zürich\nZoë,Kraków",  # Multi-byte characters, no trailing newline
+]
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _parse(text: str, chunk_size: int, **kwargs) -> list:
+    async def collect():
+        return [record async for record in iter_csv_records(_chunks(text.encode(), chunk_size), **kwargs)]
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("text", CSV_CASES)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64 * 1024])
+def test_matches_dict_reader_at_any_chunk_boundary(text, chunk_size):
+    assert _parse(text, chunk_size) == [dict(row) for row in csv.DictReader(io.StringIO(text))]
+
+
+def test_oversized_record_is_rejected():
+    with pytest.raises(RecordTooLargeError):
+        _parse('a\n"' + "x\n" * 100, 3, max_record_chars=50)
+    with pytest.raises(RecordTooLargeError):
+        _parse("a\n" + "x" * 500, 64, max_record_chars=50)
+
+
+def test_stream_endpoint():
+    client = TestClient(app)
+    response = client.post("/text/csv-to-json/stream", content=CSV_CASES[2].encode(),
+                           headers={"content-type": "text/csv"})
+    assert response.status_code == 200
+    assert [line for line in response.text.splitlines()] == [
+        '{"name": "Alice", "height": "5\\" tall"}', '{"name": "Bob", "height": "6\'1"}',
+        '{"name": "Carol", "height": "5"}']
+
+
+def test_stream_endpoint_rejects_oversized_first_record():
+    client = TestClient(app)
+    response = client.post("/text/csv-to-json/stream", content=b"a\n" + b"x" * (MAX_RECORD_CHARS + 1024 * 1024),
+                           headers={"content-type": "text/csv"})
+    assert response.status_code == 400
+
+
+def test_stream_endpoint_json_array_with_inferred_types():
+    client = TestClient(app)
+    response = client.post("/text/csv-to-json/stream?format=json&infer_types=true",
+                           content=b"a,b,c\n1,2.5,true\n,x,false\n", headers={"content-type": "text/csv"})
+    assert response.json() == [{"a": 1, "b": 2.5, "c": True}, {"a": None, "b": "x", "c": False}]
+    empty = client.post("/text/csv-to-json/stream?format=json", content=b"", headers={"content-type": "text/csv"})
+    assert empty.json() == []
+
+
+def test_stream_endpoint_sniffs_multipart_upload():
+    client = TestClient(app)
+    response = client.post("/text/csv-to-json/stream?sniff=true", files={"file": ("data.csv", b"a;b\n1;2\n")})
+    assert response.text == '{"a": "1", "b": "2"}\n'
@@ -0,0 +1,60 @@
+# tests/test_datasets.py
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+
+from app.services import lazy
+from app.services.datasets import Dataset, compact_records, record_dict
+
+
+@pytest.fixture
+def make_dataset(tmp_path):
+    created = []
+
+    def make(records) -> Dataset:
+        dataset = Dataset("test_records.json")
+        dataset.path = tmp_path / "test_records.json"
+        dataset.snapshot_path = tmp_path / "test_records.snapshot"
+        dataset.path.write_text(json.dumps(records), encoding="utf-8")
+        created.append(dataset)
+        return dataset
+
+    yield make
+    for dataset in created:
+        lazy._registry.remove(dataset)  # Keep prewarm() and /diagnostics/startup free of test datasets
+
+
+def test_uneven_records_share_one_type():
+    records = compact_records([{"quote": "a", "author": "b"}, {"quote": "c"}])
+    assert type(records[0]) is type(records[1])
+    assert [record_dict(record) for record in records] == [{"quote": "a", "author": "b"},
+                                                           {"quote": "c", "author": None}]
+
+
+def test_aget_loads_and_reloads_off_the_event_loop(make_dataset):
+    dataset = make_dataset(["first"])
+    loop_threads = []
+    transform = dataset._transform
+
+    def recording_transform(data):
+        loop_threads.append(threading.current_thread() is threading.main_thread())
+        return transform(data)
+
+    dataset._transform = recording_transform
+
+    async def run():
+        assert await dataset.aget() == ("first",)
+        dataset.path.write_text(json.dumps(["second"]), encoding="utf-8")
+        stat = dataset.path.stat()
+        os.utime(dataset.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        dataset._next_check = 0
+        assert await dataset.aget() == ("first",)  # Served immediately; the reload runs in the background
+        await dataset._refresh
+        return await dataset.aget()
+
+    assert asyncio.run(run()) == ("second",)
+    assert dataset.reloads == 1
+    assert loop_threads == [False, False]  # Both parses ran in worker threads
@@ -0,0 +1,58 @@
+# tests/test_hashing.py
+import asyncio
+import hashlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.index import app
+from app.services import hashing
+from app.services.hashing import hash_many, hash_stream, normalize_algorithms
+
+PAYLOAD = b"The quick brown fox jumps over the lazy dog. " * 500
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096, 64 * 1024])
+def test_stream_matches_hashlib_at_any_chunk_boundary(chunk_size, monkeypatch):
+    monkeypatch.setattr(hashing, "OFFLOAD_BUFFER_SIZE", 1000)  # Several threadpool hand-offs per payload
+    hasher = asyncio.run(hash_stream(_chunks(PAYLOAD, chunk_size), ["md5", "sha256", "blake2b"]))
+    assert hasher.byte_count == len(PAYLOAD)
+    assert hasher.hexdigests() == {name: getattr(hashlib, name)(PAYLOAD).hexdigest()
+                                   for name in ("md5", "sha256", "blake2b")}
+
+
+def test_normalize_algorithms():
+    assert normalize_algorithms(" SHA256,md5,sha256,, ") == ["sha256", "md5"]
+    with pytest.raises(ValueError):
+        normalize_algorithms("sha256,crc32")
+    with pytest.raises(ValueError):
+        normalize_algorithms(",")
+
+
+def test_hash_many_keeps_order_across_slices(monkeypatch):
+    monkeypatch.setattr(hashing, "BATCH_SLICE_SIZE", 3)
+    texts = [f"item {i} ✓" for i in range(10)]
+    results = asyncio.run(hash_many(texts, ["sha1"]))
+    assert results == [{"sha1": hashlib.sha1(text.encode()).hexdigest()} for text in texts]
+
+
+def test_stream_and_batch_endpoints():
+    client = TestClient(app)
+    response = client.post("/text/hash/stream?algorithms=md5,sha256", content=PAYLOAD,
+                           headers={"content-type": "application/octet-stream"})
+    assert response.json() == {"size_bytes": len(PAYLOAD), "digests": {
+        "md5": hashlib.md5(PAYLOAD).hexdigest(), "sha256": hashlib.sha256(PAYLOAD).hexdigest()}}
+
+    upload = client.post("/text/hash/stream", files={"file": ("payload.bin", PAYLOAD)})
+    assert upload.json()["digests"]["sha256"] == hashlib.sha256(PAYLOAD).hexdigest()
+
+    assert client.post("/text/hash/stream?algorithms=crc32", content=b"x").status_code == 400
+
+    batch = client.post("/text/hash/batch", json={"texts": ["a", "b"], "algorithms": ["sha256"]})
+    assert batch.json()["results"] == [{"sha256": hashlib.sha256(b"a").hexdigest()},
+                                       {"sha256": hashlib.sha256(b"b").hexdigest()}]
@@ -0,0 +1,25 @@
+# tests/test_holidays.py
+from fastapi.testclient import TestClient
+
+from api.index import app
+
+
+def test_add_business_days_near_the_last_supported_year():
+    client = TestClient(app)
+    response = client.get("/data/business-days/add", params={"country_code": "US", "start_date": "2050-12-01",
+                                                              "days": 5})
+    assert response.status_code == 200
+    assert response.json()["result_date"] == "2050-12-08"
+    response = client.get("/data/business-days/add", params={"country_code": "US", "start_date": "2050-12-20",
+                                                              "days": 20})
+    assert response.status_code == 400
+
+
+def test_count_business_days_span_is_limited():
+    client = TestClient(app)
+    response = client.get("/data/business-days/count", params={"country_code": "US", "start_date": "1950-01-01",
+                                                                "end_date": "2050-01-01"})
+    assert response.status_code == 400
+    response = client.get("/data/business-days/count", params={"country_code": "US", "start_date": "2024-12-01",
+                                                                "end_date": "2025-01-01"})
+    assert response.json()["business_days"] == 21  # 22 weekdays in December 2024, minus Christmas
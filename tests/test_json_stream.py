@@ -0,0 +1,74 @@
+# tests/test_json_stream.py
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.index import app
+from app.services import json_stream
+from app.services.json_stream import JsonStreamError, reformat_stream
+
+DOCUMENTS = [
+    '{"b": 1, "a": [true, false, null, -1.5e3, "x\\u00e9\\"y"], "nested": {"k": {}, "l": []}}',
+    '[1, 2, [3, [4, {"deep": "Zürich ✓"}]], "", 0]',
+    '"just a string"',
+    '  \n 12345678901234567890123 \n',  # Beyond 64 bits
+]
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _reformat(text: str, chunk_size: int, indent: int = 4, lines: bool = False) -> str:
+    async def collect():
+        return "".join([piece async for piece in reformat_stream(_chunks(text.encode(), chunk_size), indent, lines)])
+
+    return asyncio.run(collect())
+
+
+@pytest.fixture(params=[1, 2, 5, 64 * 1024])
+def chunk_size(request, monkeypatch):
+    # Hand every chunk to the reformatter so each split point is exercised, and make large values walk.
+    monkeypatch.setattr(json_stream, "OFFLOAD_BUFFER_SIZE", 1)
+    return request.param
+
+
+@pytest.mark.parametrize("text", DOCUMENTS)
+@pytest.mark.parametrize("indent", [0, 2, 4])
+def test_matches_json_dumps_at_any_chunk_boundary(text, indent, chunk_size):
+    separators = None if indent else (",", ":")
+    expected = json.dumps(json.loads(text), indent=indent or None, separators=separators, ensure_ascii=False)
+    assert _reformat(text, chunk_size, indent) == expected
+
+
+@pytest.mark.parametrize("text", DOCUMENTS[:2])
+def test_walked_containers_match_buffered_output(text, chunk_size, monkeypatch):
+    monkeypatch.setattr(json_stream, "MAX_BUFFERED_VALUE", 4)
+    assert _reformat(text, chunk_size) == json.dumps(json.loads(text), indent=4, ensure_ascii=False)
+
+
+def test_json_lines(chunk_size):
+    text = '{"a": 1}\n[2, 3]  "four"\n\n5'
+    assert _reformat(text, chunk_size, indent=0, lines=True) == '{"a":1}\n[2,3]\n"four"\n5\n'
+
+
+@pytest.mark.parametrize("text", ['{"a": 1,}', '[1 2]', '{"a": 1} {"b": 2}', '{"a": NaN}', '[1, 2', ""])
+def test_invalid_json_is_rejected(text, chunk_size):
+    with pytest.raises(JsonStreamError):
+        _reformat(text, chunk_size)
+
+
+def test_stream_endpoint():
+    client = TestClient(app)
+    response = client.post("/text/json-pretty-printer/stream?mode=minify", content=DOCUMENTS[0].encode(),
+                           headers={"content-type": "application/json"})
+    assert response.status_code == 200
+    assert response.json() == json.loads(DOCUMENTS[0])
+    assert list(response.json()) == ["b", "a", "nested"]  # Key order is kept
+
+    response = client.post("/text/json-pretty-printer/stream", content=b'{"a": }',
+                           headers={"content-type": "application/json"})
+    assert response.status_code == 400
@@ -0,0 +1,70 @@
+# tests/test_jwt_tools.py
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.index import app
+from app.services import jwt_tools
+from app.services.jwt_tools import KeyCache, KeyExistsError, KeyRegistryFullError, VerificationCache
+
+SECRET = "test-shared-secret"
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(jwt_tools, "key_cache", KeyCache(maxsize=4, max_registered=2))
+    monkeypatch.setattr(jwt_tools, "verification_cache", VerificationCache())
+
+
+def test_verification_is_cached_until_it_changes():
+    token = jwt_tools.sign({"sub": "a", "aud": "b"}, SECRET, expires_in=60)
+    first = jwt_tools.verify(token, SECRET, audience="b")
+    assert first["valid"] and first["claims"]["sub"] == "a" and not first["cached"]
+    assert jwt_tools.verify(token, SECRET, audience="b")["cached"]
+    assert not jwt_tools.verify(token, SECRET, audience="c")["valid"]  # Audience is part of the cache key
+    assert jwt_tools.key_cache.stats()["misses"] == 1  # The secret was parsed once
+
+
+def test_invalid_tokens_are_rejected():
+    token = jwt_tools.sign({"sub": "a"}, SECRET)
+    assert not jwt_tools.verify(token, "other-secret")["valid"]
+    assert not jwt_tools.verify(token, SECRET, algorithm="HS512")["valid"]  # Only the key's own algorithm
+    expired = jwt_tools.sign({"sub": "a", "exp": int(time.time()) - 10}, SECRET)
+    assert not jwt_tools.verify(expired, SECRET)["valid"]
+    assert not jwt_tools.verify("not.a.token")["valid"]
+    with pytest.raises(ValueError):
+        jwt_tools.verify(token, SECRET, algorithm="none")
+
+
+def test_registered_keys_are_immutable_and_bounded():
+    jwt_tools.key_cache.register("k1", SECRET, "HS256")
+    jwt_tools.key_cache.register("k1", SECRET, "HS256")  # Same key again is fine
+    with pytest.raises(KeyExistsError):
+        jwt_tools.key_cache.register("k1", "attacker-secret", "HS256")
+    jwt_tools.key_cache.register("k2", SECRET, "HS384")
+    with pytest.raises(KeyRegistryFullError):
+        jwt_tools.key_cache.register("k3", SECRET, "HS256")
+
+    token = jwt_tools.sign({"sub": "a"}, kid="k2")
+    assert jwt_tools.decode_unverified(token)["header"]["kid"] == "k2"
+    assert jwt_tools.verify(token)["valid"]  # The key is picked by the token's kid header
+    assert not jwt_tools.verify(jwt_tools.sign({"sub": "a"}, SECRET, headers={"kid": "k9"}))["valid"]
+
+
+def test_endpoints():
+    client = TestClient(app)
+    kid = f"test-{uuid.uuid4().hex}"
+    assert client.post("/dev/jwt/keys", json={"kid": kid, "key": SECRET}).status_code == 200
+    assert client.post("/dev/jwt/keys", json={"kid": kid, "key": "other"}).status_code == 409
+
+    token = client.post("/dev/jwt/sign", json={"claims": {"sub": "a"}, "kid": kid}).json()["token"]
+    bad = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+    batch = client.post("/dev/jwt/verify/batch", json={"tokens": [token, bad, token]}).json()
+    assert (batch["count"], batch["valid"], batch["invalid"]) == (3, 2, 1)
+    assert "claims" not in batch["results"][0]
+
+    assert client.post("/dev/jwt/sign", json={"claims": {}}).status_code == 400
+    assert client.post("/dev/jwt/sign", json={"claims": {}, "kid": "missing"}).status_code == 404
+    assert client.post("/dev/jwt/decode", json={"token": "garbage"}).status_code == 400
@@ -0,0 +1,74 @@
+# tests/test_lazy.py
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from app.services import lazy
+from app.services.lazy import LazyModule, LazyValue, lazy_import, prewarm
+
+HEAVY_MODULES = ("markdown", "holidays", "httpx", "jose", "pytz", "user_agents")
+
+
+@pytest.fixture
+def registered():
+    created = []
+    yield created
+    for entry in created:
+        lazy._registry.remove(entry)  # Keep prewarm() and /diagnostics/startup free of test entries
+
+
+def test_app_import_leaves_heavy_modules_unloaded():
+    # A fresh interpreter, since other tests load these modules into this one.
+    code = f"import sys, api.index; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=Path(__file__).resolve().parents[1])
+    assert result.stdout.strip() == ""
+
+
+def test_lazy_import_shares_one_proxy():
+    assert lazy_import("markdown", group="text") is lazy_import("markdown", group="other")
+
+
+def test_lazy_module_imports_on_first_attribute(registered):
+    proxy = LazyModule("json.tool", group="test")
+    registered.append(proxy)
+    assert not proxy.loaded
+    assert callable(proxy.main)
+    assert proxy.loaded
+    assert proxy.report()["load_ms"] is not None
+
+
+def test_lazy_value_builds_once_under_concurrency(registered):
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def factory():
+        calls.append(1)
+        return object()
+
+    value = LazyValue(factory, "test_value", group="test")
+    registered.append(value)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(value.get())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_prewarm_loads_only_the_requested_groups(registered):
+    wanted = LazyValue(lambda: 1, "wanted", group="test-prewarm")
+    other = LazyValue(lambda: 2, "other", group="test-other")
+    registered.extend([wanted, other])
+    assert prewarm("test-prewarm, ") == ["wanted"]
+    assert wanted.loaded and not other.loaded
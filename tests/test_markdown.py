@@ -0,0 +1,62 @@
+# tests/test_markdown.py
+import asyncio
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.index import app
+from app.services.markdown_renderer import MarkdownRenderer, normalize_extensions
+
+FOOTNOTES = "Text with a note.[^1]\n\n[^1]: The note."
+
+
+def test_normalize_extensions():
+    assert normalize_extensions(["toc", " extra", "toc"]) == ("extra", "toc")
+    assert normalize_extensions("tables,") == ("tables",)
+    with pytest.raises(ValueError):
+        normalize_extensions(["extra", "os.path"])
+
+
+def test_render_cache_hit_and_eviction():
+    renderer = MarkdownRenderer(pool_size=1, cache_size=2)
+    first = renderer.render("**bold**")
+    assert first == "<p><strong>bold</strong></p>"
+    assert renderer.render("**bold**") == first
+    assert (renderer.hits, renderer.misses) == (1, 1)
+    renderer.render("a")
+    renderer.render("b")  # Evicts "**bold**"
+    renderer.render("**bold**")
+    assert renderer.misses == 4
+
+
+def test_pooled_instances_do_not_leak_state():
+    renderer = MarkdownRenderer(pool_size=1, cache_size=0)
+    with_note = renderer.render(FOOTNOTES, ("footnotes",))
+    assert "footnote" in with_note
+    assert "footnote" not in renderer.render("No notes here.", ("footnotes",))
+    assert renderer.stats()["pooled_instances"] == {"footnotes": 1}
+
+
+def test_render_many_keeps_order():
+    renderer = MarkdownRenderer()
+    documents = [f"# Heading {i}" for i in range(120)]
+    html = asyncio.run(renderer.render_many(documents))
+    assert html == [f'<h1>Heading {i}</h1>' for i in range(120)]
+
+
+def test_endpoint_etag_revalidation():
+    client = TestClient(app)
+    body = {"markdown_text": f"# {uuid.uuid4().hex}", "extensions": ["toc"]}
+    response = client.post("/text/markdown-to-html", json=body, headers={"accept-encoding": "identity"})
+    assert set(response.json()) == {"html"}  # The source is not echoed
+    etag = response.headers["etag"]
+
+    for candidate in (etag, f"W/{etag}"):
+        revalidated = client.post("/text/markdown-to-html", json=body, headers={"if-none-match": candidate})
+        assert revalidated.status_code == 304
+
+    other_extensions = client.post("/text/markdown-to-html", json={**body, "extensions": ["extra"]},
+                                   headers={"if-none-match": etag})
+    assert other_extensions.status_code == 200
+    assert client.post("/text/markdown-to-html", json={**body, "extensions": ["os"]}).status_code == 400
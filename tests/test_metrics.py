@@ -0,0 +1,84 @@
+# tests/test_metrics.py
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from api.index import app
+from app.services.metrics import UNMATCHED, Histogram, MetricsMiddleware, MetricsRegistry
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+@pytest.fixture
+def client(registry):
+    router = APIRouter()
+
+    @router.post("/items/{item_id}")
+    async def echo(item_id: int, body: dict):
+        return {"id": item_id, **body}
+
+    @router.get("/stream")
+    async def stream():
+        return StreamingResponse(iter([b"a" * 100, b"b" * 50]))
+
+    @router.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    test_app = FastAPI()
+    test_app.include_router(router, prefix="/api")
+    test_app.add_middleware(MetricsMiddleware, registry=registry, profiling=False)
+    return TestClient(test_app, raise_server_exceptions=False)
+
+
+def test_histogram_quantiles():
+    histogram = Histogram((1.0, 2.0, 4.0))
+    assert histogram.quantile(0.5) is None
+    for value in (0.5, 1.5, 1.5, 3.0, 10.0):
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == pytest.approx(1.75)  # 2.5th of 5 observations, inside (1, 2]
+    assert histogram.quantile(0.99) == 4.0  # +Inf bucket reports the largest finite bound
+    assert list(histogram.cumulative()) == [(1.0, 1), (2.0, 3), (4.0, 4), ("+Inf", 5)]
+
+
+def test_requests_are_grouped_by_route_template(client, registry):
+    for item_id in (1, 2, 3):
+        assert client.post(f"/api/items/{item_id}", json={"x": "y" * 10}).status_code == 200
+    client.get("/api/stream")
+    client.get("/api/boom")
+    client.get("/nowhere/1")
+    client.get("/nowhere/2")
+
+    items = registry.routes[("POST", "/api/items/{item_id}")]
+    assert items.statuses == {200: 3}
+    assert items.request_size.total == 3 * len(b'{"x":"yyyyyyyyyy"}')
+    assert registry.routes[("GET", "/api/stream")].response_size.total == 150  # Streamed to the last chunk
+    assert registry.routes[("GET", "/api/boom")].statuses == {500: 1}
+    assert registry.routes[("GET", UNMATCHED)].statuses == {404: 2}
+    assert sum(registry.in_flight.values()) == 0
+
+    summary = registry.summary()
+    boom = next(route for route in summary["routes"] if route["route"] == "/api/boom")
+    assert boom["errors"] == 1
+
+
+def test_prometheus_exposition(client, registry):
+    client.post("/api/items/7", json={})
+    text = registry.render_prometheus()
+    assert 'http_requests_total{method="POST",route="/api/items/{item_id}",status="200"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="POST",route="/api/items/{item_id}",le="+Inf"} 1' in text
+    assert text.endswith("\n")
+
+
+def test_metrics_endpoint():
+    client = TestClient(app)
+    client.get("/data/timezones")
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'route="/data/timezones",status="200"' in response.text
+    routes = client.get("/diagnostics/routes").json()["routes"]
+    assert any(route["route"] == "/data/timezones" for route in routes)
@@ -0,0 +1,52 @@
+# tests/test_password_hashing.py
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.index import app
+from app.services.password_hashing import PasswordHashPool, PoolSaturatedError, check_hash_cost
+
+SALT_AND_DIGEST = "Ue1tOkRYJbVBP1VkV1rTdO0a2XrTGNbS5Oa9jZ6J3J8H2fV0y7s7W"
+
+
+@pytest.mark.parametrize("hashed", [
+    f"$2b$12${SALT_AND_DIGEST}",
+    "$argon2id$v=19$m=65536,t=3,p=4$c2FsdHNhbHQ$aGFzaGhhc2hoYXNoaGFzaA",
+    "not a hash",  # Left to the worker, which reports it as unrecognized
+])
+def test_hash_within_limits_is_accepted(hashed):
+    check_hash_cost(hashed)
+
+
+@pytest.mark.parametrize("hashed", [
+    f"$2b$31${SALT_AND_DIGEST}",
+    f"$2a$03${SALT_AND_DIGEST}",
+    "$2b$xx$",
+    "$argon2id$v=19$m=65536,t=500,p=4$c2FsdHNhbHQ$aGFzaGhhc2hoYXNoaGFzaA",
+    "$argon2id$v=19$m=4194304,t=3,p=4$c2FsdHNhbHQ$aGFzaGhhc2hoYXNoaGFzaA",
+    "$argon2i$m=65536,t=3,p=255$c2FsdHNhbHQ$aGFzaGhhc2hoYXNoaGFzaA",
+    "$argon2id$v=19$t=3,m=65536,p=4$c2FsdHNhbHQ$aGFzaGhhc2hoYXNoaGFzaA",
+])
+def test_expensive_or_malformed_hash_is_rejected(hashed):
+    with pytest.raises(ValueError):
+        check_hash_cost(hashed)
+
+
+def test_verify_rejects_expensive_hash_before_submitting():
+    client = TestClient(app)
+    response = client.post("/dev/password-verify", json={"password": "x", "hash": f"$2b$31${SALT_AND_DIGEST}"})
+    assert response.status_code == 400
+    response = client.post("/dev/password-verify/batch", json={"items": [
+        {"password": "x", "hash": f"$2b$12${SALT_AND_DIGEST}"},
+        {"password": "x", "hash": f"$2b$31${SALT_AND_DIGEST}"}]})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Item 1:")
+
+
+def test_batch_reserves_one_unit_per_pair():
+    pool = PasswordHashPool(workers=2, max_pending=10)
+    pool.pending = 5
+    with pytest.raises(PoolSaturatedError):
+        asyncio.run(pool.verify_many([("x", f"$2b$12${SALT_AND_DIGEST}")] * 6))
+    assert pool.pending == 5
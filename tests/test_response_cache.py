@@ -0,0 +1,94 @@
+# tests/test_response_cache.py
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.index import app
+from app.services import response_cache
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _text() -> str:
+    return f"cache test {uuid.uuid4().hex}"  # Fresh cache key per test
+
+
+def test_post_body_hit_and_miss(client):
+    text = _text()
+    first = client.post("/text/case-converter?to_case=uppercase", json={"text": text})
+    assert first.status_code == 200
+    assert first.headers["x-cache"] == "MISS"
+    assert "etag" not in first.headers  # POST responses are cached server-side only
+
+    repeat = client.post("/text/case-converter?to_case=uppercase", json={"text": text})
+    assert repeat.headers["x-cache"] == "HIT"
+    assert repeat.json() == first.json() == {"original": text, "converted": text.upper()}
+
+    other_query = client.post("/text/case-converter?to_case=lowercase", json={"text": text})
+    assert other_query.headers["x-cache"] == "MISS"
+    other_body = client.post("/text/case-converter?to_case=uppercase", json={"text": text + "!"})
+    assert other_body.headers["x-cache"] == "MISS"
+
+
+def test_json_key_order_and_whitespace_share_an_entry(client):
+    text = _text()
+    first = client.post("/text/hash", json={"text": text, "algorithm": "sha256"})
+    assert first.headers["x-cache"] == "MISS"
+    reordered = client.post("/text/hash", content=f'{{ "algorithm" : "sha256",\n "text": "{text}" }}',
+                            headers={"content-type": "application/json"})
+    assert reordered.headers["x-cache"] == "HIT"
+    assert reordered.json() == first.json()
+
+
+def test_errors_are_not_cached(client):
+    body = {"text": _text()}
+    for _ in range(2):
+        response = client.post("/text/case-converter?to_case=nonsense", json=body)
+        assert response.status_code == 400
+        assert "x-cache" not in response.headers
+
+
+def test_disabled_cache_runs_every_request(client, monkeypatch):
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_ENABLED", False)
+    body = {"text": _text()}
+    assert client.post("/text/slug-generator", json=body).headers["x-cache"] == "MISS"
+    assert client.post("/text/slug-generator", json=body).headers["x-cache"] == "MISS"
+
+
+def test_when_predicate_bypasses_the_cache(client):
+    this_year = datetime.now().year
+    current = client.get(f"/data/holidays?country_code=US&year={this_year}")
+    assert current.status_code == 200
+    assert "x-cache" not in current.headers
+
+    client.get(f"/data/holidays?country_code=US&year={this_year - 1}")
+    past = client.get(f"/data/holidays?year={this_year - 1}&country_code=US")  # Parameter order does not matter
+    assert past.headers["x-cache"] == "HIT"
+
+
+def test_get_revalidates_with_strong_and_weak_etags(client):
+    response = client.get("/dev/http-status?code=404", headers={"accept-encoding": "identity"})
+    etag = response.headers["etag"]
+    assert not etag.startswith("W/")
+    assert response.headers["cache-control"].startswith("public, max-age=")
+
+    for candidate in (etag, f"W/{etag}", f'"other", W/{etag}', "*"):
+        revalidated = client.get("/dev/http-status?code=404", headers={"if-none-match": candidate,
+                                                                        "accept-encoding": "identity"})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+    stale = client.get("/dev/http-status?code=404", headers={"if-none-match": '"other"'})
+    assert stale.status_code == 200
+
+
+@pytest.mark.parametrize(("if_none_match", "matches"), [
+    ('"abc"', True), ('W/"abc"', True), (' "x" , W/"abc"', True), ("*", True), ('"abcd"', False), ("", False)])
+def test_etag_matches(if_none_match, matches):
+    assert response_cache.etag_matches(if_none_match, '"abc"') is matches
@@ -0,0 +1,74 @@
+# tests/test_text_stats.py
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.index import app
+from app.services import text_stats
+from app.services.text_ops import word_stats
+from app.services.text_stats import TextStats, stats_stream
+
+TEXTS = [
+    "Hello world\nsecond line\n",
+    "Words split\r\nacross CRLF\r\nand\rcarriage returns\r\n\r\n  trailing   spaces  ",
+    "Café déjà vu — naïve Zoë unicode break\x85next\tTAB\vvertical",
+    "no trailing newline",
+    "",
+]
+
+
+def _chunked(data: bytes, size: int) -> dict:
+    stats = TextStats(top=5)
+    for start in range(0, len(data), size):
+        stats.update(data[start:start + size])
+    return stats.finish()
+
+
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 64 * 1024])
+def test_matches_word_stats_at_any_chunk_boundary(text, chunk_size):
+    data = text.encode("utf-8")
+    result = _chunked(data, chunk_size)
+    assert {key: result[key] for key in word_stats(text)} == word_stats(text)
+    assert result["byte_count"] == len(data)
+    assert result == _chunked(data, len(data) or 1)  # Top words too
+
+
+def test_top_words_are_case_and_punctuation_insensitive():
+    result = _chunked("The cat, the CAT! “the” dog.".encode(), 3)
+    assert result["top_words"][:2] == [{"word": "the", "count": 3}, {"word": "cat", "count": 2}]
+    assert result["top_words_approximate"] is False
+
+
+def test_frequency_table_is_bounded(monkeypatch):
+    monkeypatch.setattr(text_stats, "TOP_WORDS_MAX_DISTINCT", 10)
+    words = [f"w{i}" for i in range(30)] + ["common"] * 5
+    result = _chunked(" ".join(words).encode(), 8)
+    assert result["top_words"][0] == {"word": "common", "count": 5}
+    assert result["top_words_approximate"] is True
+
+
+def test_stream_offloads_in_buffers(monkeypatch):
+    monkeypatch.setattr(text_stats, "OFFLOAD_BUFFER_SIZE", 4)
+    text = "one two Two\r\nthree three THREE\r\n"
+
+    async def chunks():
+        for char in text:
+            yield char.encode()
+
+    result = asyncio.run(stats_stream(chunks(), top=3))
+    assert result["word_count"] == len(text.split())
+    assert result["top_words"] == [{"word": "three", "count": 3}, {"word": "two", "count": 2},
+                                   {"word": "one", "count": 1}]
+
+
+def test_stream_endpoint():
+    client = TestClient(app)
+    response = client.post("/text/word-counter/stream?top=1", files={"file": ("notes.txt", TEXTS[0].encode())})
+    assert response.json()["word_count"] == 4
+    assert response.json()["top_words"] == [{"word": "hello", "count": 1}]
+    latin1 = client.post("/text/word-counter/stream?encoding=latin-1", content="déjà vu".encode("latin-1"),
+                         headers={"content-type": "text/plain"})
+    assert latin1.json()["character_count_with_spaces"] == 7
+    assert client.post("/text/word-counter/stream?encoding=nope", content=b"x").status_code == 400
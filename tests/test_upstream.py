@@ -0,0 +1,126 @@
+# tests/test_upstream.py
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from api.index import app
+from app.routers import fun_creative
+from app.services.cache import AsyncTTLCache, PrefetchPool
+from app.services.http_client import UpstreamClient
+
+
+class StubChuckNorris:
+    """httpx.MockTransport handler standing in for api.chucknorris.io; counts the calls it receives."""
+
+    def __init__(self, fail_with=None):
+        self.fail_with = fail_with  # An exception to raise, or a status code to answer with
+        self.calls = {"/jokes/random": 0, "/jokes/categories": 0}
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls[request.url.path] += 1
+        if isinstance(self.fail_with, Exception):
+            raise self.fail_with
+        if self.fail_with == 404:
+            return httpx.Response(404, text="No jokes found for category")
+        if self.fail_with:
+            return httpx.Response(self.fail_with, text="upstream error")
+        if request.url.path == "/jokes/categories":
+            return httpx.Response(200, json=["dev", "food"])
+        number = self.calls["/jokes/random"]
+        return httpx.Response(200, json={"id": str(number), "value": f"Joke {number}",
+                                         "categories": [request.url.params.get("category")]})
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    def install(fail_with=None):
+        handler = StubChuckNorris(fail_with)
+        monkeypatch.setattr(fun_creative, "upstream_client", UpstreamClient(transport=httpx.MockTransport(handler)))
+        monkeypatch.setattr(fun_creative, "chuck_norris_categories_cache", AsyncTTLCache(ttl=60))
+        monkeypatch.setattr(fun_creative, "chuck_norris_joke_pool",
+                            PrefetchPool(fun_creative.fetch_chuck_norris_joke, size=3, low_water=1))
+        return handler
+
+    return install
+
+
+def test_per_host_concurrency_limit():
+    in_flight = {"a.test": 0, "b.test": 0}
+    peak = dict(in_flight)
+
+    async def handler(request):
+        host = request.url.host
+        in_flight[host] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        await asyncio.sleep(0.01)
+        in_flight[host] -= 1
+        return httpx.Response(200, json={})
+
+    async def run():
+        client = UpstreamClient(per_host_limit=3, transport=httpx.MockTransport(handler))
+        try:
+            await asyncio.gather(*(client.get(f"http://{host}/") for host in ("a.test", "b.test") for _ in range(20)))
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+    assert peak == {"a.test": 3, "b.test": 3}
+
+
+def test_waiting_for_a_host_slot_times_out():
+    async def handler(request):
+        await asyncio.sleep(0.3)
+        return httpx.Response(200)
+
+    async def run():
+        client = UpstreamClient(timeout=0.05, per_host_limit=1, transport=httpx.MockTransport(handler))
+        try:
+            return await asyncio.gather(client.get("http://a.test/"), client.get("http://a.test/"),
+                                        return_exceptions=True)
+        finally:
+            await client.close()
+
+    results = asyncio.run(run())
+    assert any(isinstance(result, httpx.TimeoutException) for result in results)
+
+
+def test_categories_are_served_from_the_ttl_cache(stub):
+    handler = stub()
+    with TestClient(app) as client:
+        for _ in range(3):
+            response = client.get("/fun/joke/chuck-norris/categories")
+            assert response.json() == {"categories": ["dev", "food"]}
+    assert handler.calls["/jokes/categories"] == 1
+
+
+def test_jokes_are_served_from_the_prefetch_pool(stub):
+    handler = stub()
+    with TestClient(app) as client:
+        first = client.get("/fun/joke/chuck-norris", params={"category": "dev"}).json()
+        deadline = time.monotonic() + 2
+        while fun_creative.chuck_norris_joke_pool.stats()["prefetched"] < 3 and time.monotonic() < deadline:
+            client.get("/fun/joke/chuck-norris/cache-stats")  # Lets the background refill run
+        calls_after_refill = handler.calls["/jokes/random"]
+        second = client.get("/fun/joke/chuck-norris", params={"category": "dev"}).json()
+        stats = fun_creative.chuck_norris_joke_pool.stats()
+    assert calls_after_refill == 4  # The direct fetch plus a pool of 3
+    assert second["joke"] != first["joke"] and second["categories"] == ["dev"]
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+@pytest.mark.parametrize("fail_with, status_code", [
+    (httpx.ReadTimeout("timed out"), 504),
+    (404, 404),
+    (500, 503),
+    (502, 503),
+    (httpx.ConnectError("refused"), 503),
+])
+def test_upstream_failures_map_to_status_codes(stub, fail_with, status_code):
+    stub(fail_with)
+    with TestClient(app) as client:
+        assert client.get("/fun/joke/chuck-norris", params={"category": "nope"}).status_code == status_code
+        if fail_with != 404:
+            assert client.get("/fun/joke/chuck-norris/categories").status_code == status_code